@@ -0,0 +1,273 @@
+"""
+App Config
+Validated, read-only configuration with precompiled matchers and hot reload
+"""
+
+import json
+import os
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+# name: (default, type or allowed values, minimum)
+SETTINGS = {
+    'collection.mode': ('inline', ('inline', 'supervised'), None),
+    'collection.batch_size': (100, int, 1),
+    'collection.flush_interval_seconds': (1.0, float, 0.01),
+    'collection.restart_backoff_seconds': (1.0, float, 0.0),
+    'collection.max_backoff_seconds': (60.0, float, 0.0),
+    'collection.heartbeat_timeout_seconds': (60.0, float, 1.0),
+    'collection.stable_seconds': (60.0, float, 0.0),
+    'collection.report_interval_seconds': (300.0, float, 1.0),
+    'spool.enabled': (True, bool, None),
+    'spool.dir': ('storage/spool', str, None),
+    'spool.segment_mb': (8.0, float, 0.01),
+    'spool.commit_delay_ms': (2.0, float, 0.0),
+    'ingestion.port': (8765, int, 1),
+    'ingestion.max_request_bytes': (16 * 1024 * 1024, int, 1),
+    'ingestion.keep_alive_seconds': (30.0, float, 0.0),
+    'storage.hot_months': (3, int, 1),
+    'sync.interval_minutes': (30.0, float, 0.01),
+    'sync.backup_enabled': (False, bool, None),
+    'sync.backup_interval_hours': (24.0, float, 0.01),
+    'sync.backup_keep': (7, int, 1),
+    'processing.redaction.enabled': (True, bool, None),
+    'processing.redaction.entropy_threshold': (4.3, float, 0.0),
+    'processing.redaction.entropy_min_length': (32, int, 20),
+    'output.auto_sync': (False, bool, None),
+    'daemon.enabled': (True, bool, None),
+    'daemon.socket_path': ('storage/gpt-gulp.sock', str, None),
+    'config_reload.enabled': (True, bool, None),
+    'config_reload.interval_seconds': (2.0, float, 0.1),
+}
+
+TYPE_NAMES = {bool: 'true or false', int: 'an integer', float: 'a number', str: 'a string'}
+
+# Sections read once at startup; changing them needs a restart
+RESTART_SECTIONS = ('storage', 'spool', 'ingestion', 'obsidian', 'daemon')
+
+
+class ConfigError(ValueError):
+    """Raised when config.json cannot be parsed or fails validation"""
+
+
+class FrozenDict(Mapping):
+    """Read-only mapping; nested objects and lists are frozen too"""
+
+    def __init__(self, data: Mapping):
+        self._data = {key: freeze(value) for key, value in data.items()}
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._data!r})"
+
+    def thaw(self) -> Dict:
+        """A mutable deep copy, e.g. to edit and save"""
+        return thaw(self)
+
+
+def freeze(value):
+    if isinstance(value, Mapping):
+        return FrozenDict(value)
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+class KeywordMatcher:
+    """Matches text containing any of a fixed set of literal keywords
+
+    Substring scans beat one regex alternation of the same keywords by
+    several times with CPython's `re`, so the keywords are kept as a
+    deduplicated tuple rather than compiled.
+    """
+
+    __slots__ = ('keywords',)
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(keyword for keyword in keywords if keyword))
+
+    def search(self, text: str) -> bool:
+        for keyword in self.keywords:
+            if keyword in text:
+                return True
+        return False
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, KeywordMatcher) and self.keywords == other.keywords
+
+    def __repr__(self) -> str:
+        return f"KeywordMatcher({list(self.keywords)!r})"
+
+
+def keyword_matcher(keywords: Iterable[str]) -> Optional[KeywordMatcher]:
+    """A matcher for the literal keywords, or None when there are none"""
+    matcher = KeywordMatcher(keywords)
+    return matcher if matcher.keywords else None
+
+
+def _lookup(data: Mapping, name: str, default):
+    value = data
+    for part in name.split('.'):
+        if not isinstance(value, Mapping) or part not in value:
+            return default
+        value = value[part]
+    return value
+
+
+def validate(data: Mapping) -> List[str]:
+    """Problems found in a raw configuration, empty when it is valid"""
+    if not isinstance(data, Mapping):
+        return ['configuration must be a JSON object']
+
+    errors = []
+    for name, (default, kind, minimum) in SETTINGS.items():
+        value = _lookup(data, name, default)
+        if isinstance(kind, tuple):
+            if value not in kind:
+                errors.append(f"{name} must be one of {', '.join(kind)}, not {value!r}")
+            continue
+        # JSON integers are fine where a float is expected, but booleans never are
+        if isinstance(value, bool) != (kind is bool) or \
+                not isinstance(value, (int, float) if kind is float else kind):
+            errors.append(f"{name} must be {TYPE_NAMES[kind]}, not {value!r}")
+        elif minimum is not None and value < minimum:
+            errors.append(f"{name} must be at least {minimum}, not {value!r}")
+
+    port = _lookup(data, 'ingestion.port', 8765)
+    if isinstance(port, int) and port > 65535:
+        errors.append(f"ingestion.port must be at most 65535, not {port}")
+
+    platforms = data.get('platforms', {})
+    if not isinstance(platforms, Mapping):
+        errors.append('platforms must be an object')
+        platforms = {}
+    for platform, platform_config in platforms.items():
+        if not isinstance(platform_config, Mapping):
+            errors.append(f"platforms.{platform} must be an object")
+            continue
+        if not isinstance(platform_config.get('enabled', False), bool):
+            errors.append(f"platforms.{platform}.enabled must be true or false")
+        patterns = platform_config.get('url_patterns', [])
+        if not isinstance(patterns, (list, tuple)) or \
+                not all(isinstance(pattern, str) for pattern in patterns):
+            errors.append(f"platforms.{platform}.url_patterns must be a list of strings")
+
+    seeds = _lookup(data, 'processing.categorization.project_seeds', {})
+    if not isinstance(seeds, Mapping) or not all(
+            isinstance(keywords, (list, tuple)) and all(isinstance(k, str) for k in keywords)
+            for keywords in seeds.values()):
+        errors.append('processing.categorization.project_seeds must map projects to keyword lists')
+
+    return errors
+
+
+class AppConfig(FrozenDict):
+    """The application configuration, validated once and frozen
+
+    Reads like the config.json dict it was loaded from, so sections can
+    still be handed to components as before. `value` returns a setting
+    with its default already applied.
+    """
+
+    def __init__(self, data: Mapping, path: Optional[Path] = None):
+        errors = validate(data)
+        if errors:
+            raise ConfigError('Invalid configuration:\n  ' + '\n  '.join(errors))
+        super().__init__(data)
+        self.path = Path(path) if path is not None else None
+        self.settings = {name: _lookup(self, name, default)
+                         for name, (default, _, _) in SETTINGS.items()}
+
+    def value(self, name: str):
+        """A setting from SETTINGS by dotted name, e.g. 'sync.interval_minutes'"""
+        return self.settings[name]
+
+    def changed_sections(self, other: 'AppConfig') -> List[str]:
+        """Top-level sections that differ from `other`"""
+        return sorted(key for key in set(self) | set(other) if self.get(key) != other.get(key))
+
+
+def load_config(path) -> AppConfig:
+    """Read, validate and freeze config.json
+
+    A missing file gives the defaults, as before; an invalid one raises ConfigError.
+    """
+    path = Path(path)
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        print(f"Config file not found: {path}")
+        data = {}
+    except ValueError as e:
+        raise ConfigError(f"Cannot parse {path}: {e}")
+    return AppConfig(data, path)
+
+
+class ConfigWatcher:
+    """Reloads the config file when it changes
+
+    The file is polled with `stat`, which is cheap enough to do every
+    couple of seconds. Each valid new version is handed to `on_change`
+    whole, so callers swap their rules in one step; an invalid version is
+    reported and the current configuration stays in force.
+    """
+
+    def __init__(self, config: AppConfig, on_change: Callable):
+        self.config = config
+        self.on_change = on_change
+        self.signature = self._signature()
+
+    def _signature(self):
+        try:
+            info = os.stat(self.config.path)
+        except (OSError, TypeError):
+            return None
+        return info.st_mtime_ns, info.st_size, info.st_ino
+
+    def check(self) -> Optional[AppConfig]:
+        """The new configuration if the file changed and is valid, else None"""
+        signature = self._signature()
+        if signature is None or signature == self.signature:
+            return None
+        self.signature = signature
+
+        try:
+            config = load_config(self.config.path)
+        except ConfigError as e:
+            print(f"Keeping the current configuration. {e}")
+            return None
+        if config == self.config:
+            return None
+        self.config = config
+        return config
+
+    async def watch(self):
+        # Imported here: the CLI loads config on every call, and commands answered
+        # by the daemon never need asyncio
+        import asyncio
+
+        while True:
+            await asyncio.sleep(self.config.value('config_reload.interval_seconds'))
+            config = self.check()
+            if config is not None:
+                result = self.on_change(config)
+                if asyncio.iscoroutine(result):
+                    await result
@@ -0,0 +1 @@
+# GPT Gulp Benchmarks Module
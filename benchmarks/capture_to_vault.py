@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Capture-to-Vault Load Test
+Replays a storm of VS Code chat file writes through the file watcher,
+spool, storage, processing and Obsidian export
+
+Usage: python -m benchmarks.capture_to_vault [--rate 50] [--duration 20]
+       [--json report.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from collectors.collector_supervisor import resource_usage, spool_dir
+from collectors.vscode_collector import VSCodeCollector
+from main import GPTGulp
+from storage.capture_spool import CaptureSpool
+
+REPO = Path(__file__).resolve().parents[1]
+
+TOPICS = ['login form', 'css grid', 'api client', 'database query', 'deploy script', 'react hook']
+
+TURN = (
+    "User [{time}]: How do I fix the {topic} bug? ref {marker}\n\n"
+    "Assistant: Try this:\n"
+    "```python\ndef handle_{n}(request):\n"
+    "    items = load_items(request.user)\n"
+    "    return render(request, 'page_{n}.html', {{'items': items}})\n```\n"
+    "- Check the {topic} settings\n"
+)
+
+# Metrics shown by --compare, and whether a lower value is better
+COMPARED = [
+    ('latency_p50_ms', True), ('latency_p99_ms', True), ('dropped', True),
+    ('peak_rss_mb', True), ('db_growth_bytes', True), ('achieved_ops_per_second', False),
+]
+
+
+class WriteStorm:
+    """Creates, appends to and rotates chat files at a target rate
+
+    Every write carries a unique marker, so a note shows exactly which
+    writes reached it. A rotation renames a file aside and starts a new one
+    at its path, as chat history logs do.
+    """
+
+    def __init__(self, root: Path, args):
+        self.root = root
+        self.rate = args.rate
+        self.total = int(args.rate * args.duration)
+        self.weights = [('create', args.create_ratio), ('rotate', args.rotate_ratio),
+                        ('append', max(0.0, 1 - args.create_ratio - args.rotate_ratio))]
+        self.workspaces = [root / f"{n:032x}" for n in range(args.workspaces)]
+        self.rng = random.Random(42)
+        self.files = []
+        self.counts = {kind: 0 for kind, _ in self.weights}
+        self.max_lag = 0.0
+        self.finished_at = None
+
+        # Marker -> write time, per file, until a note contains it
+        self.pending = {}
+        self.latencies = []
+        self.last_delivery = time.perf_counter()
+        self.lock = threading.Lock()
+
+        for workspace in self.workspaces:
+            (workspace / 'chat').mkdir(parents=True)
+
+    def _turn(self, n: int) -> tuple:
+        marker = f"op{n:07d}"
+        return marker, TURN.format(time=datetime.now().isoformat(timespec='seconds'),
+                                   topic=self.rng.choice(TOPICS), marker=marker, n=n)
+
+    def _write(self, path: Path, n: int, mode: str):
+        marker, turn = self._turn(n)
+        with self.lock:
+            self.pending.setdefault(str(path), {})[marker] = time.perf_counter()
+        with open(path, mode, encoding='utf-8') as f:
+            f.write(turn if mode == 'w' else "\n" + turn)
+
+    def run(self):
+        started = time.perf_counter()
+        for n in range(self.total):
+            # Writes are scheduled at fixed times; falling behind shows as lag
+            delay = started + n / self.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self.max_lag = max(self.max_lag, -delay)
+
+            kind = self.rng.choices([kind for kind, _ in self.weights],
+                                    [weight for _, weight in self.weights])[0]
+            if not self.files:
+                kind = 'create'
+            if kind == 'create':
+                path = self.rng.choice(self.workspaces) / 'chat' / f"chat-session-{n}.json"
+                self.files.append(path)
+                self._write(path, n, 'w')
+            elif kind == 'append':
+                self._write(self.rng.choice(self.files), n, 'a')
+            else:
+                path = self.rng.choice(self.files)
+                rotated = path.with_name(path.name + '.1')
+                os.replace(path, rotated)
+                # Writes not yet in a note now live only in the rotated file
+                with self.lock:
+                    self.pending.setdefault(str(rotated), {}).update(self.pending.pop(str(path), {}))
+                self._write(path, n, 'w')
+            self.counts[kind] += 1
+        self.finished_at = time.perf_counter()
+
+    def delivered(self, conversation: dict):
+        """Record the writes whose markers a just-exported note contains"""
+        now = time.perf_counter()
+        content = conversation.get('raw_content') or ''
+        with self.lock:
+            pending = self.pending.get(conversation.get('source_file'), {})
+            for marker in [marker for marker in pending if marker in content]:
+                self.latencies.append(now - pending.pop(marker))
+                self.last_delivery = now
+
+    def undelivered(self, rotated: bool = False) -> int:
+        with self.lock:
+            return sum(len(markers) for path, markers in self.pending.items()
+                       if not rotated or path.endswith('.1'))
+
+
+class StormCollector(VSCodeCollector):
+    """The VS Code collector, watching the storm's tree and counting watcher events"""
+
+    def __init__(self, config, spool, root: Path):
+        super().__init__(config, spool=spool)
+        self.vscode_paths = [root]
+        self.events = 0
+
+    def handle_file_change(self, filepath: str):
+        self.events += 1
+        super().handle_file_change(filepath)
+
+
+class StormApp(GPTGulp):
+    """The app, telling the storm about each note it exports"""
+
+    def __init__(self, config_path: str, storm: WriteStorm):
+        super().__init__(config_path)
+        self.storm = storm
+        self.notes = 0
+
+    async def export_to_obsidian(self, conversation):
+        await super().export_to_obsidian(conversation)
+        self.notes += 1
+        self.storm.delivered(conversation)
+
+
+def write_config(args, workdir: Path) -> Path:
+    """The repo config pointed at a temp vault, with only the VS Code collector feeding it"""
+    with open(args.config) as f:
+        config = json.load(f)
+
+    config['obsidian']['vault_path'] = str(workdir / 'vault')
+    config['platforms']['vscode']['backfill']['enabled'] = False
+    config['collection']['mode'] = 'inline'
+    config['collection']['flush_interval_seconds'] = args.flush_interval
+    config.setdefault('daemon', {})['enabled'] = False
+    config.setdefault('config_reload', {})['enabled'] = False
+    config['sync']['backup_enabled'] = False
+    config['output']['auto_sync'] = False
+
+    path = workdir / 'config' / 'config.json'
+    path.parent.mkdir()
+    with open(path, 'w') as f:
+        json.dump(config, f, indent=2)
+    (workdir / 'vault').mkdir()
+    return path
+
+
+def database_bytes(app: GPTGulp) -> int:
+    db_path = app.storage.db_path
+    return sum(os.path.getsize(path) for path in
+               (db_path, Path(f"{db_path}-wal")) if os.path.exists(path))
+
+
+def percentile(values, fraction: float) -> float:
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0.0
+
+
+def git_revision() -> str:
+    try:
+        revision = subprocess.run(['git', '-C', str(REPO), 'rev-parse', '--short', 'HEAD'],
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', '-C', str(REPO), 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f"{revision}-dirty" if dirty else revision
+
+
+async def run(args, workdir: Path) -> dict:
+    storm = WriteStorm(workdir / 'workspaceStorage', args)
+    app = StormApp(str(write_config(args, workdir)), storm)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    app.spool = CaptureSpool(spool_dir(app.config, 'inline'), app.config.get('spool', {}))
+    collector = StormCollector(app.config, app.spool, storm.root)
+    db_start = database_bytes(app)
+    peak_rss = resource_usage()['rss_bytes'] or 0
+
+    tasks = [asyncio.create_task(collector.start()), asyncio.create_task(app.store_spooled())]
+    while collector.observer is None or not collector.observer.is_alive():
+        await asyncio.sleep(0.01)
+
+    started = time.perf_counter()
+    writer = threading.Thread(target=storm.run, daemon=True)
+    writer.start()
+
+    # Process on a short cycle rather than every `sync.interval_minutes`,
+    # until the storm is over and its writes stop reaching notes
+    next_pass = 0.0
+    while True:
+        await asyncio.sleep(0.05)
+        peak_rss = max(peak_rss, resource_usage()['rss_bytes'] or 0)
+        now = time.perf_counter()
+        if now >= next_pass:
+            await app.process_conversations()
+            next_pass = now + args.process_interval
+        if storm.finished_at is None:
+            continue
+        if not storm.undelivered() or now - storm.finished_at > args.drain_timeout:
+            break
+        if now - max(storm.last_delivery, storm.finished_at) > args.settle:
+            break
+    elapsed = time.perf_counter() - started
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    collector.observer.stop()
+    collector.observer.join()
+    app.spool.close()
+
+    latencies = sorted(storm.latencies)
+    written = sum(storm.counts.values())
+    return {
+        'revision': git_revision(),
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        'settings': {name: value for name, value in vars(args).items()
+                     if name not in ('json', 'compare', 'keep')},
+        'writes': storm.counts,
+        'watcher_events': collector.events,
+        'captures': collector.collected,
+        'notes_written': app.notes,
+        'delivered': len(latencies),
+        'dropped': written - len(latencies),
+        'dropped_rotated': storm.undelivered(rotated=True),
+        'latency_p50_ms': round(percentile(latencies, 0.5) * 1000, 1),
+        'latency_p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+        'latency_max_ms': round(latencies[-1] * 1000, 1) if latencies else 0.0,
+        'achieved_ops_per_second': round(written / (storm.finished_at - started), 1),
+        'max_write_lag_ms': round(storm.max_lag * 1000, 1),
+        'peak_rss_mb': round(peak_rss / (1024 * 1024), 1),
+        'db_bytes': database_bytes(app),
+        'db_growth_bytes': database_bytes(app) - db_start,
+        'elapsed_seconds': round(elapsed, 2),
+    }
+
+
+def print_report(report: dict):
+    writes = report['writes']
+    print("📊 Capture-to-Vault Load Test")
+    print("=" * 40)
+    print(f"Revision: {report['revision']}")
+    print(f"Writes: {sum(writes.values())} ({writes['create']} creates, {writes['append']} appends, "
+          f"{writes['rotate']} rotations) at {report['achieved_ops_per_second']}/s, "
+          f"max lag {report['max_write_lag_ms']}ms")
+    print(f"Watcher events: {report['watcher_events']}  Captures: {report['captures']}  "
+          f"Notes written: {report['notes_written']}")
+    print(f"Delivered to notes: {report['delivered']}  Dropped: {report['dropped']} "
+          f"({report['dropped_rotated']} in rotated files)")
+    print(f"Capture-to-note latency p50: {report['latency_p50_ms']}ms  "
+          f"p99: {report['latency_p99_ms']}ms  max: {report['latency_max_ms']}ms")
+    print(f"Peak RSS: {report['peak_rss_mb']} MB")
+    print(f"Database: {report['db_bytes'] / 1024:.0f} KB (+{report['db_growth_bytes'] / 1024:.0f} KB)")
+
+
+def print_comparison(report: dict, baseline: dict):
+    print(f"\n🔍 Against {baseline['revision']} ({baseline['recorded_at']})")
+    if baseline.get('settings') != report['settings']:
+        print("   Settings differ; the numbers may not be comparable")
+    for metric, lower_is_better in COMPARED:
+        before, after = baseline.get(metric), report[metric]
+        if before is None:
+            continue
+        change = f"{(after - before) / before:+.1%}" if before else "n/a"
+        better = after < before if lower_is_better else after > before
+        flag = "" if after == before else (" ✅" if better else " ⚠️")
+        print(f"   {metric}: {before} -> {after} ({change}){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test capture through to Obsidian notes')
+    parser.add_argument('--rate', type=float, default=50, help='File writes per second')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds of writes')
+    parser.add_argument('--workspaces', type=int, default=8)
+    parser.add_argument('--create-ratio', type=float, default=0.1)
+    parser.add_argument('--rotate-ratio', type=float, default=0.05)
+    parser.add_argument('--process-interval', type=float, default=1.0,
+                        help='Seconds between processing passes')
+    parser.add_argument('--flush-interval', type=float, default=0.2,
+                        help='Seconds between spool drains into storage')
+    parser.add_argument('--settle', type=float, default=5.0,
+                        help='Stop once no write has reached a note for this long')
+    parser.add_argument('--drain-timeout', type=float, default=60.0)
+    parser.add_argument('--config', default=str(REPO / 'config' / 'config.json'))
+    parser.add_argument('--json', help='Write the report to this file')
+    parser.add_argument('--compare', help='Report from an earlier run to compare against')
+    parser.add_argument('--keep', action='store_true', help='Keep the temp directory')
+    args = parser.parse_args()
+    args.config = os.path.abspath(args.config)
+    for option in ('json', 'compare'):
+        if getattr(args, option):
+            setattr(args, option, os.path.abspath(getattr(args, option)))
+
+    # Run against a throwaway database, spool, watched tree and vault
+    workdir = Path(tempfile.mkdtemp(prefix='gpt-gulp-storm-'))
+    os.chdir(workdir)
+    report = asyncio.run(run(args, workdir))
+
+    print_report(report)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.json}")
+    os.chdir(REPO)
+    if args.keep:
+        print(f"Temp directory kept: {workdir}")
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Ingestion Benchmark
+Local load generator for the browser ingestion server
+
+Usage: python -m benchmarks.ingestion [--clients 4] [--requests 200] [--batch 20]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from collectors.browser_collector import BrowserCollector
+from collectors.ingestion_server import encode_payload
+from storage.conversation_storage import ConversationStorage
+
+BROWSER_CONFIGS = {
+    'chatgpt': {'enabled': True, 'url_patterns': ['chat.openai.com']},
+    'claude_ai': {'enabled': True, 'url_patterns': ['claude.ai']},
+}
+
+
+def make_batch(client: int, request: int, batch: int, messages: int):
+    conversations = []
+    for n in range(batch):
+        conversations.append({
+            'id': f"bench_{client}_{request}_{n}",
+            'platform': 'chatgpt' if n % 2 else 'claude_ai',
+            'url': 'https://chat.openai.com/c/bench' if n % 2 else 'https://claude.ai/chat/bench',
+            'title': f"Benchmark conversation {client}/{request}/{n}",
+            'timestamp': int(time.time() * 1000),
+            'messages': [
+                {'role': 'user' if m % 2 == 0 else 'assistant',
+                 'content': f"Message {m} about building a responsive website with CSS grid."}
+                for m in range(messages)
+            ],
+        })
+    return encode_payload(conversations)
+
+
+async def run_client(port: int, client: int, args, latencies):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for request in range(args.requests):
+        body = make_batch(client, request, args.batch, args.messages)
+        started = time.perf_counter()
+        writer.write(
+            (f"POST /conversations HTTP/1.1\r\nHost: localhost\r\n"
+             f"Content-Type: application/json\r\nContent-Encoding: gzip\r\n"
+             f"Content-Length: {len(body)}\r\n\r\n").encode('latin-1') + body
+        )
+        await writer.drain()
+
+        headers = {}
+        status_line = await reader.readline()
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        response = json.loads(await reader.readexactly(int(headers['content-length'])))
+        latencies.append(time.perf_counter() - started)
+        if b' 200 ' not in status_line:
+            print(f"Request failed: {status_line!r} {response}")
+    writer.close()
+
+
+async def run(args):
+    storage = ConversationStorage({})
+    collector = BrowserCollector(BROWSER_CONFIGS, storage, {'port': args.port})
+    await collector.server.start()
+
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(args.port, c, args, latencies)
+                           for c in range(args.clients)))
+    elapsed = time.perf_counter() - started
+    await collector.stop()
+
+    stats = collector.get_stats()
+    messages = sum(p['messages'] for p in stats['platforms'].values())
+    conversations = sum(p['conversations'] for p in stats['platforms'].values())
+    latencies.sort()
+
+    print("📊 Ingestion Benchmark")
+    print("=" * 40)
+    print(f"Conversations: {conversations}  Messages: {messages}")
+    print(f"Elapsed: {elapsed:.3f}s")
+    print(f"Throughput: {messages / elapsed:.0f} messages/s, "
+          f"{conversations / elapsed:.0f} conversations/s")
+    print(f"Request latency p50: {latencies[len(latencies) // 2] * 1000:.1f}ms  "
+          f"p99: {latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms")
+    stored = await storage.get_storage_stats()
+    print(f"Stored conversations: {stored['total_conversations']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the ingestion server')
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--batch', type=int, default=20)
+    parser.add_argument('--messages', type=int, default=10)
+    parser.add_argument('--port', type=int, default=8799)
+    args = parser.parse_args()
+
+    # Benchmark against a throwaway database
+    os.chdir(tempfile.mkdtemp(prefix='gpt-gulp-bench-'))
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Redaction Benchmark
+Measures what secret redaction adds to conversation processing
+
+Usage: python -m benchmarks.redaction [--conversations 300] [--lines 200] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import random
+import string
+import time
+
+from processors.conversation_processor import ConversationProcessor
+
+WORDS = (
+    "the a to build website react python function error fix deploy css grid layout "
+    "component state hook data api request response server client database query index"
+).split()
+
+CODE = (
+    "```python\ndef handler_{n}(request):\n"
+    "    items = Item.objects.filter(owner=request.user)\n"
+    "    return render(request, 'page_{n}.html', {{'items': items}})\n```"
+)
+
+
+def make_secret(rng: random.Random) -> str:
+    token = ''.join(rng.choice(string.ascii_letters + string.digits) for _ in range(40))
+    return rng.choice([
+        f"export OPENAI_API_KEY=sk-proj-{token}",
+        f"aws_access_key_id = AKIA{token[:16].upper()}",
+        f"DB_PASSWORD='{token[:12]}'",
+        f"Authorization: Bearer {token}",
+    ])
+
+
+def make_conversations(count: int, lines: int, secret_every: int):
+    rng = random.Random(42)
+    conversations = []
+    for n in range(count):
+        content = []
+        for line in range(lines):
+            if line % 15 == 0:
+                content.append(CODE.format(n=line))
+            else:
+                content.append(' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 25))))
+        if secret_every and n % secret_every == 0:
+            content.insert(rng.randrange(len(content)), make_secret(rng))
+        conversations.append({
+            'id': f"bench_{n}",
+            'platform': 'chatgpt',
+            'title': f"Benchmark conversation {n}",
+            'raw_content': '\n'.join(content),
+        })
+    return conversations
+
+
+async def time_processing(processor: ConversationProcessor, conversations) -> float:
+    started = time.perf_counter()
+    await processor.process_many(conversations)
+    return time.perf_counter() - started
+
+
+async def run(args):
+    conversations = make_conversations(args.conversations, args.lines, args.secret_every)
+    characters = sum(len(c['raw_content']) for c in conversations)
+
+    plain = ConversationProcessor({'processing': {'redaction': {'enabled': False}}})
+    redacting = ConversationProcessor({})
+
+    # Alternate the two and keep each one's best round, to damp noise
+    baseline = with_redaction = float('inf')
+    for _ in range(args.rounds):
+        baseline = min(baseline, await time_processing(plain, conversations))
+        with_redaction = min(with_redaction, await time_processing(redacting, conversations))
+
+    started = time.perf_counter()
+    secrets = 0
+    for conversation in conversations:
+        secrets += sum(redacting.redactor.redact(conversation['raw_content'])[1].values())
+    redaction = time.perf_counter() - started
+
+    print("📊 Redaction Benchmark")
+    print("=" * 40)
+    print(f"Conversations: {args.conversations} ({characters // args.conversations} chars each)")
+    print(f"Secrets masked: {secrets}")
+    print(f"Redaction alone: {redaction * 1000 / args.conversations:.3f}ms/conv "
+          f"({characters / redaction / 1e6:.0f}M chars/s)")
+    print(f"Processing: {baseline * 1000 / args.conversations:.3f}ms/conv without redaction, "
+          f"{with_redaction * 1000 / args.conversations:.3f}ms/conv with")
+    print(f"Redaction share of processing: {redaction / with_redaction:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark secret redaction')
+    parser.add_argument('--conversations', type=int, default=300)
+    parser.add_argument('--lines', type=int, default=200)
+    parser.add_argument('--secret-every', type=int, default=10,
+                        help='Put a secret in every Nth conversation (0 for none)')
+    parser.add_argument('--rounds', type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Summarization Benchmark
+Measures summarizer throughput and latency offline using the local backend
+
+Usage: python -m benchmarks.summarization [--conversations 500] [--batch-size 8]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from processors.summarizers import LocalSummarizer, SummarizationService
+
+SAMPLE_TEXT = (
+    "User: How do I build a responsive portfolio website with a projects grid? "
+    "Assistant: Start with a semantic HTML layout, then add CSS grid for the projects. "
+    "You should also add media queries for small screens. Conversation {n}."
+)
+
+
+async def run(args):
+    backend = LocalSummarizer(batch_latency_ms=args.batch_latency_ms,
+                              item_latency_ms=args.item_latency_ms)
+    service = SummarizationService(
+        backend,
+        fallback=lambda text: text[:200],
+        batch_size=args.batch_size,
+        max_concurrency=args.max_concurrency,
+        timeout_seconds=args.timeout_seconds,
+    )
+
+    latencies = []
+
+    async def one(n):
+        started = time.perf_counter()
+        await service.summarize(SAMPLE_TEXT.format(n=n))
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(args.conversations)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+    print("📊 Summarization Benchmark")
+    print("=" * 40)
+    print(f"Conversations: {args.conversations}")
+    print(f"Elapsed: {elapsed:.3f}s ({args.conversations / elapsed:.1f} conv/s)")
+    print(f"Latency p50: {statistics.median(latencies) * 1000:.1f}ms  p99: {p99 * 1000:.1f}ms")
+    print(f"Batches: {service.stats['batches']}  Fallbacks: {service.stats['fallbacks']}  "
+          f"Timeouts: {service.stats['timeouts']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the summarization service')
+    parser.add_argument('--conversations', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--max-concurrency', type=int, default=2)
+    parser.add_argument('--batch-latency-ms', type=float, default=50.0)
+    parser.add_argument('--item-latency-ms', type=float, default=5.0)
+    parser.add_argument('--timeout-seconds', type=float, default=30.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,40 +5,64 @@ Command-line interface for managing AI conversation archives
 """
 
 import argparse
-import asyncio
+import csv
 import json
+import os
 import sys
 from datetime import datetime
 from pathlib import Path
 
-from main import GPTGulp
-from storage.conversation_storage import ConversationStorage
+from app_config import ConfigError, load_config
+from storage.query_client import DaemonUnavailable, QueryClient, QueryError, socket_path
+
+# The app, storage and asyncio are imported on first use, so that commands
+# answered by a running daemon skip most of the interpreter start-up cost
+
+def run(coroutine):
+    """Run a coroutine to completion"""
+    import asyncio
+    return asyncio.run(coroutine)
 
 class GPTGulpCLI:
-    def __init__(self):
+    def __init__(self, direct: bool = False):
         self.config_path = "config/config.json"
-        self.storage = None
+        self.direct = direct
         
     def load_config(self):
-        """Load configuration"""
+        """Load and validate configuration"""
+        return load_config(self.config_path)
+    
+    def open_storage(self):
+        from storage.conversation_storage import ConversationStorage
+        return ConversationStorage(self.load_config())
+    
+    def open_app(self):
+        from main import GPTGulp
+        return GPTGulp(self.config_path)
+    
+    def query(self, method, **params):
+        """Ask the running daemon; None when there is none, so the caller reads the database itself"""
+        if self.direct:
+            return None
+        path = socket_path(self.load_config())
+        if path is None:
+            return None
         try:
-            with open(self.config_path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print(f"Config file not found: {self.config_path}")
-            return {}
+            return QueryClient(path).call(method, **params)
+        except DaemonUnavailable:
+            return None
     
     async def start_collection(self):
         """Start conversation collection"""
         print("🚀 Starting GPT Gulp conversation collection...")
-        app = GPTGulp(self.config_path)
+        app = self.open_app()
         await app.run()
     
-    async def show_stats(self):
+    def show_stats(self):
         """Show collection statistics"""
-        config = self.load_config()
-        storage = ConversationStorage(config)
-        stats = await storage.get_storage_stats()
+        stats = self.query('stats')
+        if stats is None:
+            stats = run(self.open_storage().get_storage_stats())
         
         print("📊 GPT Gulp Statistics")
         print("=" * 40)
@@ -53,12 +77,22 @@ class GPTGulpCLI:
         print("\n📁 By Project:")
         for project, count in stats['by_project'].items():
             print(f"  {project}: {count}")
+        
+        if stats.get('redactions'):
+            print("\n🔒 Secrets Redacted:")
+            for detector, count in stats['redactions'].items():
+                print(f"  {detector}: {count}")
     
-    async def list_conversations(self, limit=10):
+    def list_conversations(self, limit=10, tag=None, resource=None, language=None):
         """List recent conversations"""
-        config = self.load_config()
-        storage = ConversationStorage(config)
-        conversations = await storage.get_recent_conversations(limit)
+        conversations = self.query('list', limit=limit, tag=tag, resource=resource, language=language)
+        if conversations is None:
+            storage = self.open_storage()
+            if tag or resource or language:
+                conversations = run(storage.search_conversations(tag, resource, limit=limit,
+                                                                 language=language))
+            else:
+                conversations = run(storage.get_recent_conversations(limit))
         
         print(f"💬 Recent Conversations (Last {len(conversations)})")
         print("=" * 60)
@@ -73,27 +107,153 @@ class GPTGulpCLI:
                 print(f"    🏷️  Tags: {', '.join(conv['tags'][:3])}")
             print()
     
-    async def export_conversations(self, project=None):
+    def show_analytics(self, dimension='platform', period='week', since=None,
+                       until=None, top=None, output_format='table'):
+        """Show usage trends from the daily rollups"""
+        rows = self.query('analytics', dimension=dimension, period=period,
+                          since=since, until=until, top=top)
+        if rows is None:
+            rows = run(self.open_storage().get_usage(dimension, period, since, until, top))
+        
+        columns = ['period', dimension, 'conversations']
+        if dimension == 'platform':
+            columns.append('content_bytes')
+        
+        if output_format == 'csv':
+            writer = csv.DictWriter(sys.stdout, fieldnames=columns, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+            return
+        
+        if not rows:
+            print("No usage recorded for this range")
+            return
+        
+        print(f"📈 Usage by {dimension} per {period}")
+        widths = [max(len(column), *(len(str(row[column])) for row in rows)) for column in columns]
+        print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+        print("  ".join("-" * width for width in widths))
+        for row in rows:
+            print("  ".join(str(row[column]).ljust(width) for column, width in zip(columns, widths)))
+    
+    def export_conversations(self, project=None, tag=None, resource=None, language=None, sync=False):
         """Export conversations to Obsidian"""
-        config = self.load_config()
-        app = GPTGulp(self.config_path)
-        storage = ConversationStorage(config)
+        app = None
+        result = self.query('export', project=project, tag=tag, resource=resource, language=language)
+        if result is None:
+            app = self.open_app()
+            result = run(app.export_conversations(project, tag, resource, language))
         
-        if project:
-            conversations = await storage.get_conversations_by_project(project)
-            print(f"📤 Exporting {len(conversations)} conversations for project '{project}'...")
+        print(f"📤 Exported {result['exported']} {result['selection']}")
+        print("✅ Export complete!")
+        
+        if sync:
+            self.sync_notes(app)
+    
+    def sync_notes(self, app=None):
+        """Commit exported notes to the notes repository"""
+        print("🔄 Syncing AI conversations to notes repo...")
+        
+        try:
+            result = self.query('sync') if app is None else None
+        except QueryError as e:
+            print(f"❌ {e}")
+            return
+        
+        if result is None:
+            from storage.notes_sync import GitError
+            try:
+                result = run((app or self.open_app()).sync_notes())
+            except GitError as e:
+                print(f"❌ {e}")
+                return
+        
+        if result['committed']:
+            print(f"✅ Committed {result['paths']} notes ({result['commit']})")
         else:
-            conversations = await storage.get_recent_conversations(100)
-            print(f"📤 Exporting {len(conversations)} recent conversations...")
+            print("📭 No new conversations to sync")
+    
+    async def import_export(self, path, platform=None):
+        """Import a ChatGPT or Claude data export"""
+        if not path:
+            print("❌ Usage: cli.py import <export.zip|conversations.json> [--platform chatgpt|claude_ai]")
+            return
         
-        for conv in conversations:
-            await app.export_to_obsidian(conv)
+        from collectors.export_importer import ExportImporter
+        storage = self.open_storage()
+        importer = ExportImporter(storage)
         
-        print("✅ Export complete!")
+        print(f"📥 Importing {path}...")
+        stats = await importer.import_archive(path, platform)
+        
+        if stats['resumed_from']:
+            print(f"   Resumed after {stats['resumed_from']} conversations")
+        print(f"✅ Import complete: {stats['written']} new or updated, "
+              f"{stats['unchanged']} unchanged, {stats['skipped']} empty, "
+              f"{stats['unsupported']} unsupported")
+    
+    async def recluster_projects(self):
+        """Recluster the whole archive into projects"""
+        from processors.project_clusterer import ProjectClusterer
+        config = self.load_config()
+        categorization_config = config.get('processing', {}).get('categorization', {})
+        
+        try:
+            clusterer = ProjectClusterer(categorization_config)
+        except ImportError as e:
+            print(f"❌ {e}")
+            return
+        
+        storage = self.open_storage()
+        conversations = await storage.get_conversation_texts()
+        print(f"🧮 Reclustering {len(conversations)} conversations...")
+        
+        projects = clusterer.recluster(conversations)
+        clusterer.save()
+        await storage.update_projects(projects)
+        
+        counts = {}
+        for project in projects.values():
+            counts[project] = counts.get(project, 0) + 1
+        
+        print(f"✅ Assigned {len(counts)} projects:")
+        for project, count in sorted(counts.items(), key=lambda item: -item[1]):
+            print(f"  {project}: {count}")
+    
+    async def backup_database(self):
+        """Take an online snapshot of the database"""
+        print("💾 Backing up database...")
+        app = self.open_app()
+        report = await app.backup()
+        
+        print(f"✅ Snapshot: {report['path']}")
+        print(f"   Size: {report['db_bytes'] / 1024:.1f} KB -> "
+              f"{report['compressed_bytes'] / 1024:.1f} KB compressed")
+        print(f"   Duration: {report['duration_seconds']}s "
+              f"(copy {report['copy_seconds']}s, {report['restarts']} restarts)")
+        if report['archives_copied']:
+            print(f"   Archives copied: {report['archives_copied']}")
+        if report['snapshots_removed']:
+            print(f"   Old snapshots removed: {report['snapshots_removed']}")
+    
+    async def compact_storage(self):
+        """Move old processed conversations into monthly archives"""
+        storage = self.open_storage()
+        
+        print(f"🗜️  Compacting conversations older than {storage.hot_months} months...")
+        moved = await storage.compact()
+        
+        if not moved:
+            print("✅ Nothing to compact")
+            return
+        
+        print(f"✅ Archived {sum(moved.values())} conversations:")
+        for month, count in sorted(moved.items()):
+            print(f"  {month}: {count}")
     
     async def setup_obsidian(self):
         """Set up Obsidian integration"""
-        config = self.load_config()
+        config = self.load_config().thaw()
         obsidian_config = config.get('obsidian', {})
         
         vault_path = input(f"Obsidian vault path [{obsidian_config.get('vault_path', '')}]: ").strip()
@@ -106,9 +266,11 @@ class GPTGulpCLI:
         
         config['obsidian'] = obsidian_config
         
-        # Save updated config
-        with open(self.config_path, 'w') as f:
+        # Save updated config; replace it whole so a running daemon never reloads half a file
+        temp_path = f"{self.config_path}.tmp"
+        with open(temp_path, 'w') as f:
             json.dump(config, f, indent=2)
+        os.replace(temp_path, self.config_path)
         
         print("✅ Obsidian configuration updated!")
         
@@ -122,25 +284,62 @@ class GPTGulpCLI:
 def main():
     parser = argparse.ArgumentParser(description='GPT Gulp - AI Conversation Archive System')
     parser.add_argument('command', choices=[
-        'start', 'stats', 'list', 'export', 'setup-obsidian'
+        'start', 'stats', 'list', 'export', 'import', 'recluster', 'compact',
+        'analytics', 'backup', 'sync', 'setup-obsidian'
     ], help='Command to execute')
+    parser.add_argument('path', nargs='?', help='Export archive to import')
     parser.add_argument('--project', help='Filter by project name')
+    parser.add_argument('--sync', action='store_true', help='Commit exported notes after export')
+    parser.add_argument('--tag', help='Filter by tag')
+    parser.add_argument('--resource', help='Filter by referenced file, path or URL')
+    parser.add_argument('--language', help='Filter by the language of code blocks')
     parser.add_argument('--limit', type=int, default=10, help='Limit number of results')
+    parser.add_argument('--platform', choices=['chatgpt', 'claude_ai'],
+                        help='Export format for import (auto-detected by default)')
+    parser.add_argument('--by', choices=['platform', 'project', 'tag'], default='platform',
+                        help='Analytics dimension')
+    parser.add_argument('--period', choices=['day', 'week', 'month'], default='week',
+                        help='Analytics time bucket')
+    parser.add_argument('--since', help='Analytics start date (YYYY-MM-DD)')
+    parser.add_argument('--until', help='Analytics end date (YYYY-MM-DD)')
+    parser.add_argument('--top', type=int, help='Only the N most used platforms/projects/tags')
+    parser.add_argument('--format', choices=['table', 'csv'], default='table',
+                        help='Analytics output format')
+    parser.add_argument('--direct', action='store_true',
+                        help='Read the database directly even when the daemon is running')
     
     args = parser.parse_args()
     
-    cli = GPTGulpCLI()
-    
-    if args.command == 'start':
-        asyncio.run(cli.start_collection())
-    elif args.command == 'stats':
-        asyncio.run(cli.show_stats())
-    elif args.command == 'list':
-        asyncio.run(cli.list_conversations(args.limit))
-    elif args.command == 'export':
-        asyncio.run(cli.export_conversations(args.project))
-    elif args.command == 'setup-obsidian':
-        asyncio.run(cli.setup_obsidian())
+    cli = GPTGulpCLI(direct=args.direct)
+    
+    try:
+        if args.command == 'start':
+            run(cli.start_collection())
+        elif args.command == 'stats':
+            cli.show_stats()
+        elif args.command == 'list':
+            cli.list_conversations(args.limit, args.tag, args.resource, args.language)
+        elif args.command == 'export':
+            cli.export_conversations(args.project, args.tag, args.resource, args.language, args.sync)
+        elif args.command == 'sync':
+            cli.sync_notes()
+        elif args.command == 'import':
+            run(cli.import_export(args.path, args.platform))
+        elif args.command == 'recluster':
+            run(cli.recluster_projects())
+        elif args.command == 'analytics':
+            cli.show_analytics(args.by, args.period, args.since, args.until,
+                               args.top, args.format)
+        elif args.command == 'backup':
+            run(cli.backup_database())
+        elif args.command == 'compact':
+            run(cli.compact_storage())
+        elif args.command == 'setup-obsidian':
+            run(cli.setup_obsidian())
+    except (ConfigError, QueryError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -3,52 +3,53 @@ Browser Conversation Collector
 Collects conversations from browser-based AI platforms
 """
 
-import asyncio
-import json
-import time
-from datetime import datetime
 from typing import Dict, List, Optional
 
+from collectors.collector_supervisor import browser_configs
+from collectors.ingestion_server import IngestionServer
+
 class BrowserCollector:
     """Collects conversations from browser-based AI platforms"""
     
-    def __init__(self, browser_configs: Dict):
+    def __init__(self, browser_configs: Dict, storage=None,
+                 ingestion_config: Optional[Dict] = None, spool=None):
         self.browser_configs = browser_configs
+        self.storage = storage
+        self.spool = spool
         self.conversations = []
+        self.server = IngestionServer(browser_configs, self._ingest, ingestion_config or {})
         
     async def start(self):
         """Start browser conversation collection"""
-        print("Starting browser conversation monitoring...")
-        print("Note: Browser extension integration coming soon!")
-        
-        # For now, this is a placeholder that would integrate with:
-        # 1. Browser extension
-        # 2. Browser history parsing
-        # 3. Local storage monitoring
+        print("Starting browser conversation ingestion...")
         
-        while True:
-            # Placeholder for browser monitoring
-            await self._check_browser_conversations()
-            await asyncio.sleep(60)  # Check every minute
+        # The browser extension posts batches of captured conversations
+        # to the local ingestion server
+        await self.server.serve_forever()
+    
+    def apply_config(self, config: Dict):
+        """Pick up reloaded platform settings"""
+        self.server.apply_config(browser_configs(config))
     
-    async def _check_browser_conversations(self):
-        """Check for new browser conversations"""
-        # This would integrate with browser extension or
-        # parse browser data directly
+    async def stop(self):
+        """Stop accepting conversations"""
+        await self.server.close()
+    
+    async def _ingest(self, conversations: List[Dict]):
+        """Persist a validated batch, or buffer it when no storage is attached
         
-        # For demonstration, create a sample conversation
-        if len(self.conversations) == 0:  # Only create once for demo
-            sample_conversation = {
-                'id': f"browser_{int(time.time())}",
-                'platform': 'claude_ai',
-                'timestamp': datetime.now(),
-                'title': 'Sample Browser Conversation',
-                'raw_content': 'This is a placeholder for browser-collected conversation data.',
-                'url': 'https://claude.ai/chat/sample',
-                'processed': False
-            }
-            self.conversations.append(sample_conversation)
-            print("Collected sample browser conversation")
+        With a spool, the batch is acknowledged once it is on disk there.
+        """
+        if self.spool is not None:
+            await self.spool.wait_async(self.spool.append_many(conversations))
+        elif self.storage is not None:
+            await self.storage.save_conversations(conversations)
+        else:
+            self.conversations.extend(conversations)
+    
+    def get_stats(self) -> Dict:
+        """Get per-platform ingestion counters"""
+        return {'platforms': self.server.counters, **self.server.totals}
     
     def get_conversations(self) -> List[Dict]:
         """Get collected conversations"""
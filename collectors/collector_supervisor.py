@@ -0,0 +1,300 @@
+"""
+Collector Supervisor
+Runs each collector in its own worker process and restarts crashed workers
+"""
+
+import asyncio
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app_config import AppConfig, ConfigWatcher
+from storage.capture_spool import CaptureSpool
+
+
+def enabled_collectors(config: Dict) -> List[str]:
+    """Names of the collectors enabled in config"""
+    platforms = config.get('platforms', {})
+    names = []
+    if platforms.get('vscode', {}).get('enabled'):
+        names.append('vscode')
+    if browser_configs(config):
+        names.append('browser')
+    return names
+
+
+def browser_configs(config: Dict) -> Dict:
+    browser_platforms = ['claude_ai', 'chatgpt', 'gemini', 'perplexity']
+    return {k: v for k, v in config.get('platforms', {}).items()
+            if k in browser_platforms and v.get('enabled')}
+
+
+def create_collector(name: str, config: Dict, storage=None, spool=None):
+    """Construct a collector by name
+
+    Collectors write to the spool when one is given. Otherwise, without
+    storage, they buffer conversations for the caller to drain.
+    """
+    if name == 'vscode':
+        from collectors.vscode_collector import VSCodeCollector
+        return VSCodeCollector(config, storage, spool)
+    if name == 'browser':
+        from collectors.browser_collector import BrowserCollector
+        return BrowserCollector(browser_configs(config), storage, config.get('ingestion', {}), spool)
+    raise ValueError(f"Unknown collector: {name}")
+
+
+def spool_dir(config: Dict, name: Optional[str] = None) -> Optional[Path]:
+    """Spool directory of a collector process (or of all of them), or None when spooling is off"""
+    spool_config = config.get('spool', {})
+    if not spool_config.get('enabled', True):
+        return None
+    root = Path(spool_config.get('dir', 'storage/spool'))
+    return root / name if name is not None else root
+
+
+def resource_usage() -> Dict:
+    """CPU seconds and resident memory of the current process"""
+    times = os.times()
+    rss = None
+    try:
+        with open('/proc/self/statm') as f:
+            rss = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+            # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            rss = peak if sys.platform == 'darwin' else peak * 1024
+        except ImportError:
+            pass
+    return {'cpu_seconds': times.user + times.system, 'rss_bytes': rss}
+
+
+def run_worker(name: str, config: Dict, output, acks, batch_size: int, flush_interval: float):
+    """Worker process entry point
+
+    Runs one collector on its own event loop and streams what it collects
+    to the supervisor in batches, with a heartbeat carrying resource usage.
+    With spooling on, the collector writes to the worker's spool, and a
+    batch is only removed from it once the supervisor acknowledges that
+    storage committed it, so a crash on either side loses nothing.
+    """
+    directory = spool_dir(config, name)
+    spool = CaptureSpool(directory, config.get('spool', {})) if directory is not None else None
+
+    def take_batches():
+        if spool is not None:
+            while True:
+                try:
+                    spool.commit(acks.get_nowait())
+                except queue.Empty:
+                    break
+            while True:
+                batch, position = spool.read_pending(batch_size)
+                if not batch:
+                    return
+                yield batch, position
+        else:
+            conversations = collector.get_conversations()
+            # Slice then delete, so appends from watcher threads are never lost
+            pending = len(conversations)
+            batch = conversations[:pending]
+            del conversations[:pending]
+            for start in range(0, len(batch), batch_size):
+                yield batch[start:start + batch_size], None
+
+    async def pump():
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(flush_interval)
+            # A full queue blocks here without stalling the collector's event loop
+            for batch, position in take_batches():
+                await loop.run_in_executor(None, output.put, ('batch', name, (batch, position)))
+            await loop.run_in_executor(None, output.put, ('heartbeat', name, resource_usage()))
+
+    def reload(new_config: AppConfig):
+        # Batches already taken from the spool are unaffected
+        if hasattr(collector, 'apply_config'):
+            collector.apply_config(new_config)
+
+    async def main():
+        tasks = [collector.start(), pump()]
+        if isinstance(config, AppConfig) and config.path is not None \
+                and config.value('config_reload.enabled'):
+            tasks.append(ConfigWatcher(config, reload).watch())
+        await asyncio.gather(*tasks)
+
+    collector = create_collector(name, config, spool=spool)
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+class CollectorWorker:
+    """Supervisor-side state of one worker process"""
+
+    def __init__(self, name: str, acks):
+        self.name = name
+        self.acks = acks
+        self.process = None
+        self.restarts = 0
+        self.backoff = 0.0
+        self.restart_at = 0.0
+        self.started_at = 0.0
+        self.last_heartbeat = 0.0
+        self.conversations = 0
+        self.usage = {'cpu_seconds': 0.0, 'rss_bytes': None}
+        self.usage_at = 0.0
+        self.cpu_percent = 0.0
+
+
+class CollectorSupervisor:
+    """Runs collectors in separate processes
+
+    Workers send batches of conversations over a multiprocessing queue,
+    which the supervisor hands to `sink`. A worker that exits, or stops
+    sending heartbeats, is restarted after an exponential backoff that
+    resets once the worker has stayed up for a while.
+    """
+
+    def __init__(self, config: Dict, sink: Callable, names: Optional[List[str]] = None):
+        self.sink = sink
+        self.apply_config(config)
+
+        # Spawned workers don't inherit the watchdog or event loop threads
+        self.context = multiprocessing.get_context('spawn')
+        self.queue = self.context.Queue(maxsize=1000)
+        self.stalled = False
+        self.workers = {name: CollectorWorker(name, self.context.Queue())
+                        for name in (names if names is not None else enabled_collectors(config))}
+
+    def apply_config(self, config: Dict):
+        """Use new restart and batching settings; workers reload their own collector rules"""
+        self.config = config
+        supervisor_config = config.get('collection', {})
+        self.batch_size = supervisor_config.get('batch_size', 100)
+        self.flush_interval = supervisor_config.get('flush_interval_seconds', 1.0)
+        self.initial_backoff = supervisor_config.get('restart_backoff_seconds', 1.0)
+        self.max_backoff = supervisor_config.get('max_backoff_seconds', 60.0)
+        self.heartbeat_timeout = supervisor_config.get('heartbeat_timeout_seconds', 60.0)
+        self.stable_seconds = supervisor_config.get('stable_seconds', 60.0)
+
+    def _start(self, worker: CollectorWorker):
+        worker.process = self.context.Process(
+            target=run_worker, name=f"gpt-gulp-{worker.name}", daemon=True,
+            args=(worker.name, self.config, self.queue, worker.acks,
+                  self.batch_size, self.flush_interval)
+        )
+        worker.process.start()
+        worker.started_at = worker.last_heartbeat = time.monotonic()
+        print(f"Started {worker.name} collector worker (pid {worker.process.pid})")
+
+    def _stop(self, worker: CollectorWorker):
+        if worker.process is not None and worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join(5)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+
+    async def run(self):
+        """Start every worker and supervise them until cancelled"""
+        for worker in self.workers.values():
+            self._start(worker)
+
+        receiver = asyncio.create_task(self._receive())
+        try:
+            while True:
+                await asyncio.sleep(1)
+                self._check_workers()
+        finally:
+            receiver.cancel()
+            for worker in self.workers.values():
+                self._stop(worker)
+
+    def _check_workers(self):
+        now = time.monotonic()
+        for worker in self.workers.values():
+            if worker.process is None:
+                if now >= worker.restart_at:
+                    worker.restarts += 1
+                    self._start(worker)
+                continue
+
+            if worker.process.is_alive():
+                if self.stalled or now - worker.last_heartbeat < self.heartbeat_timeout:
+                    if now - worker.started_at > self.stable_seconds:
+                        worker.backoff = 0.0
+                    continue
+                print(f"{worker.name} collector worker stopped responding, restarting")
+                self._stop(worker)
+            else:
+                print(f"{worker.name} collector worker exited with code {worker.process.exitcode}")
+
+            worker.backoff = min(self.max_backoff, max(self.initial_backoff, worker.backoff * 2))
+            worker.restart_at = now + worker.backoff
+            worker.process = None
+
+    async def _receive(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            try:
+                kind, name, payload = await loop.run_in_executor(None, self.queue.get, True, 0.5)
+            except queue.Empty:
+                continue
+
+            worker = self.workers[name]
+            now = worker.last_heartbeat = time.monotonic()
+            if kind == 'heartbeat':
+                if worker.usage_at:
+                    # A restarted worker reports from zero
+                    cpu_delta = max(0.0, payload['cpu_seconds'] - worker.usage['cpu_seconds'])
+                    worker.cpu_percent = cpu_delta / max(now - worker.usage_at, 1e-6) * 100
+                worker.usage, worker.usage_at = payload, now
+            elif kind == 'batch':
+                batch, position = payload
+                await self._store(name, batch)
+                worker.conversations += len(batch)
+                if position is not None:
+                    worker.acks.put(position)
+
+    async def _store(self, name: str, batch: List[Dict]):
+        # Retry rather than skip: acknowledging a later batch would drop this one from the spool
+        delay = self.initial_backoff
+        while True:
+            try:
+                await self.sink(batch)
+                break
+            except Exception as e:
+                print(f"Error storing conversations from {name}, retrying in {delay:.0f}s: {e}")
+                self.stalled = True
+                await asyncio.sleep(delay)
+                delay = min(self.max_backoff, delay * 2)
+        if self.stalled:
+            # Heartbeats queued up behind the failing batch
+            self.stalled = False
+            for worker in self.workers.values():
+                worker.last_heartbeat = time.monotonic()
+
+    def get_stats(self) -> Dict:
+        """Per-worker process, restart and resource usage figures"""
+        stats = {}
+        for name, worker in self.workers.items():
+            rss = worker.usage.get('rss_bytes')
+            stats[name] = {
+                'pid': worker.process.pid if worker.process is not None else None,
+                'alive': worker.process is not None and worker.process.is_alive(),
+                'restarts': worker.restarts,
+                'conversations': worker.conversations,
+                'cpu_percent': round(worker.cpu_percent, 1),
+                'cpu_seconds': round(worker.usage['cpu_seconds'], 2),
+                'rss_mb': round(rss / (1024 * 1024), 1) if rss is not None else None,
+            }
+        return stats
@@ -0,0 +1,310 @@
+"""
+Export Importer
+Streams ChatGPT and Claude data-export archives into storage
+"""
+
+import codecs
+import hashlib
+import json
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from processors.conversation_segmenter import format_turn
+from storage.conversation_storage import conversation_id as content_id
+
+
+VALUE_START = '{["-0123456789tfn'
+SCALAR_END = ',] \t\r\n'
+
+
+class JSONArrayStream:
+    """Incrementally parses the elements of a top-level JSON array
+
+    Reads the underlying binary stream in chunks and yields one element at a
+    time, so memory is bounded by the largest single element rather than
+    the whole document.
+    """
+
+    def __init__(self, stream, chunk_size: int = 1024 * 1024):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def _read(self) -> bool:
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.buffer += self.text_decoder.decode(b'', final=True)
+            self.eof = True
+            return False
+        # Drop consumed text before growing the buffer
+        self.buffer = self.buffer[self.position:] + self.text_decoder.decode(chunk)
+        self.position = 0
+        return True
+
+    def _skip(self, allowed: str) -> Optional[str]:
+        """Skip whitespace and return the next significant character"""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in ' \t\r\n':
+                self.position += 1
+            if self.position < len(self.buffer):
+                char = self.buffer[self.position]
+                if char not in allowed:
+                    raise ValueError(f"Unexpected {char!r} in JSON array")
+                return char
+            if not self._read():
+                return None
+
+    def __iter__(self) -> Iterator:
+        if self._skip('[') is None:
+            raise ValueError("Empty JSON document")
+        self.position += 1
+
+        if self._skip(']' + VALUE_START) == ']':
+            return
+
+        while True:
+            if self._skip(VALUE_START) is None:
+                raise ValueError("Unterminated JSON array")
+
+            attempt_size = 0
+            while True:
+                try:
+                    item, end = self.decoder.raw_decode(self.buffer, self.position)
+                except json.JSONDecodeError:
+                    if self.eof:
+                        raise
+                    # Only retry once the buffer has grown substantially, so
+                    # a large element is not re-parsed for every chunk
+                    attempt_size = max(attempt_size * 2, len(self.buffer) - self.position + 1)
+                    while not self.eof and len(self.buffer) - self.position < attempt_size:
+                        self._read()
+                    continue
+                if (self.buffer[self.position] not in '{["' and not self.eof
+                        and (end == len(self.buffer) or self.buffer[end] not in SCALAR_END)):
+                    # A number cut at the chunk edge parses as its prefix
+                    # (`-7` of `-7.25`), so scalars must end at a delimiter
+                    self._read()
+                    continue
+                break
+
+            self.position = end
+            yield item
+
+            separator = self._skip(',]')
+            if separator is None:
+                raise ValueError("Unterminated JSON array")
+            self.position += 1
+            if separator == ']':
+                return
+
+
+def _text_parts(parts) -> str:
+    return '\n'.join(part for part in parts if isinstance(part, str) and part.strip())
+
+
+def _parse_iso(value) -> Optional[datetime]:
+    """A Claude export timestamp as local time, or None"""
+    try:
+        timestamp = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    return timestamp.astimezone().replace(tzinfo=None)
+
+
+def _parse_epoch(value) -> Optional[datetime]:
+    """A ChatGPT export timestamp (seconds since the epoch) as local time, or None"""
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return None
+    try:
+        return datetime.fromtimestamp(value)
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+def _dict(value) -> Dict:
+    return value if isinstance(value, dict) else {}
+
+
+def map_chatgpt_conversation(item: Dict) -> Optional[Dict]:
+    """Map a ChatGPT export conversation onto the storage schema"""
+    mapping = _dict(item.get('mapping'))
+    node_id = item.get('current_node')
+
+    # Follow the active branch from the current node back to the root; a
+    # corrupt export can link nodes in a cycle
+    chain = []
+    seen = set()
+    while isinstance(node_id, str) and node_id in mapping and node_id not in seen:
+        seen.add(node_id)
+        node = _dict(mapping[node_id])
+        chain.append(node)
+        node_id = node.get('parent')
+    chain.reverse()
+
+    lines = []
+    for node in chain:
+        message = _dict(node.get('message'))
+        role = _dict(message.get('author')).get('role')
+        if role not in ('user', 'assistant'):
+            continue
+        parts = _dict(message.get('content')).get('parts')
+        text = _text_parts(parts if isinstance(parts, list) else [])
+        if text:
+            lines.append(format_turn(role.capitalize(), text, _parse_epoch(message.get('create_time'))))
+
+    if not lines:
+        return None
+
+    conversation_id = item.get('conversation_id') or item.get('id')
+    raw_content = '\n\n'.join(lines)
+    return {
+        'id': f"chatgpt_{conversation_id}" if conversation_id else content_id('chatgpt', raw_content),
+        'platform': 'chatgpt',
+        'timestamp': _parse_epoch(item.get('create_time')) or datetime.now(),
+        'title': str(item.get('title') or 'ChatGPT Conversation'),
+        'raw_content': raw_content,
+        'url': f"https://chat.openai.com/c/{conversation_id}" if conversation_id else '',
+        'processed': False
+    }
+
+
+def map_claude_conversation(item: Dict) -> Optional[Dict]:
+    """Map a Claude export conversation onto the storage schema"""
+    lines = []
+    messages = item.get('chat_messages')
+    for message in messages if isinstance(messages, list) else []:
+        if not isinstance(message, dict):
+            continue
+        content = message.get('content')
+        text = message.get('text') or _text_parts(
+            [block.get('text') for block in content
+             if isinstance(block, dict) and block.get('type') == 'text']
+            if isinstance(content, list) else []
+        )
+        if not isinstance(text, str) or not text:
+            continue
+        role = 'User' if message.get('sender') == 'human' else 'Assistant'
+        lines.append(format_turn(role, text, _parse_iso(message.get('created_at'))))
+
+    if not lines:
+        return None
+
+    conversation_id = item.get('uuid')
+    raw_content = '\n\n'.join(lines)
+    return {
+        # Without an id, the content is the only stable key
+        'id': f"claude_ai_{conversation_id}" if conversation_id else content_id('claude_ai', raw_content),
+        'platform': 'claude_ai',
+        'timestamp': _parse_iso(item.get('created_at')) or datetime.now(),
+        'title': str(item.get('name') or 'Claude Conversation'),
+        'raw_content': raw_content,
+        'url': f"https://claude.ai/chat/{conversation_id}" if conversation_id else '',
+        'processed': False
+    }
+
+
+EXPORT_MAPPERS = {
+    'chatgpt': map_chatgpt_conversation,
+    'claude_ai': map_claude_conversation,
+}
+
+
+def detect_platform(item: Dict) -> Optional[str]:
+    """Guess which platform produced an exported conversation"""
+    if 'mapping' in item:
+        return 'chatgpt'
+    if 'chat_messages' in item:
+        return 'claude_ai'
+    return None
+
+
+class ExportImporter:
+    """Imports a data export into storage in bounded batches
+
+    Progress is checkpointed in the same transaction as each batch, so an
+    interrupted import resumes where it stopped. Re-importing the same or a
+    newer export only rewrites conversations whose content changed.
+    """
+
+    def __init__(self, storage, batch_size: int = 200):
+        self.storage = storage
+        self.batch_size = batch_size
+
+    def _open(self, path: Path) -> Tuple[object, object, str]:
+        """Open conversations.json inside a zip, or a bare JSON file
+
+        Returns the zip archive (or None), the member stream and its name.
+        """
+        if zipfile.is_zipfile(path):
+            archive = zipfile.ZipFile(path)
+            members = [name for name in archive.namelist()
+                       if Path(name).name == 'conversations.json']
+            if not members:
+                archive.close()
+                raise FileNotFoundError(f"No conversations.json in {path}")
+            return archive, archive.open(members[0]), members[0]
+        return None, open(path, 'rb'), path.name
+
+    def _archive_key(self, path: Path) -> str:
+        stat = path.stat()
+        identity = f"{path.resolve()}:{stat.st_size}:{int(stat.st_mtime)}"
+        return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+    async def import_archive(self, path: str, platform: Optional[str] = None) -> Dict:
+        """Import an export archive and return counts"""
+        path = Path(path)
+        archive_key = self._archive_key(path)
+        resume_from = await self.storage.get_import_checkpoint(archive_key)
+
+        stats = {'seen': 0, 'skipped': 0, 'written': 0, 'unchanged': 0,
+                 'unsupported': 0, 'resumed_from': resume_from}
+        batch = []  # type: List[Dict]
+
+        archive, stream, member = self._open(path)
+        try:
+            for position, item in enumerate(JSONArrayStream(stream), start=1):
+                stats['seen'] += 1
+                if position <= resume_from:
+                    continue
+
+                if not isinstance(item, dict):
+                    stats['unsupported'] += 1
+                    continue
+                mapper = EXPORT_MAPPERS.get(platform or detect_platform(item))
+                try:
+                    conversation = mapper(item) if mapper else None
+                except (AttributeError, KeyError, TypeError, ValueError) as e:
+                    # Malformed beyond what the mappers check; skip just this one
+                    print(f"Skipping conversation {position} of {path.name}: {e}")
+                    conversation = None
+                if conversation is None:
+                    stats['unsupported' if mapper is None else 'skipped'] += 1
+                else:
+                    conversation['source_file'] = f"{path.name}:{member}"
+                    batch.append(conversation)
+
+                if len(batch) >= self.batch_size:
+                    await self._flush(batch, archive_key, position, stats)
+                    batch = []
+
+            await self._flush(batch, archive_key, stats['seen'], stats, completed=True)
+        finally:
+            stream.close()
+            if archive is not None:
+                archive.close()
+
+        return stats
+
+    async def _flush(self, batch: List[Dict], archive_key: str, position: int,
+                     stats: Dict, completed: bool = False):
+        written = await self.storage.import_conversations(
+            batch, archive_key, position, completed
+        )
+        stats['written'] += written
+        stats['unchanged'] += len(batch) - written
@@ -0,0 +1,73 @@
+"""
+File Checkpoint
+Persisted (path, mtime, size) records of files a collector has already ingested
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class FileCheckpoint:
+    """Tracks which version of each file has been ingested
+
+    Entries are held in memory for cheap comparisons from many threads.
+    `claim` is an atomic check-and-set, so a startup scan and the live
+    watcher racing on the same file ingest it only once. A claimed version
+    is only written to SQLite, in batches by `flush`, after `commit` says
+    its conversation is durable; until then a restart reads the file again.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.entries = {}  # path -> (mtime_ns, size)
+        self.dirty = {}  # committed versions not yet flushed
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS file_checkpoints (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER,
+                size INTEGER
+            )
+        """)
+        for path, mtime_ns, size in conn.execute(
+                "SELECT path, mtime_ns, size FROM file_checkpoints"):
+            self.entries[path] = (mtime_ns, size)
+        conn.close()
+
+    def claim(self, path: str, mtime_ns: int, size: int) -> bool:
+        """Record a file version, returning False if it was already ingested"""
+        version = (mtime_ns, size)
+        with self.lock:
+            if self.entries.get(path) == version:
+                return False
+            self.entries[path] = version
+            return True
+
+    def commit(self, path: str, mtime_ns: int, size: int):
+        """Persist a claimed file version on the next `flush`"""
+        with self.lock:
+            self.dirty[path] = (mtime_ns, size)
+
+    def release(self, path: str):
+        """Forget a claimed file so it is retried later"""
+        with self.lock:
+            self.entries.pop(path, None)
+
+    def flush(self):
+        """Write changed entries to disk"""
+        with self.lock:
+            if not self.dirty:
+                return
+            dirty, self.dirty = self.dirty, {}
+
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany(
+            "INSERT OR REPLACE INTO file_checkpoints (path, mtime_ns, size) VALUES (?, ?, ?)",
+            [(path, v[0], v[1]) for path, v in dirty.items()]
+        )
+        conn.commit()
+        conn.close()
@@ -0,0 +1,368 @@
+"""
+Ingestion Server
+Local HTTP endpoint that receives batched conversations from the browser extension
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app_config import keyword_matcher
+from processors.conversation_segmenter import format_turn
+from storage.conversation_storage import conversation_id
+
+LOOPBACK_HOSTS = ('127.0.0.1', '::1', 'localhost')
+
+# Browser extensions send their own origin; web pages send theirs and are
+# refused, so a page can't post conversations to localhost
+EXTENSION_ORIGINS = ('chrome-extension://', 'moz-extension://', 'safari-web-extension://')
+
+STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    401: 'Unauthorized',
+    403: 'Forbidden',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    415: 'Unsupported Media Type',
+    500: 'Internal Server Error',
+}
+
+
+class PayloadError(Exception):
+    """Raised for request bodies that cannot be accepted"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class IngestionServer:
+    """Minimal HTTP/1.1 server on asyncio streams
+
+    Accepts `POST /conversations` with a JSON body (optionally
+    `Content-Encoding: gzip`) holding a list of conversations, or an object
+    with a `conversations` list. Valid conversations are handed to `sink` in
+    one batch per request. Connections are kept alive between requests.
+    """
+
+    def __init__(self, browser_configs: Dict, sink: Callable, ingestion_config: Dict):
+        self.apply_config(browser_configs)
+        self.sink = sink
+        self.host = ingestion_config.get('host', '127.0.0.1')
+        self.port = ingestion_config.get('port', 8765)
+        self.unix_socket = ingestion_config.get('unix_socket')
+        self.max_request_bytes = ingestion_config.get('max_request_bytes', 16 * 1024 * 1024)
+        self.keep_alive_seconds = ingestion_config.get('keep_alive_seconds', 30)
+        self.auth_token = ingestion_config.get('auth_token')
+        self.server = None
+
+        self.counters = {}  # platform -> counters
+        self.totals = {'requests': 0, 'errors': 0, 'bytes_received': 0}
+
+    def apply_config(self, browser_configs: Dict):
+        """Swap in new platform rules; requests already being handled keep the old ones"""
+        self.browser_configs = browser_configs
+        self.url_matchers = {
+            platform: keyword_matcher(platform_config.get('url_patterns', ()))
+            for platform, platform_config in browser_configs.items()
+        }
+
+    async def start(self):
+        """Bind the server to a Unix socket or a loopback address"""
+        if self.unix_socket:
+            socket_path = Path(self.unix_socket)
+            if socket_path.exists():
+                socket_path.unlink()
+            self.server = await asyncio.start_unix_server(
+                self._handle_client, path=str(socket_path), limit=64 * 1024
+            )
+            os.chmod(socket_path, 0o600)
+            print(f"Ingestion server listening on unix:{socket_path}")
+        else:
+            if self.host not in LOOPBACK_HOSTS:
+                raise ValueError(f"Ingestion server must bind to localhost, not {self.host}")
+            self.server = await asyncio.start_server(
+                self._handle_client, self.host, self.port, limit=64 * 1024
+            )
+            print(f"Ingestion server listening on http://{self.host}:{self.port}")
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(),
+                                                          self.keep_alive_seconds)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line or not request_line.strip():
+                    break
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                    headers = await self._read_headers(reader)
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'malformed request'}, False)
+                    break
+
+                keep_alive = (version == 'HTTP/1.1' and
+                              headers.get('connection', '').lower() != 'close')
+
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                if length < 0 or length > self.max_request_bytes:
+                    # The body is not consumed, so the connection cannot be reused
+                    self.totals['errors'] += 1
+                    await self._respond(writer, 413 if length > 0 else 400,
+                                        {'error': 'invalid or oversized body'}, False)
+                    break
+
+                body = await reader.readexactly(length) if length else b''
+                self.totals['requests'] += 1
+                self.totals['bytes_received'] += length
+
+                status, payload = await self._dispatch(method, target, headers, body)
+                if status >= 400:
+                    self.totals['errors'] += 1
+                await self._respond(writer, status, payload, keep_alive)
+
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_headers(self, reader: asyncio.StreamReader) -> Dict[str, str]:
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                return headers
+            name, separator, value = line.decode('latin-1').partition(':')
+            if not separator:
+                raise ValueError("malformed header")
+            headers[name.strip().lower()] = value.strip()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Dict,
+                       keep_alive: bool):
+        body = json.dumps(payload).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def _dispatch(self, method: str, target: str, headers: Dict,
+                        body: bytes) -> Tuple[int, Dict]:
+        path = target.split('?', 1)[0]
+
+        if self.auth_token and headers.get('x-gpt-gulp-token') != self.auth_token:
+            return 401, {'error': 'invalid token'}
+        error = self._check_origin(headers)
+        if error:
+            return 403, {'error': error}
+
+        if path == '/health':
+            return 200, {'status': 'ok'}
+        if path == '/stats':
+            return 200, {'platforms': self.counters, **self.totals}
+        if path != '/conversations':
+            return 404, {'error': 'not found'}
+        if method != 'POST':
+            return 405, {'error': 'use POST'}
+        # Pages can only send JSON cross-origin after a CORS preflight, which
+        # is never granted; `text/plain` and form posts need no preflight
+        if headers.get('content-type', '').split(';', 1)[0].strip().lower() != 'application/json':
+            return 415, {'error': 'Content-Type must be application/json'}
+
+        try:
+            items = self._decode_body(headers, body)
+        except PayloadError as e:
+            return e.status, {'error': str(e)}
+
+        # One set of rules for the whole batch, even if the config reloads meanwhile
+        url_matchers = self.url_matchers
+        accepted, message_counts, rejected = [], [], []
+        for index, item in enumerate(items):
+            try:
+                conversation, message_count = self.validate(item, url_matchers)
+                accepted.append(conversation)
+                message_counts.append(message_count)
+            except ValueError as e:
+                rejected.append({'index': index, 'error': str(e)})
+                platform = item.get('platform') if isinstance(item, dict) else None
+                if isinstance(platform, str) and platform in url_matchers:
+                    self._counter(platform)['rejected'] += 1
+
+        if accepted:
+            try:
+                await self.sink(accepted)
+            except Exception as e:
+                print(f"Error storing ingested conversations: {e}")
+                return 500, {'error': 'storage failure'}
+
+            for conversation, message_count in zip(accepted, message_counts):
+                counter = self._counter(conversation['platform'])
+                counter['conversations'] += 1
+                counter['messages'] += message_count
+                counter['bytes'] += len(conversation['raw_content'])
+
+        status = 200 if accepted or not rejected else 400
+        return status, {'accepted': len(accepted), 'rejected': rejected}
+
+    def _check_origin(self, headers: Dict) -> Optional[str]:
+        """Why a request can't be from the extension or a local tool, or None"""
+        origin = headers.get('origin')
+        if origin and not origin.startswith(EXTENSION_ORIGINS):
+            return f"origin not allowed: {origin}"
+
+        # A page on a rebound DNS name reaches the port under its own host name
+        host = headers.get('host')
+        if host and not self.unix_socket:
+            name = host.rsplit(':', 1)[0] if not host.endswith(']') else host
+            if name.strip('[]') not in LOOPBACK_HOSTS:
+                return f"host not allowed: {host}"
+        return None
+
+    def _decode_body(self, headers: Dict, body: bytes) -> List:
+        encoding = headers.get('content-encoding', 'identity').lower()
+        if encoding == 'gzip':
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            try:
+                body = decompressor.decompress(body, self.max_request_bytes + 1)
+            except zlib.error:
+                raise PayloadError(400, 'invalid gzip body')
+            if len(body) > self.max_request_bytes or decompressor.unconsumed_tail:
+                raise PayloadError(413, 'decompressed body too large')
+        elif encoding != 'identity':
+            raise PayloadError(415, f"unsupported content encoding: {encoding}")
+
+        try:
+            payload = json.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            raise PayloadError(400, 'invalid JSON')
+
+        if isinstance(payload, dict):
+            payload = payload.get('conversations', [payload])
+        if not isinstance(payload, list):
+            raise PayloadError(400, 'expected a list of conversations')
+        return payload
+
+    def validate(self, item, url_matchers: Optional[Dict] = None) -> Tuple[Dict, int]:
+        """Convert an extension payload into a storage conversation
+
+        Returns the conversation and its message count. Raises ValueError
+        describing the first problem found.
+        """
+        if url_matchers is None:
+            url_matchers = self.url_matchers
+        if not isinstance(item, dict):
+            raise ValueError('conversation must be an object')
+
+        platform = item.get('platform')
+        if not isinstance(platform, str) or platform not in url_matchers:
+            raise ValueError(f"unknown or disabled platform: {platform}")
+
+        url = item.get('url') or ''
+        if not isinstance(url, str):
+            raise ValueError('url must be a string')
+        matcher = url_matchers[platform]
+        if url and matcher is not None and not matcher.search(url):
+            raise ValueError(f"url does not match {platform}")
+
+        messages = item.get('messages')
+        if messages is not None:
+            if not isinstance(messages, list):
+                raise ValueError('messages must be a list')
+            lines = []
+            for message in messages:
+                if not isinstance(message, dict) or not isinstance(message.get('content'), str):
+                    raise ValueError('each message needs string content')
+                role = str(message.get('role', 'user')).capitalize()
+                timestamp = message.get('timestamp')
+                if timestamp is not None:
+                    timestamp = self._parse_timestamp(timestamp)
+                lines.append(format_turn(role, message['content'], timestamp))
+            raw_content = '\n\n'.join(lines)
+            message_count = len(messages)
+        else:
+            raw_content = item.get('raw_content')
+            if not isinstance(raw_content, str):
+                raise ValueError('conversation needs messages or raw_content')
+            message_count = 1
+
+        if not raw_content.strip():
+            raise ValueError('conversation is empty')
+
+        # A conversation's URL is stable as it grows; fall back to its content.
+        # Client ids are scoped to their platform, so platforms can't collide.
+        if item.get('id'):
+            stable_id = f"{platform}_{item['id']}"
+        else:
+            stable_id = conversation_id(platform, url or raw_content)
+
+        conversation = {
+            'id': stable_id,
+            'platform': platform,
+            'timestamp': self._parse_timestamp(item.get('timestamp')),
+            'title': str(item.get('title') or 'Browser Conversation')[:200],
+            'raw_content': raw_content,
+            'url': url,
+            'processed': False,
+        }
+        return conversation, message_count
+
+    def _parse_timestamp(self, value) -> datetime:
+        if value is None:
+            return datetime.now()
+        if isinstance(value, bool):
+            raise ValueError(f"invalid timestamp: {value}")
+        if isinstance(value, (int, float)):
+            # Browser clocks report milliseconds since the epoch
+            try:
+                return datetime.fromtimestamp(value / 1000.0 if value > 1e11 else value)
+            except (OverflowError, OSError, ValueError):
+                raise ValueError(f"invalid timestamp: {value}")
+        try:
+            timestamp = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError(f"invalid timestamp: {value}")
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone().replace(tzinfo=None)
+        return timestamp
+
+    def _counter(self, platform: str) -> Dict:
+        if platform not in self.counters:
+            self.counters[platform] = {
+                'conversations': 0, 'messages': 0, 'bytes': 0, 'rejected': 0
+            }
+        return self.counters[platform]
+
+
+def encode_payload(conversations: List[Dict]) -> bytes:
+    """Gzip-compress a batch the way the extension sends it"""
+    return gzip.compress(json.dumps({'conversations': conversations}).encode('utf-8'))
@@ -6,13 +6,18 @@ Monitors VS Code for AI assistant conversations
 import asyncio
 import json
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+from collectors.file_checkpoint import FileCheckpoint
+from storage.conversation_storage import conversation_id
+
 class VSCodeConversationHandler(FileSystemEventHandler):
     """File system event handler for VS Code conversations"""
     
@@ -22,19 +27,60 @@ class VSCodeConversationHandler(FileSystemEventHandler):
     def on_modified(self, event):
         if not event.is_directory:
             self.collector.handle_file_change(event.src_path)
+    
+    def on_created(self, event):
+        if not event.is_directory:
+            self.collector.handle_file_change(event.src_path)
+
+class ByteThrottle:
+    """Token bucket limiting how many bytes per second backfill may read"""
+    
+    def __init__(self, bytes_per_second: float):
+        self.rate = bytes_per_second
+        self.allowance = bytes_per_second
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def consume(self, nbytes: int):
+        if self.rate <= 0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.allowance = min(self.rate, self.allowance + (now - self.last) * self.rate)
+            self.last = now
+            self.allowance -= nbytes
+            wait = -self.allowance / self.rate if self.allowance < 0 else 0
+        if wait:
+            time.sleep(wait)
 
 class VSCodeCollector:
     """Collects conversations from VS Code AI assistants"""
     
-    def __init__(self, config: Dict):
+    def __init__(self, config: Dict, storage=None, spool=None):
         self.config = config
         self.vscode_config = config.get('platforms', {}).get('vscode', {})
         self.conversations = []
+        self.storage = storage
+        self.spool = spool
+        # Ingested files whose conversations are not durable yet, as
+        # (spool sequence, path, mtime_ns, size) or, without a spool,
+        # (conversation, path, mtime_ns, size)
+        self.spooled = []
+        self.pending = []
+        self.collected = 0
         self.observer = None
         
         # VS Code paths (may vary by system)
         self.vscode_paths = self._get_vscode_paths()
         
+        backfill_config = self.vscode_config.get('backfill', {})
+        self.backfill_enabled = backfill_config.get('enabled', True)
+        self.backfill_workers = backfill_config.get('workers', 4)
+        self.throttle = ByteThrottle(backfill_config.get('max_mb_per_second', 20) * 1024 * 1024)
+        self.checkpoint = FileCheckpoint(
+            backfill_config.get('checkpoint_path', 'storage/vscode_checkpoint.db')
+        )
+        
     def _get_vscode_paths(self) -> List[Path]:
         """Get VS Code configuration and data paths"""
         home = Path.home()
@@ -70,13 +116,119 @@ class VSCodeCollector:
         try:
             # Check if this might be a conversation file
             if self._is_conversation_file(filepath):
-                conversation = self._extract_conversation(filepath)
-                if conversation:
-                    self.conversations.append(conversation)
+                self._ingest_if_changed(filepath, os.stat(filepath))
                     
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"Error handling file change {filepath}: {e}")
     
+    def _ingest_if_changed(self, filepath: str, stat, throttle: bool = False):
+        """Extract a conversation unless this file version was already ingested"""
+        if not self.checkpoint.claim(filepath, stat.st_mtime_ns, stat.st_size):
+            return
+        
+        if throttle:
+            self.throttle.consume(stat.st_size)
+        
+        try:
+            conversation = self._extract_conversation(filepath)
+        except Exception:
+            self.checkpoint.release(filepath)
+            raise
+        
+        if not conversation:
+            self.checkpoint.commit(filepath, stat.st_mtime_ns, stat.st_size)
+            return
+        
+        # The file is checkpointed by `commit_ingested` once its conversation is durable
+        if self.spool is not None:
+            sequence = self.spool.append(conversation)
+            self.spooled.append((sequence, filepath, stat.st_mtime_ns, stat.st_size))
+        elif self.storage is not None:
+            self.pending.append((conversation, filepath, stat.st_mtime_ns, stat.st_size))
+        else:
+            # Buffered for the caller; the file is read again after a restart
+            self.conversations.append(conversation)
+        self.collected += 1
+    
+    async def commit_ingested(self):
+        """Checkpoint ingested files once their conversations are durable
+        
+        Spooled conversations are waited on until synced; the others are
+        saved to storage here.
+        """
+        # Slice then delete, so appends from watcher threads are never lost
+        count = len(self.spooled)
+        if count:
+            batch = self.spooled[:count]
+            await self.spool.wait_async(max(entry[0] for entry in batch))
+            del self.spooled[:count]
+            for _, filepath, mtime_ns, size in batch:
+                self.checkpoint.commit(filepath, mtime_ns, size)
+        
+        count = len(self.pending)
+        if count:
+            batch = self.pending[:count]
+            try:
+                await self.storage.save_conversations([entry[0] for entry in batch])
+            except Exception as e:
+                # Still pending; retried on the next pass
+                print(f"Error storing VS Code conversations: {e}")
+                return
+            del self.pending[:count]
+            for _, filepath, mtime_ns, size in batch:
+                self.checkpoint.commit(filepath, mtime_ns, size)
+    
+    def backfill(self) -> Dict:
+        """Scan existing files and ingest any that are new or changed
+        
+        Directories are walked with `os.scandir` on a thread pool; each file
+        is compared with the persisted checkpoint, so only files written
+        while the collector was not running are read.
+        """
+        stats = {'directories': 0, 'files': 0, 'candidates': 0}
+        stats_lock = threading.Lock()
+        collected_before = self.collected
+        
+        def scan_directory(directory: str) -> List[str]:
+            subdirectories = []
+            files = candidates = 0
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirectories.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                files += 1
+                                if self._is_conversation_file(entry.path):
+                                    candidates += 1
+                                    self._ingest_if_changed(entry.path, entry.stat(), throttle=True)
+                        except OSError as e:
+                            print(f"Error scanning {entry.path}: {e}")
+            except OSError as e:
+                print(f"Error scanning {directory}: {e}")
+            
+            with stats_lock:
+                stats['directories'] += 1
+                stats['files'] += files
+                stats['candidates'] += candidates
+            return subdirectories
+        
+        with ThreadPoolExecutor(max_workers=self.backfill_workers) as pool:
+            futures = [pool.submit(scan_directory, str(path)) for path in self.vscode_paths]
+            while futures:
+                next_futures = []
+                for future in futures:
+                    for subdirectory in future.result():
+                        next_futures.append(pool.submit(scan_directory, subdirectory))
+                futures = next_futures
+        
+        self.checkpoint.flush()
+        stats['ingested'] = self.collected - collected_before
+        return stats
+    
     def _is_conversation_file(self, filepath: str) -> bool:
         """Check if file might contain AI conversation data"""
         filepath_lower = filepath.lower()
@@ -104,7 +256,7 @@ class VSCodeCollector:
             
             # Create conversation object
             conversation = {
-                'id': f"vscode_{int(time.time())}",
+                'id': conversation_id('vscode', filepath),
                 'platform': 'vscode',
                 'timestamp': datetime.now(),
                 'source_file': filepath,
@@ -147,15 +299,28 @@ class VSCodeCollector:
                 print(f"Error watching {path}: {e}")
         
         if self.vscode_paths:
+            # Start watching before the backfill scan so nothing written during
+            # the scan is missed; the checkpoint drops the overlap
             self.observer.start()
             
+            backfill = None
+            if self.backfill_enabled:
+                # Runs alongside the loop below, which commits what it ingests
+                backfill = asyncio.get_event_loop().run_in_executor(None, self.backfill)
+            
             try:
                 while True:
                     await asyncio.sleep(1)
+                    await self.commit_ingested()
+                    self.checkpoint.flush()
+                    if backfill is not None and backfill.done():
+                        stats = backfill.result()
+                        print(f"Backfill scanned {stats['files']} files, ingested {stats['ingested']}")
+                        backfill = None
             except KeyboardInterrupt:
                 self.observer.stop()
                 
-        self.observer.join()
+            self.observer.join()
     
     def get_conversations(self) -> List[Dict]:
         """Get collected conversations"""
@@ -4,34 +4,44 @@ Main application entry point
 """
 
 import asyncio
-import json
 import logging
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
 
-from collectors.vscode_collector import VSCodeCollector
-from collectors.browser_collector import BrowserCollector
+from app_config import RESTART_SECTIONS, AppConfig, ConfigWatcher, load_config
+from collectors.collector_supervisor import (
+    CollectorSupervisor, create_collector, enabled_collectors, spool_dir
+)
 from processors.conversation_processor import ConversationProcessor
+from processors.daily_digest import DailyDigest
+from processors.moc_generator import MOCGenerator, note_name, page_name
+from storage.backup_manager import BackupManager
+from storage.capture_spool import CaptureSpool
 from storage.conversation_storage import ConversationStorage
+from storage.notes_sync import NotesSync
+from storage.query_client import socket_path
+from storage.query_server import QueryServer
 
 class GPTGulp:
     def __init__(self, config_path: str = "config/config.json"):
-        self.config = self._load_config(config_path)
+        self.config = load_config(config_path)
         self.collectors = {}
+        self.supervisor = None
+        self.spool = None
+        self.query_server = None
         self.processor = ConversationProcessor(self.config)
         self.storage = ConversationStorage(self.config)
+        self.moc_generator = MOCGenerator(self.storage, self.config.get('obsidian', {}))
+        self.daily_digest = DailyDigest(self.config.get('obsidian', {}))
+        self.notes_sync = NotesSync(
+            self.storage, self.config.get('sync', {}), self.config.get('obsidian', {})
+        )
+        self.backup_manager = BackupManager(
+            self.storage.db_path, self.storage.archive.archive_dir, self.config.get('sync', {})
+        )
         self.setup_logging()
         
-    def _load_config(self, config_path: str) -> Dict:
-        """Load configuration from JSON file"""
-        try:
-            with open(config_path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            logging.error(f"Config file not found: {config_path}")
-            return {}
-    
     def setup_logging(self):
         """Configure logging"""
         logging.basicConfig(
@@ -46,22 +56,23 @@ class GPTGulp:
     
     def initialize_collectors(self):
         """Initialize all enabled collectors"""
-        platforms = self.config.get('platforms', {})
-        
-        if platforms.get('vscode', {}).get('enabled'):
-            self.collectors['vscode'] = VSCodeCollector(self.config)
-            
-        browser_platforms = ['claude_ai', 'chatgpt', 'gemini', 'perplexity']
-        browser_configs = {k: v for k, v in platforms.items() 
-                          if k in browser_platforms and v.get('enabled')}
-        
-        if browser_configs:
-            self.collectors['browser'] = BrowserCollector(browser_configs)
+        for name in enabled_collectors(self.config):
+            self.collectors[name] = create_collector(name, self.config, self.storage, self.spool)
     
     async def start_collection(self):
         """Start all collectors"""
         self.logger.info("Starting GPT Gulp conversation collection...")
         
+        # Store what a previous run captured but never committed
+        await self.replay_spools()
+        
+        if self.config.value('collection.mode') == 'supervised':
+            await self.start_supervised_collection()
+            return
+        
+        directory = spool_dir(self.config, 'inline')
+        if directory is not None:
+            self.spool = CaptureSpool(directory, self.config.get('spool', {}))
         self.initialize_collectors()
         
         # Start all collectors concurrently
@@ -70,23 +81,174 @@ class GPTGulp:
             self.logger.info(f"Starting {name} collector...")
             tasks.append(asyncio.create_task(collector.start()))
         
+        if tasks and self.spool is not None:
+            tasks.append(asyncio.create_task(self.store_spooled()))
+        
         if tasks:
             await asyncio.gather(*tasks)
         else:
             self.logger.warning("No collectors enabled")
     
+    async def drain_spool(self, spool: CaptureSpool) -> int:
+        """Store every pending spooled conversation, committing it out of the spool"""
+        batch_size = self.config.value('collection.batch_size')
+        stored = 0
+        while True:
+            batch, position = spool.read_pending(batch_size)
+            if not batch:
+                return stored
+            try:
+                await self.storage.save_conversations(batch)
+            except Exception:
+                spool.rewind()
+                raise
+            spool.commit(position)
+            stored += len(batch)
+    
+    async def store_spooled(self):
+        """Move conversations from the inline collectors' spool into storage"""
+        while True:
+            await asyncio.sleep(self.config.value('collection.flush_interval_seconds'))
+            try:
+                await self.drain_spool(self.spool)
+            except Exception as e:
+                # Still spooled; retried on the next pass
+                self.logger.error(f"Error storing spooled conversations: {e}")
+    
+    async def replay_spools(self):
+        """Store conversations left in any collector's spool"""
+        root = spool_dir(self.config)
+        if root is None or not root.exists():
+            return
+        
+        for directory in sorted(path for path in root.iterdir() if path.is_dir()):
+            spool = CaptureSpool(directory, self.config.get('spool', {}))
+            try:
+                stored = await self.drain_spool(spool)
+            finally:
+                spool.close()
+            if stored:
+                self.logger.info(f"Replayed {stored} spooled conversations from {directory.name}")
+    
+    async def start_supervised_collection(self):
+        """Run each collector in its own worker process"""
+        self.supervisor = CollectorSupervisor(self.config, self.storage.save_conversations)
+        if not self.supervisor.workers:
+            self.logger.warning("No collectors enabled")
+            return
+        
+        report_task = asyncio.create_task(self.report_workers())
+        try:
+            await self.supervisor.run()
+        finally:
+            report_task.cancel()
+    
+    async def report_workers(self):
+        """Log per-worker CPU and memory every `collection.report_interval_seconds`"""
+        while True:
+            await asyncio.sleep(self.config.value('collection.report_interval_seconds'))
+            for name, stats in self.supervisor.get_stats().items():
+                self.logger.info(
+                    f"Worker {name}: pid {stats['pid']}, cpu {stats['cpu_percent']}%, "
+                    f"rss {stats['rss_mb']} MB, {stats['conversations']} conversations, "
+                    f"{stats['restarts']} restarts"
+                )
+    
     async def process_conversations(self):
         """Process collected conversations"""
         conversations = await self.storage.get_unprocessed_conversations()
         
-        for conversation in conversations:
+        # Process as a batch so summaries can be vectorized or batched onto
+        # a backend; the backend's own semaphore bounds work in flight
+        results = await self.processor.process_many(conversations)
+        exported = []
+        
+        for processed in results:
+            if isinstance(processed, Exception):
+                self.logger.error(f"Error processing conversation: {processed}")
+                continue
+            
             try:
-                processed = await self.processor.process(conversation)
                 await self.storage.save_processed_conversation(processed)
                 await self.export_to_obsidian(processed)
+                exported.append(processed)
                 
             except Exception as e:
                 self.logger.error(f"Error processing conversation: {e}")
+        
+        await self.update_daily_notes(exported)
+        await self.update_mocs()
+    
+    async def update_daily_notes(self, conversations: List[Dict]):
+        """Add or patch conversations' lines in their daily notes"""
+        vault_path = Path(self.config.get('obsidian', {}).get('vault_path', ''))
+        if not conversations or not vault_path.exists():
+            return
+        
+        stats = self.daily_digest.update(conversations)
+        await self.storage.record_exports(
+            [(str(Path(path).resolve()), change) for path, change in stats['paths']]
+        )
+        if stats['notes']:
+            self.logger.info(f"Updated {stats['notes']} daily notes "
+                             f"({stats['added']} added, {stats['updated']} changed)")
+    
+    async def update_mocs(self):
+        """Rewrite the project and resource MOC notes that changed"""
+        vault_path = Path(self.config.get('obsidian', {}).get('vault_path', ''))
+        if not vault_path.exists():
+            return
+        
+        stats = await self.moc_generator.update()
+        await self.storage.record_exports(
+            [(str(Path(path).resolve()), change) for path, change in stats['paths']]
+        )
+        if stats['written'] or stats['removed']:
+            self.logger.info(f"Updated {stats['written']} MOC notes, removed {stats['removed']}")
+    
+    async def list_conversations(self, limit: int = 10, tag: str = None,
+                                 resource: str = None, language: str = None) -> List[Dict]:
+        """Recent conversations, optionally filtered by tag, resource or code language"""
+        if tag or resource or language:
+            return await self.storage.search_conversations(tag, resource, limit=limit, language=language)
+        return await self.storage.get_recent_conversations(limit)
+    
+    async def export_conversations(self, project: str = None, tag: str = None,
+                                   resource: str = None, language: str = None) -> Dict:
+        """Export a selection of conversations with their daily notes and MOCs"""
+        if tag or resource or language:
+            conversations = await self.storage.search_conversations(tag, resource, project, language=language)
+            filters = ', '.join(f"{name} '{value}'" for name, value in
+                                [('project', project), ('tag', tag), ('resource', resource),
+                                 ('language', language)] if value)
+            selection = f"conversations for {filters}"
+        elif project:
+            conversations = await self.storage.get_conversations_by_project(project)
+            selection = f"conversations for project '{project}'"
+        else:
+            conversations = await self.storage.get_recent_conversations(100)
+            selection = "recent conversations"
+        
+        for conv in conversations:
+            await self.export_to_obsidian(conv)
+        await self.update_daily_notes(conversations)
+        await self.update_mocs()
+        return {'exported': len(conversations), 'selection': selection}
+    
+    async def serve_queries(self):
+        """Answer CLI queries on the daemon's Unix socket"""
+        path = socket_path(self.config)
+        if path is None:
+            return
+        
+        self.query_server = QueryServer(path, self.storage.db_path, {
+            'stats': self.storage.get_storage_stats,
+            'list': self.list_conversations,
+            'analytics': self.storage.get_usage,
+            'export': self.export_conversations,
+            'sync': self.sync_notes,
+        }, cached=('stats', 'list', 'analytics'))
+        await self.query_server.serve_forever()
     
     async def export_to_obsidian(self, conversation: Dict):
         """Export processed conversation to Obsidian vault"""
@@ -102,12 +264,15 @@ class GPTGulp:
         ai_folder.mkdir(exist_ok=True)
         
         # Generate filename
-        date_str = conversation['timestamp'].strftime('%Y-%m-%d')
-        platform = conversation['platform']
-        topic = conversation.get('topic', 'conversation')[:50]  # Limit length
+        filepath = (ai_folder / f"{note_name(conversation)}.md").resolve()
+        changes = [(str(filepath), 'write')]
         
-        filename = f"{date_str}_{platform}_{topic}.md"
-        filepath = ai_folder / filename
+        # A changed topic renames the note; remove the old file
+        previous = await self.storage.get_note_path(conversation['id'])
+        if previous and previous != str(filepath):
+            if Path(previous).exists():
+                Path(previous).unlink()
+            changes.append((previous, 'delete'))
         
         # Generate markdown content
         markdown_content = self._generate_markdown(conversation)
@@ -115,6 +280,9 @@ class GPTGulp:
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(markdown_content)
         
+        # Record the change for the next notes-repo sync
+        await self.storage.record_exports(changes, (conversation['id'], str(filepath)))
+        
         self.logger.info(f"Exported conversation to: {filepath}")
     
     def _generate_markdown(self, conversation: Dict) -> str:
@@ -143,8 +311,10 @@ class GPTGulp:
 ## Files/Resources Referenced
 """
         
+        # Link each resource to its MOC note
         for resource in conversation.get('resources', []):
-            content += f"- [[{resource}]]\n"
+            name = page_name(resource)
+            content += f"- [[{resource}]]\n" if name == resource else f"- [[{name}|{resource}]]\n"
         
         if conversation.get('include_full_conversation'):
             content += f"""
@@ -154,6 +324,53 @@ class GPTGulp:
         
         return content
 
+    async def backup(self) -> Dict:
+        """Take a database snapshot and log its report"""
+        report = await self.backup_manager.backup()
+        self.logger.info(
+            f"Backup {report['path']}: {report['db_bytes']} bytes -> "
+            f"{report['compressed_bytes']} compressed in {report['duration_seconds']}s "
+            f"(copy {report['copy_seconds']}s, {report['restarts']} restarts)"
+        )
+        return report
+    
+    async def run_backups(self):
+        """Take snapshots every `sync.backup_interval_hours`"""
+        while True:
+            try:
+                await self.backup()
+            except Exception as e:
+                self.logger.error(f"Backup failed: {e}")
+            await asyncio.sleep(self.config.value('sync.backup_interval_hours') * 3600)
+    
+    def apply_config(self, config: AppConfig):
+        """Switch to a reloaded configuration without restarting
+        
+        Components swap their rules in one assignment, so a batch that is
+        being processed finishes under the rules it started with.
+        """
+        changed = config.changed_sections(self.config)
+        self.config = config
+        self.processor.apply_config(config)
+        self.storage.redactor = self.processor.redactor
+        for collector in self.collectors.values():
+            if hasattr(collector, 'apply_config'):
+                collector.apply_config(config)
+        if self.supervisor is not None:
+            self.supervisor.apply_config(config)
+        
+        self.logger.info(f"Reloaded configuration: {', '.join(changed) or 'no'} sections changed")
+        restart = [section for section in changed if section in RESTART_SECTIONS]
+        if restart:
+            self.logger.warning(f"Changes to {', '.join(restart)} take effect after a restart")
+    
+    async def sync_notes(self) -> Dict:
+        """Commit the notes changed since the last sync to the notes repository"""
+        result = await self.notes_sync.sync()
+        if result['committed']:
+            self.logger.info(f"Committed {result['paths']} notes as {result['commit']}")
+        return result
+    
     async def run(self):
         """Main run loop"""
         self.logger.info("GPT Gulp starting...")
@@ -161,13 +378,27 @@ class GPTGulp:
         # Start collection and processing concurrently
         collection_task = asyncio.create_task(self.start_collection())
         
+        if self.config.value('sync.backup_enabled'):
+            backup_task = asyncio.create_task(self.run_backups())
+        
+        if self.config.value('config_reload.enabled'):
+            reload_task = asyncio.create_task(ConfigWatcher(self.config, self.apply_config).watch())
+        
+        query_task = asyncio.create_task(self.serve_queries())
+        
         # Process conversations periodically
         while True:
             await self.process_conversations()
             
+            # One notes-repo commit per sync window
+            if self.config.value('output.auto_sync'):
+                try:
+                    await self.sync_notes()
+                except Exception as e:
+                    self.logger.error(f"Notes sync failed: {e}")
+            
             # Wait for sync interval
-            sync_interval = self.config.get('sync', {}).get('interval_minutes', 30)
-            await asyncio.sleep(sync_interval * 60)
+            await asyncio.sleep(self.config.value('sync.interval_minutes') * 60)
 
 if __name__ == "__main__":
     app = GPTGulp()
@@ -3,25 +3,165 @@ Conversation Processor
 Processes and summarizes AI conversations
 """
 
+import asyncio
 import re
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from app_config import keyword_matcher
+from processors.conversation_segmenter import USER_ROLES, Segments, format_duration, segment
+from processors.extractive_summarizer import ExtractiveSummarizer
+from processors.project_clusterer import DEFAULT_PROJECT_SEEDS, ProjectClusterer
+from processors.secret_redactor import SecretRedactor
+from processors.summarizers import SummarizationService
+from processors.text_features import numpy_available
+
+# Built once rather than on every conversation
+TAG_MATCHERS = [(tag, keyword_matcher(keywords)) for tag, keywords in [
+    # Technology tags
+    ('python', ['python', 'py', 'django', 'flask']),
+    ('javascript', ['javascript', 'js', 'node', 'react', 'vue']),
+    ('web', ['html', 'css', 'web', 'frontend', 'backend']),
+    ('ai', ['ai', 'artificial intelligence', 'machine learning', 'ml']),
+    ('data', ['data', 'analysis', 'visualization', 'csv']),
+    ('git', ['git', 'github', 'version control']),
+    ('deployment', ['deploy', 'netlify', 'aws', 'hosting']),
+    # Activity tags
+    ('development', ['create', 'build', 'develop']),
+    ('debugging', ['fix', 'debug', 'error', 'issue']),
+    ('help', ['help', 'how', 'question']),
+]]
+
+URL_PATTERN = re.compile(r'https?://[^\s<>"\']+|www\.[^\s<>"\']+\.[a-zA-Z]{2,}')
+
+RESOURCE_PATTERNS = [
+    re.compile(r'[a-zA-Z0-9_/-]+\.[a-zA-Z]{2,4}'),  # Files with extensions
+    re.compile(r'`[^`]+`'),  # Code spans might contain filenames
+    URL_PATTERN,  # URLs
+]
+
+# In code, `name.attr` is mostly attribute access; only quoted paths count
+CODE_RESOURCE_PATTERNS = [
+    re.compile(r'["\']([a-zA-Z0-9_./-]+\.[a-zA-Z]{2,4})["\']'),
+    URL_PATTERN,  # URLs
+]
 
 class ConversationProcessor:
     """Processes AI conversations for summarization and categorization"""
     
     def __init__(self, config: Dict):
+        self.apply_config(config)
+        self.summarizer = SummarizationService.from_config(
+            self.processing_config.get('summarization', {}),
+            self._heuristic_summary
+        )
+        self.extractive = self._create_extractive_summarizer()
+        self.clusterer = self._create_project_clusterer()
+        
+    def apply_config(self, config: Dict):
+        """Swap in new keyword and redaction rules; summarizer and clustering settings need a restart"""
         self.config = config
         self.processing_config = config.get('processing', {})
+        self.redactor = SecretRedactor.from_config(self.processing_config.get('redaction', {}))
+        project_seeds = self.processing_config.get('categorization', {}).get(
+            'project_seeds', DEFAULT_PROJECT_SEEDS
+        )
+        matchers = [(project, keyword_matcher(keywords)) for project, keywords in project_seeds.items()]
+        self.project_matchers = [(project, matcher) for project, matcher in matchers if matcher]
+    
+    def _create_extractive_summarizer(self):
+        """Create the TF-IDF/TextRank summarizer if `summary_style` selects it"""
+        summarization_config = self.processing_config.get('summarization', {})
+        if summarization_config.get('summary_style') not in ExtractiveSummarizer.STYLES:
+            return None
         
-    async def process(self, conversation: Dict) -> Dict:
+        if not numpy_available():
+            print("numpy is not installed; falling back to heuristic summaries")
+            return None
+        
+        return ExtractiveSummarizer(summarization_config)
+    
+    def _create_project_clusterer(self):
+        """Create the project clusterer if clustering is enabled"""
+        categorization_config = self.processing_config.get('categorization', {})
+        if not categorization_config.get('project_detection', True):
+            return None
+        if not categorization_config.get('clustering', {}).get('enabled', False):
+            return None
+        
+        if not numpy_available():
+            print("numpy is not installed; falling back to keyword project detection")
+            return None
+        
+        return ProjectClusterer(categorization_config)
+    
+    async def process_many(self, conversations: List[Dict]) -> List:
+        """Process a batch of conversations concurrently
+        
+        Extractive summaries are computed for the whole batch in one
+        vectorized pass. Failed conversations are returned as exceptions.
+        """
+        # Secrets are masked first, so no later stage ever sees them
+        conversations = [self.prepare(c) for c in conversations]
+        
+        summaries = [None] * len(conversations)
+        if self.extractive is not None and self.summarizer is None:
+            contents = [c.get('raw_content', '') for c in conversations]
+            summaries = [
+                summary or self._heuristic_summary(self._summary_text(conversation))
+                for summary, conversation in zip(self.extractive.summarize_batch(contents), conversations)
+            ]
+        
+        results = await asyncio.gather(
+            *(self.process(c, summary) for c, summary in zip(conversations, summaries)),
+            return_exceptions=True
+        )
+        
+        if self.clusterer is not None and conversations:
+            self.clusterer.save()
+        
+        return results
+    
+    def redact(self, conversation: Dict) -> Dict:
+        """A copy of the conversation with secrets in its content masked
+        
+        `redactions` counts the secrets masked per detector. Content is
+        normally redacted when it is stored, so this mostly finds secrets
+        in conversations stored before redaction was enabled.
+        """
+        redacted = conversation.copy()
+        redacted['redactions'] = {}
+        if self.redactor is not None:
+            redacted['raw_content'], redacted['redactions'] = \
+                self.redactor.redact(conversation.get('raw_content') or '')
+        return redacted
+    
+    def prepare(self, conversation: Dict) -> Dict:
+        """A redacted copy of the conversation, with its turns and code blocks in `segments`
+        
+        Segments stored with the content are reused unless redaction
+        changed the content.
+        """
+        prepared = self.redact(conversation)
+        if prepared['redactions'] or prepared.get('segments') is None:
+            prepared['segments'] = segment(prepared.get('raw_content') or '')
+        return prepared
+    
+    def _segments(self, conversation: Dict) -> Segments:
+        return conversation.get('segments') or segment(conversation.get('raw_content') or '')
+    
+    async def process(self, conversation: Dict, summary: Optional[str] = None) -> Dict:
         """Process a conversation and return enhanced version"""
         
+        # Mask secrets and segment, unless process_many already has
+        if 'redactions' not in conversation:
+            conversation = self.prepare(conversation)
+        
         # Create processed conversation
         processed = conversation.copy()
         
         # Generate summary
-        processed['summary'] = self._generate_summary(conversation)
+        processed['summary'] = summary or await self._summarize(conversation)
         
         # Extract key points
         processed['key_points'] = self._extract_key_points(conversation)
@@ -45,13 +185,34 @@ class ConversationProcessor:
         
         return processed
     
+    async def _summarize(self, conversation: Dict) -> str:
+        """Summarize via the configured backend, falling back to the heuristic"""
+        if self.summarizer is None:
+            return self._generate_summary(conversation)
+        
+        return await self.summarizer.summarize(conversation.get('raw_content', ''))
+    
     def _generate_summary(self, conversation: Dict) -> str:
         """Generate a summary of the conversation"""
         content = conversation.get('raw_content', '')
         
-        # Simple extractive summarization
-        # In a real implementation, you might use an AI model here
+        if self.extractive is not None:
+            # Scored against the corpus as it is; only `process_many` adds
+            # to it, saving it once per batch
+            summary = self.extractive.summarize_batch([content], update_corpus=False)[0]
+            if summary:
+                return summary
         
+        return self._heuristic_summary(self._summary_text(conversation))
+    
+    def _summary_text(self, conversation: Dict) -> str:
+        """What the user asked, without code; all prose when no turn is the user's"""
+        content = conversation.get('raw_content', '')
+        segments = self._segments(conversation)
+        return segments.prose(content, USER_ROLES) or segments.prose(content)
+    
+    def _heuristic_summary(self, content: str) -> str:
+        """Simple extractive summary used when no backend is configured"""
         lines = content.split('\n')
         important_lines = []
         
@@ -78,7 +239,8 @@ class ConversationProcessor:
     
     def _extract_key_points(self, conversation: Dict) -> List[str]:
         """Extract key points from the conversation"""
-        content = conversation.get('raw_content', '')
+        # Bullets and numbered lines inside code are not key points
+        content = self._segments(conversation).prose(conversation.get('raw_content', ''))
         key_points = []
         
         # Look for action items, decisions, or important statements
@@ -109,21 +271,15 @@ class ConversationProcessor:
     
     def _detect_project(self, conversation: Dict) -> str:
         """Detect which project this conversation relates to"""
+        if self.clusterer is not None:
+            return self.clusterer.assign(conversation)
+        
         content = conversation.get('raw_content', '').lower()
         source_file = conversation.get('source_file', '').lower()
         
-        # Common project indicators
-        project_patterns = {
-            'portfolio': ['portfolio', 'personal website', 'resume'],
-            'todo-app': ['todo', 'task', 'reminder'],
-            'consulting': ['consulting', 'client', 'business'],
-            'mlb': ['baseball', 'mlb', 'home run', 'sports'],
-            'water-cycle': ['water', 'cycle', 'environment'],
-            'case-study': ['case study', 'analysis', 'research']
-        }
-        
-        for project, keywords in project_patterns.items():
-            if any(keyword in content or keyword in source_file for keyword in keywords):
+        # Seed projects and their prebuilt keyword matchers
+        for project, matcher in self.project_matchers:
+            if matcher.search(content) or matcher.search(source_file):
                 return project
         
         return 'general'
@@ -131,7 +287,7 @@ class ConversationProcessor:
     def _extract_topic(self, conversation: Dict) -> str:
         """Extract the main topic/subject"""
         title = conversation.get('title', '')
-        content = conversation.get('raw_content', '')
+        content = self._summary_text(conversation)
         
         # Try to extract from title first
         if title and len(title) > 5:
@@ -154,62 +310,40 @@ class ConversationProcessor:
         
         tags = [platform, project]
         
-        # Technology tags
-        tech_keywords = {
-            'python': ['python', 'py', 'django', 'flask'],
-            'javascript': ['javascript', 'js', 'node', 'react', 'vue'],
-            'web': ['html', 'css', 'web', 'frontend', 'backend'],
-            'ai': ['ai', 'artificial intelligence', 'machine learning', 'ml'],
-            'data': ['data', 'analysis', 'visualization', 'csv'],
-            'git': ['git', 'github', 'version control'],
-            'deployment': ['deploy', 'netlify', 'aws', 'hosting']
-        }
-        
-        for tag, keywords in tech_keywords.items():
-            if any(keyword in content for keyword in keywords):
+        for tag, matcher in TAG_MATCHERS:
+            if matcher.search(content):
                 tags.append(tag)
         
-        # Activity tags
-        if any(word in content for word in ['create', 'build', 'develop']):
-            tags.append('development')
-        if any(word in content for word in ['fix', 'debug', 'error', 'issue']):
-            tags.append('debugging')
-        if any(word in content for word in ['help', 'how', 'question']):
-            tags.append('help')
-        
         return list(set(tags))  # Remove duplicates
     
     def _extract_resources(self, conversation: Dict) -> List[str]:
         """Extract referenced files, URLs, or resources"""
         content = conversation.get('raw_content', '')
+        segments = self._segments(conversation)
         resources = []
         
-        # Extract file paths
-        file_patterns = [
-            r'[a-zA-Z0-9_/-]+\.[a-zA-Z]{2,4}',  # Files with extensions
-            r'`[^`]+`',  # Code blocks might contain filenames
-        ]
-        
-        for pattern in file_patterns:
-            matches = re.findall(pattern, content)
-            resources.extend(matches)
+        # Extract file paths, code spans and URLs from the prose
+        prose = segments.prose(content)
+        for pattern in RESOURCE_PATTERNS:
+            resources.extend(pattern.findall(prose))
         
-        # Extract URLs
-        url_pattern = r'https?://[^\s<>"\']+|www\.[^\s<>"\']+\.[a-zA-Z]{2,}'
-        urls = re.findall(url_pattern, content)
-        resources.extend(urls)
+        # Only quoted paths and URLs from code blocks
+        for code in segments.code(content):
+            for pattern in CODE_RESOURCE_PATTERNS:
+                resources.extend(pattern.findall(code))
         
         # Clean and filter resources
-        clean_resources = []
+        clean_resources = {}
         for resource in resources:
             resource = resource.strip('`"\'')
-            if len(resource) > 3 and resource not in clean_resources:
-                clean_resources.append(resource)
+            if len(resource) > 3:
+                clean_resources.setdefault(resource, None)
         
-        return clean_resources[:20]  # Limit to 20 resources
+        return list(clean_resources)[:20]  # Limit to 20 resources
     
     def _calculate_duration(self, conversation: Dict) -> str:
-        """Calculate conversation duration if possible"""
-        # This would need timestamp data from the conversation
-        # For now, return placeholder
-        return "Unknown"
+        """Time from the first to the last timestamped turn"""
+        timestamps = self._segments(conversation).timestamps()
+        if len(timestamps) < 2:
+            return "Unknown"
+        return format_duration((max(timestamps) - min(timestamps)).total_seconds())
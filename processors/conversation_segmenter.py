@@ -0,0 +1,171 @@
+"""
+Conversation Segmenter
+Splits conversation text into turns and fenced code blocks
+"""
+
+import re
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Sequence
+
+# Collectors write each message as `Role: text`, or `Role [timestamp]: text`
+# when its time is known, and separate messages with a blank line. The
+# separator is matched separately from the first header, so that searches
+# for later headers can skip ahead to each blank line.
+FIRST_HEADER = re.compile(
+    r'(User|Assistant|Human|System|Tool)(?: \[(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)\])?: '
+)
+TURN_HEADER = re.compile(r'\n\n' + FIRST_HEADER.pattern)
+USER_ROLES = ('User', 'Human')
+
+# An opening or closing code fence; the info string names the language.
+# FENCE_LINE finds fences at the start of a line, FENCE one at the start of
+# a turn, which follows its header on the same line.
+FENCE = re.compile(r'[ \t]{0,3}(`{3,}|~{3,})([^\n]*)')
+FENCE_LINE = re.compile(r'(?<![^\n])' + FENCE.pattern)
+
+LANGUAGE_ALIASES = {
+    'py': 'python', 'python3': 'python', 'js': 'javascript', 'jsx': 'javascript',
+    'ts': 'typescript', 'tsx': 'typescript', 'sh': 'bash', 'shell': 'bash',
+    'zsh': 'bash', 'console': 'bash', 'yml': 'yaml', 'rb': 'ruby', 'rs': 'rust',
+    'golang': 'go', 'c++': 'cpp', 'cs': 'csharp', 'c#': 'csharp',
+}
+
+
+class Turn(NamedTuple):
+    """One message; `start` and `end` are offsets of its text in the content"""
+    role: str
+    timestamp: Optional[datetime]
+    start: int
+    end: int
+
+
+class CodeBlock(NamedTuple):
+    """The code inside a fence; `turn` is None outside any turn"""
+    turn: Optional[int]
+    language: str
+    start: int
+    end: int
+
+
+class Segments(NamedTuple):
+    turns: List[Turn]
+    code_blocks: List[CodeBlock]
+
+    def prose(self, text: str, roles: Optional[Sequence[str]] = None) -> str:
+        """Text of the turns by `roles` (all of them by default) without their code blocks
+
+        Content without turns counts as one turn by every role.
+        """
+        if self.turns:
+            regions = [(index, turn.start, turn.end) for index, turn in enumerate(self.turns)
+                       if roles is None or turn.role in roles]
+        else:
+            regions = [(None, 0, len(text))]
+
+        parts = []
+        for index, start, end in regions:
+            position = start
+            for block in self.code_blocks:
+                if block.turn == index and start <= block.start <= end:
+                    # Cut the fence lines along with the code
+                    parts.append(text[position:max(text.rfind('\n', start, block.start - 1) + 1, start)])
+                    position = text.find('\n', block.end + 1, end)
+                    if position == -1:
+                        position = end
+            parts.append(text[position:end])
+        return '\n\n'.join(part.strip() for part in parts if part.strip())
+
+    def code(self, text: str) -> List[str]:
+        return [text[block.start:block.end] for block in self.code_blocks]
+
+    def timestamps(self) -> List[datetime]:
+        return [turn.timestamp for turn in self.turns if turn.timestamp is not None]
+
+
+def format_turn(role: str, text: str, timestamp: Optional[datetime] = None) -> str:
+    """A message as collectors write it into conversation content"""
+    if timestamp is None:
+        return f"{role}: {text}"
+    return f"{role} [{timestamp.isoformat(timespec='seconds')}]: {text}"
+
+
+def normalize_language(info: str) -> str:
+    words = info.strip().split()
+    language = words[0].lower().lstrip('{.') if words else ''
+    return LANGUAGE_ALIASES.get(language, language)
+
+
+def _code_blocks(text: str, turn: Optional[int], start: int, end: int) -> List[CodeBlock]:
+    if text.find('```', start, end) == -1 and text.find('~~~', start, end) == -1:
+        return []
+    fences = list(FENCE_LINE.finditer(text, start, end))
+    if not fences or fences[0].start() != start:
+        first = FENCE.match(text, start, end)
+        if first:
+            fences.insert(0, first)
+
+    blocks = []
+    opening = None
+    for fence in fences:
+        marker, info = fence.group(1), fence.group(2)
+        if opening is None:
+            # ```code``` on one line is inline code, not a fence
+            if marker[0] == '`' and '`' in info:
+                continue
+            opening = marker
+            language = normalize_language(info)
+            code_start = min(fence.end() + 1, end)
+        elif marker[0] == opening[0] and len(marker) >= len(opening) and not info.strip():
+            blocks.append(CodeBlock(turn, language, code_start, max(fence.start() - 1, code_start)))
+            opening = None
+
+    # An unclosed fence runs to the end of its turn
+    if opening is not None:
+        blocks.append(CodeBlock(turn, language, code_start, end))
+    return blocks
+
+
+def segment(text: str) -> Segments:
+    """Split conversation content into its turns and code blocks
+
+    Content that doesn't follow the collectors' `Role: text` layout, such
+    as files read by the VS Code collector, has no turns; its code blocks
+    are still found.
+    """
+    text = text or ''
+    first = FIRST_HEADER.match(text)
+    headers = ([first] if first else []) + list(TURN_HEADER.finditer(text))
+    ends = [header.start() for header in headers[1:]] + [len(text)]
+
+    turns = []
+    for header, end in zip(headers, ends):
+        timestamp = None
+        if header.group(2):
+            try:
+                timestamp = datetime.fromisoformat(header.group(2))
+            except ValueError:
+                # Well-formed but impossible, such as month 13
+                pass
+        turns.append(Turn(header.group(1), timestamp, header.end(), end))
+
+    code_blocks = []
+    if not headers or headers[0].start() > 0:
+        code_blocks.extend(_code_blocks(text, None, 0, headers[0].start() if headers else len(text)))
+    for index, turn in enumerate(turns):
+        code_blocks.extend(_code_blocks(text, index, turn.start, turn.end))
+    return Segments(turns, code_blocks)
+
+
+def format_duration(seconds: float) -> str:
+    """Human-readable length of a conversation, such as `45s` or `1h 05m`"""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m" if not seconds else f"{minutes}m {seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"{hours}h {minutes:02d}m"
+    days, hours = divmod(hours, 24)
+    return f"{days}d {hours}h"
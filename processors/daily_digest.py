@@ -0,0 +1,204 @@
+"""
+Daily Digest
+Patches each day's conversations into a marker block in the Obsidian daily note
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, List
+
+from processors.moc_generator import note_name
+
+BLOCK_START = '<!-- gpt-gulp:start -->'
+BLOCK_END = '<!-- gpt-gulp:end -->'
+LINE_ID = re.compile(r'<!-- gpt-gulp:(.+?) -->\s*$')
+
+
+class DailyDigest:
+    """Keeps a digest of the day's conversations in the matching daily note
+
+    Each conversation owns one line in a marker block, tagged with its id.
+    An update renders only the conversations passed to it, replacing their
+    own lines or appending them; other lines and anything outside the
+    block are left as they are. Notes whose lines are unchanged are not
+    written at all, and when every line is new only those lines are
+    written in place; the note is rewritten only when an entry changed.
+    """
+
+    def __init__(self, obsidian_config: Dict):
+        self.vault_path = Path(obsidian_config.get('vault_path', ''))
+        self.folder = self.vault_path / obsidian_config.get('daily_notes_folder', 'Daily Notes')
+        self.note_format = obsidian_config.get('daily_note_format', '%Y-%m-%d')
+        self.heading = obsidian_config.get('daily_digest_heading', '## AI Conversations')
+        self.notes = {}  # path -> _Note as last read or written
+
+    def render_line(self, conversation: Dict) -> str:
+        time_str = conversation['timestamp'].strftime('%H:%M')
+        title = (conversation.get('title') or note_name(conversation)).replace('|', '-').replace('\n', ' ')
+        summary = ' '.join((conversation.get('summary') or '').split())
+        if len(summary) > 160:
+            summary = summary[:157].rstrip() + '...'
+        line = f"- {time_str} **{conversation['platform']}** [[{note_name(conversation)}|{title}]]"
+        if summary:
+            line += f": {summary}"
+        return f"{line} <!-- gpt-gulp:{conversation['id']} -->"
+
+    def update(self, conversations: List[Dict]) -> Dict:
+        """Patch the daily notes of the given conversations
+
+        Returns counts, and the (path, change) of every note written.
+        """
+        by_note = {}
+        for conversation in conversations:
+            name = conversation['timestamp'].strftime(self.note_format)
+            by_note.setdefault(name, []).append(conversation)
+
+        stats = {'notes': 0, 'added': 0, 'updated': 0, 'paths': []}
+        for name, day_conversations in by_note.items():
+            path = self.folder / f"{name}.md"
+            added, updated = self._patch(path, name, day_conversations)
+            if added or updated:
+                stats['notes'] += 1
+                stats['paths'].append((str(path), 'write'))
+            stats['added'] += added
+            stats['updated'] += updated
+        return stats
+
+    def _patch(self, path: Path, name: str, conversations: List[Dict]):
+        conversations = sorted(conversations, key=lambda c: c['timestamp'])
+        note = self._load(path)
+        if note is not None:
+            rendered = {c['id']: self.render_line(c) for c in conversations}
+            if all(note.lines.get(conversation_id, line) == line
+                   for conversation_id, line in rendered.items()):
+                new = [(i, line) for i, line in rendered.items() if i not in note.lines]
+                if new:
+                    self._append(path, note, new)
+                return len(new), 0
+        return self._rewrite(path, name, conversations)
+
+    def _load(self, path: Path):
+        """The note's digest lines and where its end marker sits
+
+        Served from the last sync while the note is unchanged on disk, so
+        appending to a day does not re-read it. None when the note does
+        not exist or its block needs repairing.
+        """
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            self.notes.pop(path, None)
+            return None
+        note = self.notes.get(path)
+        if note is None or note.version != (stat.st_mtime_ns, stat.st_size):
+            with open(path, 'rb') as f:
+                note = _parse_note(f.read())
+            if note is None:
+                self.notes.pop(path, None)
+                return None
+            note.version = (stat.st_mtime_ns, stat.st_size)
+            self.notes[path] = note
+        return note
+
+    def _append(self, path: Path, note: '_Note', new: List):
+        # Only the new lines and the few bytes after them are written
+        data = ''.join(line + '\n' for _, line in new).encode('utf-8')
+        with open(path, 'r+b') as f:
+            f.seek(note.end)
+            f.write(data + note.tail)
+        stat = path.stat()
+        note.lines.update(new)
+        note.end += len(data)
+        note.version = (stat.st_mtime_ns, stat.st_size)
+
+    def _rewrite(self, path: Path, name: str, conversations: List[Dict]):
+        if path.exists():
+            with open(path, 'rb') as f:
+                text = f.read().decode('utf-8')
+        else:
+            text = f"# {name}\n"
+
+        start = text.find(BLOCK_START)
+        end = text.find(BLOCK_END, start) if start != -1 else -1
+        if start == -1 or end == -1:
+            # No digest yet: add an empty block at the end of the note
+            text = text.rstrip('\n') + f"\n\n{self.heading}\n{BLOCK_START}\n{BLOCK_END}\n"
+            start, end = text.find(BLOCK_START), text.find(BLOCK_END)
+
+        body_start = text.find('\n', start) + 1
+        if body_start == 0 or body_start > end:
+            # Markers on one line after a manual edit
+            text = text[:start] + f"{BLOCK_START}\n" + text[end:]
+            body_start = start + len(BLOCK_START) + 1
+            end = body_start
+        lines = text[body_start:end].splitlines()
+        positions = {}
+        for index, line in enumerate(lines):
+            match = LINE_ID.search(line)
+            if match:
+                positions[match.group(1)] = index
+
+        added = updated = 0
+        for conversation in conversations:
+            line = self.render_line(conversation)
+            index = positions.get(conversation['id'])
+            if index is None:
+                positions[conversation['id']] = len(lines)
+                lines.append(line)
+                added += 1
+            elif lines[index] != line:
+                lines[index] = line
+                updated += 1
+
+        if not added and not updated:
+            return 0, 0
+
+        body = ''.join(line + '\n' for line in lines)
+        data = (text[:body_start] + body + text[end:]).encode('utf-8')
+
+        # Write to a temporary file first so an open editor never sees a partial note
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + '.gulp-tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        note = _parse_note(data)
+        if note is not None:
+            stat = path.stat()
+            note.version = (stat.st_mtime_ns, stat.st_size)
+            self.notes[path] = note
+        return added, updated
+
+
+class _Note:
+    """What an append needs to know about a daily note"""
+
+    __slots__ = ('lines', 'end', 'tail', 'version')
+
+    def __init__(self, lines: Dict[str, str], end: int, tail: bytes):
+        self.lines = lines      # conversation id -> its digest line
+        self.end = end          # byte offset of the end marker
+        self.tail = tail        # everything from the end marker on
+        self.version = None     # (mtime_ns, size) the note was read at
+
+
+def _parse_note(data: bytes):
+    start = data.find(BLOCK_START.encode())
+    end = data.find(BLOCK_END.encode(), start) if start != -1 else -1
+    if start == -1 or end == -1:
+        return None
+    body_start = data.find(b'\n', start) + 1
+    if body_start == 0 or body_start > end:
+        return None
+    body = data[body_start:end].decode('utf-8')
+    if body and not body.endswith('\n'):
+        # An end marker sharing a line with an entry; rewrite to split it off
+        return None
+    lines = {}
+    for line in body.splitlines():
+        match = LINE_ID.search(line)
+        if match:
+            lines[match.group(1)] = line
+    return _Note(lines, end, data[end:])
@@ -0,0 +1,153 @@
+"""
+Extractive Summarizer
+TF-IDF and TextRank sentence extraction, vectorized over batches of conversations
+"""
+
+from typing import Dict, List
+
+from processors.text_features import (
+    CorpusStatistics, FeatureHasher, np, split_sentences
+)
+
+
+class ExtractiveSummarizer:
+    """Scores sentences against corpus-wide TF-IDF weights
+
+    A whole batch of conversations is flattened into one (sentence, feature)
+    occurrence array so scoring is a handful of NumPy operations instead of
+    a Python loop per sentence. Corpus statistics are updated from each
+    batch before scoring, so weights track the archive as it grows.
+    """
+
+    STYLES = ('tfidf', 'textrank')
+
+    def __init__(self, summarization_config: Dict):
+        if np is None:
+            raise ImportError("Extractive summarization requires numpy")
+
+        self.style = summarization_config.get('summary_style', 'tfidf')
+        self.max_sentences = summarization_config.get('summary_sentences', 3)
+        self.max_candidates = summarization_config.get('max_candidate_sentences', 200)
+        self.batch_size = summarization_config.get('extractive_batch_size', 1000)
+
+        n_features = summarization_config.get('hash_features', 2 ** 18)
+        self.hasher = FeatureHasher(n_features)
+        self.corpus = CorpusStatistics(
+            n_features, summarization_config.get('corpus_stats_path', 'storage/corpus_stats.npz')
+        )
+
+    def summarize_batch(self, texts: List[str], update_corpus: bool = True) -> List[str]:
+        """Summarize texts in chunks of `extractive_batch_size`"""
+        summaries = []
+        for start in range(0, len(texts), self.batch_size):
+            summaries.extend(self._summarize_chunk(texts[start:start + self.batch_size],
+                                                   update_corpus))
+        if update_corpus and texts:
+            self.corpus.save()
+        return summaries
+
+    def _summarize_chunk(self, texts: List[str], update_corpus: bool) -> List[str]:
+        sentences, sentence_doc, token_sentence, token_feature = self._vectorize(texts)
+
+        if update_corpus:
+            self.corpus.update(sentence_doc[token_sentence] if token_sentence.size else [],
+                               token_feature, len(texts))
+
+        summaries = [''] * len(texts)
+        if not sentences:
+            return summaries
+
+        weights = self.corpus.idf()[token_feature]
+        if self.style == 'textrank':
+            scores = self._textrank_scores(len(sentences), sentence_doc,
+                                           token_sentence, token_feature, weights)
+        else:
+            scores = self._tfidf_scores(len(sentences), token_sentence, weights)
+
+        for doc, indices in self._top_sentences(sentence_doc, scores):
+            summaries[doc] = ' '.join(sentences[i] for i in indices)
+
+        return summaries
+
+    def _vectorize(self, texts: List[str]):
+        """Flatten a batch into sentences and (sentence, feature) occurrences"""
+        sentences = []
+        sentence_doc = []
+        token_sentence = []
+        token_feature = []
+
+        for doc, text in enumerate(texts):
+            for sentence in split_sentences(text)[:self.max_candidates]:
+                features = self.hasher.features(sentence)
+                if not features:
+                    continue
+                sentence_id = len(sentences)
+                sentences.append(sentence)
+                sentence_doc.append(doc)
+                token_feature.extend(features)
+                token_sentence.extend([sentence_id] * len(features))
+
+        return (
+            sentences,
+            np.asarray(sentence_doc, dtype=np.int64),
+            np.asarray(token_sentence, dtype=np.int64),
+            np.asarray(token_feature, dtype=np.int64),
+        )
+
+    def _tfidf_scores(self, n_sentences, token_sentence, weights):
+        """Sum of term weights, damped by sentence length"""
+        totals = np.bincount(token_sentence, weights=weights, minlength=n_sentences)
+        lengths = np.bincount(token_sentence, minlength=n_sentences)
+        return totals / np.sqrt(np.maximum(lengths, 1))
+
+    def _textrank_scores(self, n_sentences, sentence_doc, token_sentence,
+                         token_feature, weights, damping=0.85, iterations=30):
+        """PageRank over each conversation's TF-IDF cosine similarity graph"""
+        scores = np.zeros(n_sentences)
+        token_doc = sentence_doc[token_sentence]
+        doc_bounds = np.searchsorted(token_doc, np.arange(token_doc.max() + 2))
+        sentence_bounds = np.searchsorted(sentence_doc, np.arange(sentence_doc.max() + 2))
+
+        for doc in range(len(doc_bounds) - 1):
+            t0, t1 = doc_bounds[doc], doc_bounds[doc + 1]
+            s0, s1 = sentence_bounds[doc], sentence_bounds[doc + 1]
+            n = s1 - s0
+            if n == 0:
+                continue
+            if n <= 2:
+                scores[s0:s1] = 1.0 / n
+                continue
+
+            columns, local_features = np.unique(token_feature[t0:t1], return_inverse=True)
+            matrix = np.zeros((n, len(columns)))
+            np.add.at(matrix, (token_sentence[t0:t1] - s0, local_features), weights[t0:t1])
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.maximum(norms, 1e-12)
+
+            similarity = matrix @ matrix.T
+            np.fill_diagonal(similarity, 0.0)
+            out_weight = similarity.sum(axis=1, keepdims=True)
+            transition = np.divide(similarity, out_weight,
+                                   out=np.full_like(similarity, 1.0 / n),
+                                   where=out_weight > 0)
+
+            rank = np.full(n, 1.0 / n)
+            for _ in range(iterations):
+                rank = (1 - damping) / n + damping * (transition.T @ rank)
+            scores[s0:s1] = rank
+
+        return scores
+
+    def _top_sentences(self, sentence_doc, scores):
+        """Yield (doc, sentence indices in original order) for the top sentences"""
+        order = np.lexsort((-scores, sentence_doc))
+        ordered_docs = sentence_doc[order]
+        group_start = np.searchsorted(ordered_docs, ordered_docs)
+        rank = np.arange(len(order)) - group_start
+
+        chosen = np.sort(order[rank < self.max_sentences])
+        chosen_docs = sentence_doc[chosen]
+        bounds = np.flatnonzero(np.diff(chosen_docs)) + 1
+
+        for group in np.split(chosen, bounds):
+            yield int(sentence_doc[group[0]]), group.tolist()
@@ -0,0 +1,94 @@
+"""
+MOC Generator
+Writes Obsidian map-of-content notes for projects and referenced resources
+"""
+
+import hashlib
+import re
+from pathlib import Path
+from typing import Dict, List
+
+UNSAFE_NAME = re.compile(r'[\\/:*?"<>|#^\[\]]+')
+
+PAGE_FOLDERS = {
+    'project': 'Projects',
+    'resource': 'Resources',
+}
+
+
+def note_name(conversation: Dict) -> str:
+    """File name (without .md) of a conversation's exported note"""
+    date_str = conversation['timestamp'].strftime('%Y-%m-%d')
+    topic = (conversation.get('topic', 'conversation') or '')[:50]  # Limit length
+    return f"{date_str}_{conversation['platform']}_{topic}"
+
+
+def page_name(key: str) -> str:
+    """Note name of a project or resource MOC, safe as an Obsidian file name"""
+    name = UNSAFE_NAME.sub('_', key).strip(' ._') or 'untitled'
+    if len(name) > 100 or name != key:
+        # Keep names unique when unsafe characters are replaced or truncated
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]
+        name = f"{name[:100]}_{digest}"
+    return name
+
+
+class MOCGenerator:
+    """Regenerates the MOC notes touched since the last export
+
+    Storage marks pages dirty as conversations are processed or moved
+    between projects. Each dirty page is rendered from its current link
+    set, and only written when the rendered note differs from the last one.
+    """
+
+    def __init__(self, storage, obsidian_config: Dict):
+        self.storage = storage
+        self.obsidian_config = obsidian_config
+
+    def folder(self) -> Path:
+        vault_path = Path(self.obsidian_config.get('vault_path', ''))
+        ai_folder = self.obsidian_config.get('ai_conversations_folder', 'AI Conversations')
+        return vault_path / ai_folder / self.obsidian_config.get('moc_folder', 'MOCs')
+
+    def render(self, kind: str, key: str, links: List[Dict]) -> str:
+        heading = f"Project: {key}" if kind == 'project' else key
+        lines = [f"# {heading}", "", f"{len(links)} conversations", ""]
+        for link in links:
+            date_str = link['timestamp'].strftime('%Y-%m-%d')
+            lines.append(f"- {date_str} [[{note_name(link)}|{link['title'] or note_name(link)}]]")
+        return '\n'.join(lines) + '\n'
+
+    async def update(self) -> Dict:
+        """Rewrite changed MOC pages
+
+        Returns counts, and the (path, change) of every file touched.
+        """
+        stats = {'checked': 0, 'written': 0, 'removed': 0, 'paths': []}
+        pages = await self.storage.get_dirty_pages()
+        written = []
+
+        for kind, key, previous_hash, revision in pages:
+            stats['checked'] += 1
+            path = self.folder() / PAGE_FOLDERS[kind] / f"{page_name(key)}.md"
+            links = await self.storage.get_page_links(kind, key)
+
+            if not links:
+                if path.exists():
+                    path.unlink()
+                    stats['removed'] += 1
+                    stats['paths'].append((str(path), 'delete'))
+                written.append((kind, key, None, revision))
+                continue
+
+            content = self.render(kind, key, links)
+            digest = hashlib.sha1(content.encode('utf-8')).hexdigest()
+            if digest != previous_hash or not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                stats['written'] += 1
+                stats['paths'].append((str(path), 'write'))
+            written.append((kind, key, digest, revision))
+
+        await self.storage.save_page_state(written)
+        return stats
@@ -0,0 +1,233 @@
+"""
+Project Clusterer
+Assigns conversations to projects by incremental centroid clustering
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from processors.text_features import CorpusStatistics, FeatureHasher, np, tokenize
+
+DEFAULT_PROJECT_SEEDS = {
+    'portfolio': ['portfolio', 'personal website', 'resume'],
+    'todo-app': ['todo', 'task', 'reminder'],
+    'consulting': ['consulting', 'client', 'business'],
+    'mlb': ['baseball', 'mlb', 'home run', 'sports'],
+    'water-cycle': ['water', 'cycle', 'environment'],
+    'case-study': ['case study', 'analysis', 'research']
+}
+
+
+class ProjectClusterer:
+    """Online clustering of conversations into projects
+
+    Conversations become L2-normalized hashed TF-IDF vectors. Each project
+    keeps a running centroid, so assigning a new conversation is one sparse
+    dot product per project (O(k)). Seed projects start from their keyword
+    vectors; conversations that match no centroid well enough start a new,
+    automatically named project instead of falling into 'general'.
+    """
+
+    def __init__(self, categorization_config: Dict):
+        if np is None:
+            raise ImportError("Project clustering requires numpy")
+
+        clustering_config = categorization_config.get('clustering', {})
+        self.seeds = categorization_config.get('project_seeds', DEFAULT_PROJECT_SEEDS)
+        self.threshold = clustering_config.get('similarity_threshold', 0.25)
+        self.max_clusters = clustering_config.get('max_clusters', 200)
+        self.min_terms = clustering_config.get('min_terms', 5)
+        self.n_features = clustering_config.get('hash_features', 2 ** 16)
+        self.path = Path(clustering_config.get('model_path', 'storage/project_clusters.npz'))
+
+        self.hasher = FeatureHasher(self.n_features)
+        self.corpus = CorpusStatistics(self.n_features)
+
+        self.labels = []  # cluster index -> project name
+        self.sums = np.zeros((0, self.n_features), dtype=np.float32)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.sq_norms = np.zeros(0, dtype=np.float64)
+
+        if self.path.exists():
+            self.load()
+        else:
+            self._add_seeds()
+
+    def _add_seeds(self):
+        """Ensure every seed project has a centroid, resetting empty ones"""
+        for project, keywords in self.seeds.items():
+            columns, values = self._keyword_vector(keywords)
+            if project not in self.labels:
+                self._new_cluster(project, columns, values, count=0)
+                continue
+            cluster = self.labels.index(project)
+            if self.counts[cluster] == 0:
+                self.sums[cluster] = 0.0
+                self.sums[cluster, columns] = values
+                self.sq_norms[cluster] = float(values @ values)
+
+    def _keyword_vector(self, keywords: List[str]):
+        columns = self.hasher.indices(tokenize(' '.join(keywords)))
+        return self._normalize(np.asarray(columns, dtype=np.int64),
+                               np.ones(len(columns), dtype=np.float32))
+
+    def vectorize(self, conversation: Dict, update_corpus: bool = True
+                  ) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Sparse (columns, values) TF-IDF vector for a conversation"""
+        text = ' '.join([
+            conversation.get('title', '') or '',
+            conversation.get('source_file', '') or '',
+            conversation.get('raw_content', '') or '',
+        ])
+        features = np.asarray(self.hasher.features(text), dtype=np.int64)
+        if update_corpus:
+            self.corpus.update(np.zeros(len(features), dtype=np.int64), features, 1)
+
+        columns, term_counts = np.unique(features, return_counts=True)
+        values = (1.0 + np.log(term_counts)) * self.corpus.idf()[columns]
+        return self._normalize(columns, values.astype(np.float32))
+
+    def _normalize(self, columns, values):
+        norm = np.linalg.norm(values)
+        if norm > 0:
+            values = values / norm
+        return columns, values
+
+    def similarities(self, columns, values):
+        """Cosine similarity of a sparse vector to every centroid
+
+        Squared centroid norms are maintained incrementally, so this touches
+        only the vector's nonzero columns of each centroid.
+        """
+        dots = self.sums[:, columns] @ values
+        return dots / np.sqrt(np.maximum(self.sq_norms, 1e-12))
+
+    def assign(self, conversation: Dict) -> str:
+        """Assign a conversation to a project and fold it into that centroid"""
+        columns, values = self.vectorize(conversation)
+        if len(columns) < self.min_terms:
+            return 'general'
+
+        cluster = None
+        if self.labels:
+            similarities = self.similarities(columns, values)
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold or len(self.labels) >= self.max_clusters:
+                cluster = best
+
+        if cluster is None:
+            label = self._auto_label(conversation, columns, values)
+            self._new_cluster(label, columns, values, count=1)
+            return label
+
+        self.sq_norms[cluster] += (2.0 * float(self.sums[cluster, columns] @ values)
+                                   + float(values @ values))
+        self.sums[cluster, columns] += values
+        self.counts[cluster] += 1
+        return self.labels[cluster]
+
+    def _new_cluster(self, label: str, columns, values, count: int):
+        row = np.zeros((1, self.n_features), dtype=np.float32)
+        row[0, columns] = values
+        self.sums = np.vstack([self.sums, row])
+        self.counts = np.append(self.counts, count)
+        self.sq_norms = np.append(self.sq_norms, float(values @ values))
+        self.labels.append(label)
+
+    def _auto_label(self, conversation: Dict, columns, values) -> str:
+        """Name a new cluster after the conversation's highest-weighted terms"""
+        weight = dict(zip(columns.tolist(), values.tolist()))
+        tokens = tokenize((conversation.get('title', '') or '') + ' ' +
+                          (conversation.get('raw_content', '') or '')[:5000])
+        ranked = sorted(set(tokens), key=lambda t: (-weight.get(self.hasher.index(t), 0.0), t))
+        base = '-'.join(ranked[:2]) or 'topic'
+
+        label, suffix = base, 2
+        while label in self.labels:
+            label = f"{base}-{suffix}"
+            suffix += 1
+        return label
+
+    def recluster(self, conversations: List[Dict], iterations: int = 10,
+                  chunk_size: int = 100) -> Dict[str, str]:
+        """Batch spherical k-means over the archive, seeded by current centroids
+
+        Returns a mapping of conversation id to project. Clusters that end up
+        empty are dropped unless they are seed projects.
+        """
+        result = {c['id']: 'general' for c in conversations}
+        vectors = [self.vectorize(c, update_corpus=False) for c in conversations]
+        keep = [i for i, (columns, _) in enumerate(vectors) if len(columns) >= self.min_terms]
+        if not keep or not self.labels:
+            return result
+
+        doc_ids = np.concatenate([np.full(len(vectors[i][0]), n, dtype=np.int64)
+                                  for n, i in enumerate(keep)])
+        columns = np.concatenate([vectors[i][0] for i in keep])
+        values = np.concatenate([vectors[i][1] for i in keep]).astype(np.float32)
+        doc_bounds = np.searchsorted(doc_ids, np.arange(len(keep) + 1))
+
+        assignment = np.full(len(keep), -1, dtype=np.int64)
+        for _ in range(iterations):
+            centroids = self.sums / np.sqrt(np.maximum(self.sq_norms, 1e-12))[:, None]
+            new_assignment = np.empty(len(keep), dtype=np.int64)
+            for start in range(0, len(keep), chunk_size):
+                stop = min(start + chunk_size, len(keep))
+                t0, t1 = doc_bounds[start], doc_bounds[stop]
+                contributions = centroids[:, columns[t0:t1]] * values[t0:t1]
+                similarities = np.add.reduceat(contributions, doc_bounds[start:stop] - t0, axis=1)
+                new_assignment[start:stop] = np.argmax(similarities, axis=0)
+
+            if np.array_equal(new_assignment, assignment):
+                break
+            assignment = new_assignment
+
+            self.sums = np.zeros((len(self.labels), self.n_features), dtype=np.float32)
+            np.add.at(self.sums, (assignment[doc_ids], columns), values)
+            self.counts = np.bincount(assignment, minlength=len(self.labels))
+            self.sq_norms = np.einsum('ij,ij->i', self.sums, self.sums).astype(np.float64)
+            self._add_seeds()
+
+        labels = list(self.labels)
+        self._drop_empty_clusters()
+
+        for n, i in enumerate(keep):
+            result[conversations[i]['id']] = labels[assignment[n]]
+        return result
+
+    def _drop_empty_clusters(self):
+        keep = [i for i, label in enumerate(self.labels)
+                if self.counts[i] > 0 or label in self.seeds]
+        self.labels = [self.labels[i] for i in keep]
+        self.sums = self.sums[keep]
+        self.counts = self.counts[keep]
+        self.sq_norms = self.sq_norms[keep]
+
+    def load(self):
+        data = np.load(self.path)
+        if int(data['n_features']) != self.n_features:
+            print(f"Ignoring project clusters with mismatched feature count: {self.path}")
+            self._add_seeds()
+            return
+        self.labels = json.loads(str(data['labels']))
+        self.sums = data['sums'].astype(np.float32)
+        self.counts = data['counts'].astype(np.int64)
+        self.sq_norms = np.einsum('ij,ij->i', self.sums, self.sums).astype(np.float64)
+        self.corpus.document_frequency = data['document_frequency'].astype(np.int64)
+        self.corpus.n_documents = int(data['n_documents'])
+        self._add_seeds()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp.npz')
+        np.savez_compressed(
+            tmp_path,
+            labels=np.array(json.dumps(self.labels)),
+            sums=self.sums,
+            counts=self.counts,
+            document_frequency=self.corpus.document_frequency,
+            n_documents=np.int64(self.corpus.n_documents),
+            n_features=np.int64(self.n_features),
+        )
+        tmp_path.replace(self.path)
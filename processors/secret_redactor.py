@@ -0,0 +1,223 @@
+"""
+Secret Redactor
+Masks API keys, tokens, passwords and private keys in conversation text
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Characters of keys and tokens; runs of them are the candidates for the
+# key format and entropy detectors. '/' ends a run, so each segment of a
+# URL or file path is scored on its own.
+TOKEN_CHARS = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+_-'
+TOKEN_MASK = bytes(ord('a') if byte in TOKEN_CHARS else ord(' ') for byte in range(256))
+MIN_TOKEN_CHARS = 20
+MAX_TOKEN_CHARS = 1024
+
+# Provider key formats, searched for within each candidate run
+TOKEN_FORMATS = re.compile('|'.join(f"(?P<{name}>{pattern})" for name, pattern in [
+    ('aws_access_key', r'(?<![A-Z0-9])(?:AKIA|ASIA)[0-9A-Z]{16}(?![A-Z0-9])'),
+    ('github_token', r'gh[pousr]_[A-Za-z0-9]{36,}|github_pat_[A-Za-z0-9_]{22,}'),
+    ('anthropic_key', r'sk-ant-[A-Za-z0-9_-]{20,}'),
+    ('openai_key', r'sk-(?:proj-|svcacct-)?[A-Za-z0-9_-]{20,}'),
+    ('slack_token', r'xox[abposr]-[A-Za-z0-9-]{10,}'),
+    ('google_api_key', r'AIza[0-9A-Za-z_-]{35}'),
+    ('stripe_key', r'[rs]k_live_[0-9A-Za-z]{24,}'),
+]))
+
+# Private keys span many lines, so they are found from a literal marker
+PRIVATE_KEY_MARKER = b'PRIVATE KEY-----'
+PRIVATE_KEY = re.compile(
+    r'-----BEGIN [A-Z0-9 ]{0,32}PRIVATE KEY(?: BLOCK)?-----'
+    r'[\s\S]{0,16000}?-----END [A-Z0-9 ]{0,32}PRIVATE KEY(?: BLOCK)?-----'
+)
+
+# A JWT's header is its first candidate run; the rest follows the dots
+JWT = re.compile(r'eyJ[A-Za-z0-9_-]{8,1024}\.eyJ[A-Za-z0-9_-]{8,4096}\.[A-Za-z0-9_-]{8,1024}')
+
+# `password = ...` style assignments such as DB_PASSWORD or SECRET_KEY, for
+# secrets people choose themselves; generated keys are left to the detectors
+# above. Only the value is masked. Values that look like code are left
+# alone: a call or subscript, or an unquoted variable (see `_is_variable`).
+PASSWORD_KEYWORDS = (b'passw', b'secret')
+ASSIGNMENT = re.compile(
+    r'([A-Za-z0-9_-]{0,24})["\']?[ \t]{0,3}[:=][ \t]{0,3}(["\']?)'
+    r'([^\s"\'`,;()\[\]{}<>]{6,255})(?![^\s"\'`,;)\]{}<>])'
+)
+# A name or attribute chain; its first part has no digits, as `hunter22` may
+# well be a password
+IDENTIFIER = re.compile(r'[A-Za-z_]+(?:\.[A-Za-z_][A-Za-z0-9_]*)*')
+
+# Longest text one secret can span, so a stream never splits one
+MAX_MATCH_CHARS = 16384
+
+
+def _is_variable(name: str, value: str) -> bool:
+    """Whether an unquoted assigned value names a variable rather than a secret
+
+    As in `self.password = password`, `password=args.password` or
+    `secret = user_secret`; a bare word such as `password: hunter` in a
+    config file still counts as a secret.
+    """
+    return bool(IDENTIFIER.fullmatch(value)) and \
+        ('.' in value or '_' in value or value.lower() == name.lower())
+
+
+def shannon_entropy(text: str) -> float:
+    """Bits per character"""
+    length = len(text)
+    return -sum(count / length * math.log2(count / length) for count in Counter(text).values())
+
+
+class SecretRedactor:
+    """Replaces secrets with `[REDACTED:<detector>]`
+
+    Scanning with one regex per detector, or with one alternation of all
+    of them, costs more than the rest of processing put together with
+    CPython's `re`. Instead the text is reduced once to an ASCII byte mask
+    in which every key character is `a`, and candidates are found with
+    byte searches: runs of at least MIN_TOKEN_CHARS key characters, the
+    password keywords, and the marker of private keys. The
+    detectors' patterns then run only at those candidates. Long runs
+    matching no key format are masked when their character entropy
+    reaches `entropy_threshold`, which leaves hex digests such as git
+    commit hashes alone. Redacted text contains no candidates, so
+    redacting it again changes nothing.
+    """
+
+    STREAM_CHUNK_CHARS = 1024 * 1024
+
+    def __init__(self, redaction_config: Optional[Dict] = None):
+        redaction_config = redaction_config or {}
+        self.entropy_threshold = redaction_config.get('entropy_threshold', 4.3)
+        self.entropy_min_length = max(redaction_config.get('entropy_min_length', 32), MIN_TOKEN_CHARS)
+
+    @classmethod
+    def from_config(cls, redaction_config: Optional[Dict]) -> Optional['SecretRedactor']:
+        """A redactor, or None when redaction is turned off"""
+        redaction_config = redaction_config or {}
+        if not redaction_config.get('enabled', True):
+            return None
+        return cls(redaction_config)
+
+    def _high_entropy(self, token: str) -> bool:
+        return len(token) >= self.entropy_min_length and \
+            any(char.isdigit() for char in token) and \
+            shannon_entropy(token) >= self.entropy_threshold
+
+    def _spans(self, text: str, start: int, limit: int) -> List[Tuple[int, int, str]]:
+        """(start, end, detector) of the secrets detected from `start` up to `limit`"""
+        # One byte per character, so offsets in the bytes are offsets in the text
+        data = text.encode('ascii', 'replace')
+        spans = []
+
+        if data.find(PRIVATE_KEY_MARKER, start) != -1:
+            for match in PRIVATE_KEY.finditer(text, start):
+                if match.start() >= limit:
+                    break
+                spans.append((match.start(), match.end(), 'private_key'))
+
+        lowered = data.lower()
+        for keyword in PASSWORD_KEYWORDS:
+            position = lowered.find(keyword, start)
+            while position != -1 and position < limit:
+                match = ASSIGNMENT.match(text, position + len(keyword))
+                if match and (match.group(2) or
+                              not _is_variable(text[position:match.end(1)], match.group(3))):
+                    spans.append((match.start(3), match.end(3), 'password'))
+                position = lowered.find(keyword, position + len(keyword))
+
+        masked = data.translate(TOKEN_MASK)
+        run_marker = b'a' * MIN_TOKEN_CHARS
+        position = start
+        if start and masked[start - 1] == ord('a'):
+            # The rest of a run that was already checked before `start`
+            position = masked.find(b' ', start)
+        while position != -1:
+            run_start = masked.find(run_marker, position)
+            if run_start == -1 or run_start >= limit:
+                break
+            run_end = masked.find(b' ', run_start)
+            if run_end == -1:
+                run_end = len(masked)
+            position = run_end
+
+            if run_end - run_start > MAX_TOKEN_CHARS:
+                continue  # Encoded data such as images, not a credential
+            token = text[run_start:run_end]
+            match = JWT.match(text, run_start) if token.startswith('eyJ') else None
+            if match:
+                spans.append((run_start, match.end(), 'jwt'))
+                position = match.end()
+                continue
+            match = TOKEN_FORMATS.search(token)
+            if match:
+                spans.append((run_start + match.start(), run_start + match.end(), match.lastgroup))
+            elif self._high_entropy(token):
+                spans.append((run_start, run_end, 'high_entropy'))
+
+        # Where detections overlap, keep the one that starts first and is longest
+        spans.sort(key=lambda span: (span[0], -span[1]))
+        kept = []
+        for span in spans:
+            if not kept or span[0] >= kept[-1][1]:
+                kept.append(span)
+        return kept
+
+    @staticmethod
+    def _replace(text: str, start: int, end: int, spans: List[Tuple[int, int, str]],
+                 counts: Dict[str, int]) -> str:
+        parts = []
+        position = start
+        for span_start, span_end, name in spans:
+            parts.append(text[position:span_start])
+            parts.append(f"[REDACTED:{name}]")
+            counts[name] = counts.get(name, 0) + 1
+            position = span_end
+        parts.append(text[position:end])
+        return ''.join(parts)
+
+    def redact(self, text: str) -> Tuple[str, Dict[str, int]]:
+        """The text with secrets masked, and the number masked per detector"""
+        counts = {}
+        if not text:
+            return text, counts
+        if len(text) <= self.STREAM_CHUNK_CHARS:
+            spans = self._spans(text, 0, len(text))
+            return (self._replace(text, 0, len(text), spans, counts) if spans else text), counts
+
+        chunks = (text[start:start + self.STREAM_CHUNK_CHARS]
+                  for start in range(0, len(text), self.STREAM_CHUNK_CHARS))
+        return ''.join(self.redact_stream(chunks, counts)), counts
+
+    def redact_stream(self, chunks: Iterable[str], counts: Dict[str, int]) -> Iterator[str]:
+        """Redact text arriving in chunks, adding to `counts` as it goes
+
+        The last MAX_MATCH_CHARS of the text so far are held back and
+        scanned again with the next chunk, so secrets that straddle two
+        chunks are caught; large content is redacted this way so that the
+        byte masks stay small.
+        """
+        buffer = ''
+        # Text before `start` has been emitted and is kept as context only
+        start = 0
+        for chunk in chunks:
+            buffer += chunk
+            limit = len(buffer) - MAX_MATCH_CHARS
+            if limit <= start:
+                continue
+
+            spans = self._spans(buffer, start, limit)
+            # Secrets that begin before `limit` are complete, as none is
+            # longer than MAX_MATCH_CHARS; emit up to the end of the last
+            end = max(limit, spans[-1][1]) if spans else limit
+            yield self._replace(buffer, start, end, spans, counts)
+
+            buffer = buffer[end - 1:]
+            start = 1
+
+        if len(buffer) > start:
+            spans = self._spans(buffer, start, len(buffer))
+            yield self._replace(buffer, start, len(buffer), spans, counts)
@@ -0,0 +1,262 @@
+"""
+Summarizer Backends
+Pluggable summarization backends with batching, concurrency limits and caching
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+
+class SummarizerBackend:
+    """Base class for summarization backends
+
+    Backends receive a batch of conversation texts and return one summary
+    per text, in order. Returning None for an entry means "no summary" and
+    the caller falls back to the heuristic summarizer.
+    """
+
+    name = 'base'
+
+    async def summarize_batch(self, texts: List[str]) -> List[Optional[str]]:
+        raise NotImplementedError
+
+
+class LocalSummarizer(SummarizerBackend):
+    """Deterministic offline stand-in for a model backend
+
+    Produces a stable summary from the leading sentences of each text and
+    simulates model latency (a fixed cost per batch plus a cost per item),
+    so batching and concurrency can be benchmarked without a model.
+    """
+
+    name = 'local'
+
+    def __init__(self, batch_latency_ms: float = 0.0, item_latency_ms: float = 0.0,
+                 max_sentences: int = 2):
+        self.batch_latency_ms = batch_latency_ms
+        self.item_latency_ms = item_latency_ms
+        self.max_sentences = max_sentences
+
+    async def summarize_batch(self, texts: List[str]) -> List[Optional[str]]:
+        delay = self.batch_latency_ms + self.item_latency_ms * len(texts)
+        if delay:
+            await asyncio.sleep(delay / 1000.0)
+        return [self._summarize(text) for text in texts]
+
+    def _summarize(self, text: str) -> Optional[str]:
+        sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+|\n+', text)
+                     if len(s.strip()) > 20]
+        if not sentences:
+            return None
+        return ' '.join(sentences[:self.max_sentences])
+
+
+class TransformersSummarizer(SummarizerBackend):
+    """Summarization backend using a Hugging Face transformers pipeline
+
+    The model runs in the default executor so the event loop keeps
+    collecting and processing while a batch is being summarized.
+    """
+
+    name = 'transformers'
+
+    def __init__(self, model: str = 'sshleifer/distilbart-cnn-12-6',
+                 max_length: int = 130, min_length: int = 20):
+        try:
+            from transformers import pipeline
+        except ImportError:
+            raise ImportError(
+                "The transformers summarizer requires 'transformers' and 'torch' "
+                "(see the optional dependencies in requirements.txt)"
+            )
+        self.pipeline = pipeline('summarization', model=model)
+        self.max_length = max_length
+        self.min_length = min_length
+
+    async def summarize_batch(self, texts: List[str]) -> List[Optional[str]]:
+        loop = asyncio.get_event_loop()
+        results = await loop.run_in_executor(None, self._run, texts)
+        return [r.get('summary_text') for r in results]
+
+    def _run(self, texts: List[str]) -> List[Dict]:
+        return self.pipeline(texts, max_length=self.max_length,
+                             min_length=self.min_length, truncation=True)
+
+
+SUMMARIZER_BACKENDS = {
+    'local': LocalSummarizer,
+    'transformers': TransformersSummarizer,
+}
+
+
+def create_summarizer_backend(summarization_config: Dict) -> Optional[SummarizerBackend]:
+    """Build the backend named in the summarization config
+
+    Returns None for the default 'heuristic' backend, meaning no model
+    backend is used at all.
+    """
+    name = summarization_config.get('backend', 'heuristic')
+    if name == 'heuristic':
+        return None
+
+    backend_class = SUMMARIZER_BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"Unknown summarizer backend: {name}")
+
+    return backend_class(**summarization_config.get('backend_options', {}))
+
+
+class SummarizationService:
+    """Batches summary requests onto a backend
+
+    Concurrent `summarize` calls are grouped into batches of up to
+    `batch_size` (or whatever arrived within `max_batch_wait_ms`), at most
+    `max_concurrency` batches run at once, and each call falls back to the
+    heuristic summary if the backend fails or exceeds `timeout_seconds`.
+    Results are cached by content hash.
+    """
+
+    def __init__(self, backend: SummarizerBackend, fallback: Callable[[str], str],
+                 batch_size: int = 8, max_concurrency: int = 2,
+                 timeout_seconds: float = 30.0, max_batch_wait_ms: float = 20.0,
+                 cache_size: int = 1024):
+        self.backend = backend
+        self.fallback = fallback
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout_seconds = timeout_seconds
+        self.max_batch_wait_ms = max_batch_wait_ms
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()
+        self._pending = []  # (key, text) awaiting a batch
+        self._inflight = {}  # key -> Future
+        self._flush_handle = None
+        self._semaphore = None  # created lazily inside the running loop
+
+        self.stats = {
+            'requests': 0,
+            'cache_hits': 0,
+            'batches': 0,
+            'batched_items': 0,
+            'fallbacks': 0,
+            'timeouts': 0,
+            'errors': 0,
+            'backend_seconds': 0.0,
+        }
+
+    @classmethod
+    def from_config(cls, summarization_config: Dict,
+                    fallback: Callable[[str], str]) -> Optional['SummarizationService']:
+        """Create a service from `processing.summarization`, or None for heuristic"""
+        backend = create_summarizer_backend(summarization_config)
+        if backend is None:
+            return None
+
+        return cls(
+            backend,
+            fallback,
+            batch_size=summarization_config.get('batch_size', 8),
+            max_concurrency=summarization_config.get('max_concurrency', 2),
+            timeout_seconds=summarization_config.get('timeout_seconds', 30.0),
+            max_batch_wait_ms=summarization_config.get('max_batch_wait_ms', 20.0),
+            cache_size=summarization_config.get('cache_size', 1024),
+        )
+
+    async def summarize(self, text: str) -> str:
+        """Summarize one text, batching it with any concurrent requests"""
+        self.stats['requests'] += 1
+        key = hashlib.sha1(text.encode('utf-8', errors='ignore')).hexdigest()
+
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return self._cache[key]
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.get_event_loop().create_future()
+            self._inflight[key] = future
+            self._pending.append((key, text))
+            self._schedule_flush()
+
+        try:
+            summary = await asyncio.wait_for(asyncio.shield(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            summary = None
+        except Exception:
+            summary = None
+
+        if not summary:
+            self.stats['fallbacks'] += 1
+            return self.fallback(text)
+
+        return summary
+
+    def _schedule_flush(self):
+        loop = asyncio.get_event_loop()
+        if len(self._pending) >= self.batch_size:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+            self._flush(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                self.max_batch_wait_ms / 1000.0, self._flush, loop
+            )
+
+    def _flush(self, loop):
+        self._flush_handle = None
+        while self._pending:
+            batch = self._pending[:self.batch_size]
+            self._pending = self._pending[self.batch_size:]
+            loop.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        keys = [key for key, _ in batch]
+        texts = [text for _, text in batch]
+
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                summaries = await asyncio.wait_for(
+                    self.backend.summarize_batch(texts), self.timeout_seconds
+                )
+                if len(summaries) != len(texts):
+                    raise ValueError(
+                        f"Backend returned {len(summaries)} summaries for {len(texts)} texts"
+                    )
+            except asyncio.TimeoutError:
+                summaries = [None] * len(texts)
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"Summarizer backend error ({self.backend.name}): {e}")
+                summaries = [None] * len(texts)
+            finally:
+                self.stats['backend_seconds'] += time.perf_counter() - started
+
+        self.stats['batches'] += 1
+        self.stats['batched_items'] += len(texts)
+
+        for key, summary in zip(keys, summaries):
+            if summary:
+                self._remember(key, summary)
+            future = self._inflight.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(summary)
+
+    def _remember(self, key: str, summary: str):
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = summary
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
@@ -0,0 +1,152 @@
+"""
+Text Features
+Hashed term features and incrementally maintained corpus statistics
+"""
+
+import re
+import zlib
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; callers fall back to heuristics
+    np = None
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9_]{2,}')
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+|\n+')
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each few for from further had has have having he her here hers him his how i if
+in into is it its itself just me more most my no nor not now of off on once only
+or other our out over own same she should so some such than that the their them
+then there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your yours user
+assistant
+""".split())
+
+
+def numpy_available() -> bool:
+    """Whether the NumPy-backed text features can be used"""
+    return np is not None
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed"""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def split_sentences(text: str, min_length: int = 20, max_length: int = 300) -> List[str]:
+    """Split text into candidate summary sentences"""
+    sentences = []
+    for sentence in SENTENCE_PATTERN.split(text):
+        sentence = sentence.strip()
+        if min_length < len(sentence) < max_length:
+            sentences.append(sentence)
+    return sentences
+
+
+class FeatureHasher:
+    """Maps tokens to a fixed number of feature columns
+
+    Uses crc32 rather than `hash()` so feature indices are stable across
+    processes and can be persisted alongside corpus statistics.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, cache_size: int = 200000):
+        self.n_features = n_features
+        self.cache_size = cache_size
+        self._cache = {}
+
+    def index(self, token: str) -> int:
+        """Feature column for a token, or -1 for stopwords"""
+        column = self._cache.get(token)
+        if column is None:
+            if token in STOPWORDS:
+                column = -1
+            else:
+                column = zlib.crc32(token.encode('utf-8')) % self.n_features
+            if len(self._cache) < self.cache_size:
+                self._cache[token] = column
+        return column
+
+    def indices(self, tokens: Iterable[str]) -> List[int]:
+        return [column for column in map(self.index, tokens) if column >= 0]
+
+    def features(self, text: str) -> List[int]:
+        """Tokenize and hash text in one pass"""
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        cache = self._cache
+        try:
+            columns = [cache[token] for token in tokens]
+        except KeyError:
+            columns = [self.index(token) for token in tokens]
+        return [column for column in columns if column >= 0]
+
+
+class CorpusStatistics:
+    """Document frequencies over hashed features, updated incrementally
+
+    New documents are folded in with `update`; nothing is ever rebuilt from
+    the full archive. Statistics can be persisted to an .npz file.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, path: Optional[str] = None):
+        if np is None:
+            raise ImportError("CorpusStatistics requires numpy")
+
+        self.n_features = n_features
+        self.path = Path(path) if path else None
+        self.document_frequency = np.zeros(n_features, dtype=np.int64)
+        self.n_documents = 0
+        self._idf = None
+
+        if self.path and self.path.exists():
+            self.load()
+
+    def update(self, doc_ids, feature_ids, n_documents: int):
+        """Fold in a batch of documents
+
+        `doc_ids` and `feature_ids` are parallel arrays of (document, feature)
+        occurrences for the batch; duplicates within a document count once.
+        """
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        feature_ids = np.asarray(feature_ids, dtype=np.int64)
+        if feature_ids.size:
+            pairs = np.unique(doc_ids * self.n_features + feature_ids)
+            self.document_frequency += np.bincount(
+                pairs % self.n_features, minlength=self.n_features
+            )
+        self.n_documents += n_documents
+        self._idf = None
+
+    def idf(self):
+        """Smoothed inverse document frequency for every feature"""
+        if self._idf is None:
+            self._idf = np.log((1.0 + self.n_documents) /
+                               (1.0 + self.document_frequency)) + 1.0
+        return self._idf
+
+    def load(self):
+        data = np.load(self.path)
+        if int(data['n_features']) != self.n_features:
+            print(f"Ignoring corpus statistics with mismatched feature count: {self.path}")
+            return
+        self.document_frequency = data['document_frequency'].astype(np.int64)
+        self.n_documents = int(data['n_documents'])
+        self._idf = None
+
+    def save(self):
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp.npz')
+        np.savez_compressed(
+            tmp_path,
+            document_frequency=self.document_frequency,
+            n_documents=np.int64(self.n_documents),
+            n_features=np.int64(self.n_features),
+        )
+        tmp_path.replace(self.path)
@@ -15,29 +15,27 @@ if [ $# -eq 0 ]; then
     echo "  ./run.sh export          - Export conversations to Obsidian"
     echo "  ./run.sh export --sync   - Export and sync to notes repo"
     echo "  ./run.sh sync            - Sync conversations to notes repo"
+    echo "  ./run.sh import FILE     - Import a ChatGPT/Claude data export"
+    echo "  ./run.sh recluster       - Recluster the archive into projects"
+    echo "  ./run.sh analytics       - Show usage trends (--by, --period, --since)"
+    echo "  ./run.sh backup          - Snapshot the database (online, compressed)"
+    echo "  ./run.sh compact         - Move old conversations to monthly archives"
     echo "  ./run.sh setup-obsidian  - Configure Obsidian integration"
     echo "  ./run.sh start           - Start conversation collection"
-    echo "  ./run.sh test            - Run system test"
+    echo "  ./run.sh test            - Run system and unit tests"
     echo ""
     echo "Examples:"
     echo "  ./run.sh list --limit 20"
     echo "  ./run.sh export --project portfolio"
+    echo "  ./run.sh analytics --by tag --period month --top 10"
     echo ""
 else
     case "$1" in
         "test")
-            python test_system.py
+            python test_system.py && python -m unittest discover -p "test_*.py"
             ;;
-        "start"|"stats"|"list"|"export"|"setup-obsidian")
+        "start"|"stats"|"list"|"export"|"import"|"recluster"|"compact"|"analytics"|"backup"|"sync"|"setup-obsidian")
             python cli.py "$@"
-            # Auto-sync after export if --sync flag is present
-            if [ "$1" = "export" ] && [ "$2" = "--sync" ]; then
-                echo ""
-                ./sync-to-notes.sh
-            fi
-            ;;
-        "sync")
-            ./sync-to-notes.sh
             ;;
         *)
             echo "Unknown command: $1"
@@ -0,0 +1,165 @@
+"""
+Backup Manager
+Online, compressed and rotated snapshots of the conversation database
+"""
+
+import asyncio
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import stat
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+SNAPSHOT_NAME = re.compile(r'^conversations-\d{8}-\d{6}\.db\.gz$')
+
+
+class BackupAborted(Exception):
+    """Raised from the progress callback to stop a backup that keeps restarting"""
+
+
+class BackupManager:
+    """Backs up the live database without blocking writers
+
+    Pages are copied with SQLite's online backup API a few at a time, with a
+    short sleep between steps. In WAL mode the copy reads from one pinned
+    snapshot, so writers are never blocked and never restart it. Otherwise
+    writers only wait for one step, and if their writes keep restarting the
+    copy, the remainder is copied in a single step instead. Snapshots are
+    gzip-compressed and the newest `keep` are retained. Monthly archives
+    are immutable, so each is copied only when it changed since its last
+    backup.
+    """
+
+    def __init__(self, db_path: Path, archive_dir: Path, sync_config: Dict):
+        self.db_path = Path(db_path)
+        self.archive_dir = Path(archive_dir)
+        self.backup_dir = Path(sync_config.get('backup_dir', 'storage/backups'))
+        self.keep = sync_config.get('backup_keep', 7)
+        self.step_pages = sync_config.get('backup_step_pages', 256)
+        self.step_sleep = sync_config.get('backup_step_sleep_ms', 5) / 1000.0
+        self.max_restarts = sync_config.get('backup_max_restarts', 10)
+        self.compression_level = sync_config.get('backup_compression_level', 6)
+
+    async def backup(self) -> Dict:
+        """Take a snapshot in a worker thread and return its report"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.backup_sync)
+
+    def backup_sync(self) -> Dict:
+        started = time.perf_counter()
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+
+        name = f"conversations-{datetime.now().strftime('%Y%m%d-%H%M%S')}.db"
+        temp_path = self.backup_dir / f"{name}.tmp"
+        snapshot_path = self.backup_dir / f"{name}.gz"
+
+        try:
+            pages, restarts = self._copy(temp_path)
+            copied = time.perf_counter()
+            db_bytes = temp_path.stat().st_size
+            self._compress(temp_path, snapshot_path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+        archives = self._backup_archives()
+        removed = self.rotate()
+
+        return {
+            'path': str(snapshot_path),
+            'pages': pages,
+            'restarts': restarts,
+            'db_bytes': db_bytes,
+            'compressed_bytes': snapshot_path.stat().st_size,
+            'copy_seconds': round(copied - started, 3),
+            'duration_seconds': round(time.perf_counter() - started, 3),
+            'archives_copied': archives,
+            'snapshots_removed': removed,
+        }
+
+    def _copy(self, target: Path):
+        """Copy the live database page by page; returns (pages, restarts)"""
+        state = {'remaining': None, 'total': 0, 'restarts': 0}
+
+        def progress(status, remaining, total):
+            # A write by another connection restarts the copy from page one
+            if state['remaining'] is not None and remaining > state['remaining']:
+                state['restarts'] += 1
+                if state['restarts'] > self.max_restarts:
+                    raise BackupAborted()
+            state['remaining'], state['total'] = remaining, total
+            # `backup` itself only sleeps when the database is busy or locked
+            if remaining > 0 and self.step_sleep > 0:
+                time.sleep(self.step_sleep)
+
+        source = sqlite3.connect(self.db_path, isolation_level=None)
+        try:
+            if source.execute("PRAGMA journal_mode").fetchone()[0] == 'wal':
+                # Hold a read transaction so every step sees the same snapshot
+                source.execute("BEGIN")
+                source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+
+            destination = sqlite3.connect(target)
+            try:
+                try:
+                    source.backup(destination, pages=self.step_pages,
+                                  progress=progress, sleep=self.step_sleep)
+                except BackupAborted:
+                    source.backup(destination, pages=-1)
+            finally:
+                destination.close()
+        finally:
+            source.close()
+
+        return state['total'], state['restarts']
+
+    def _compress(self, source: Path, target: Path):
+        temp_target = target.with_name(target.name + '.tmp')
+        with open(source, 'rb') as f_in, \
+                gzip.open(temp_target, 'wb', compresslevel=self.compression_level) as f_out:
+            shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+        os.replace(temp_target, target)
+
+    def _backup_archives(self) -> int:
+        """Copy monthly archives that are new or changed since their last backup"""
+        if not self.archive_dir.exists():
+            return 0
+
+        target_dir = self.backup_dir / 'archive'
+        copied = 0
+        for entry in os.scandir(self.archive_dir):
+            if not entry.name.endswith('.db'):
+                continue
+            info = entry.stat()
+            if info.st_mode & stat.S_IWUSR:
+                # Unsealed while compaction or recluster writes to it
+                continue
+            target = target_dir / f"{entry.name}.gz"
+            mtime = info.st_mtime
+            if target.exists() and target.stat().st_mtime == mtime:
+                continue
+            target_dir.mkdir(parents=True, exist_ok=True)
+            self._compress(Path(entry.path), target)
+            os.utime(target, (mtime, mtime))
+            copied += 1
+        return copied
+
+    def snapshots(self) -> List[Path]:
+        """Snapshots, newest first"""
+        if not self.backup_dir.exists():
+            return []
+        names = [name for name in os.listdir(self.backup_dir) if SNAPSHOT_NAME.match(name)]
+        return [self.backup_dir / name for name in sorted(names, reverse=True)]
+
+    def rotate(self) -> int:
+        """Delete all but the newest `keep` snapshots"""
+        removed = 0
+        for path in self.snapshots()[self.keep:]:
+            path.unlink()
+            removed += 1
+        return removed
@@ -0,0 +1,263 @@
+"""
+Capture Spool
+Durable, append-only log of captured conversations awaiting storage
+"""
+
+import asyncio
+import json
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Each record is its payload length and CRC-32, then the JSON payload
+RECORD_HEADER = struct.Struct('<II')
+SEGMENT_NAME = re.compile(r'^(\d{12})\.spool$')
+COMMITTED_NAME = 'committed.json'
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+    raise TypeError(f"Cannot spool {type(value).__name__}")
+
+
+ENCODER = json.JSONEncoder(default=_encode_value, ensure_ascii=False)
+
+
+def encode_record(conversation: Dict) -> bytes:
+    payload = ENCODER.encode(conversation).encode('utf-8')
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _decode_object(obj: Dict):
+    if len(obj) == 1 and '$datetime' in obj:
+        return datetime.fromisoformat(obj['$datetime'])
+    return obj
+
+
+def read_records(data: bytes, limit: Optional[int] = None) -> Tuple[List[Dict], int]:
+    """Decode up to `limit` whole, valid records from the start of `data`
+
+    Returns the records and the offset just past the last one, which stops
+    short of the end of `data` at a torn or corrupt record.
+    """
+    records = []
+    offset = 0
+    while offset + RECORD_HEADER.size <= len(data) and (limit is None or len(records) < limit):
+        length, checksum = RECORD_HEADER.unpack_from(data, offset)
+        start = offset + RECORD_HEADER.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            break
+        records.append(json.loads(payload.decode('utf-8'), object_hook=_decode_object))
+        offset = start + length
+    return records, offset
+
+
+class CaptureSpool:
+    """Append-only segment files that collectors write to before storage
+
+    `append` writes a record to the active segment and returns its sequence
+    number without waiting for the disk. A background thread fsyncs the
+    segment at most once per `commit_delay_ms`, covering every record
+    written since the last sync, and `wait` blocks until a given record is
+    on disk. Readers take records with `read_pending` and, once storage has
+    committed them, call `commit` with the returned position so that fully
+    committed segments are deleted. Records left behind by a crash are read
+    again when the spool is reopened; a torn record at the tail is dropped.
+    The committed position is saved without fsync, so a crash can at worst
+    replay records that storage already holds, and saving them is idempotent.
+    """
+
+    def __init__(self, spool_dir: Path, spool_config: Optional[Dict] = None):
+        spool_config = spool_config or {}
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = int(spool_config.get('segment_mb', 8) * 1024 * 1024)
+        self.commit_delay = spool_config.get('commit_delay_ms', 2) / 1000.0
+
+        self.lock = threading.Condition()
+        self.sync_lock = threading.Lock()
+        self.written = 0
+        self.synced = 0
+        self.flusher = None
+        self.closed = False
+
+        segments = self.segments()
+        if segments:
+            self._recover(segments[-1])
+        self.committed = self.read_position = \
+            max(self._committed(), (segments[0], 0)) if segments else (0, 0)
+        self._open(segments[-1] if segments else 0)
+
+    def segments(self) -> List[int]:
+        """Sequence numbers of the segment files, oldest first"""
+        return sorted(int(match.group(1)) for match in
+                      (SEGMENT_NAME.match(name) for name in os.listdir(self.spool_dir)) if match)
+
+    def _path(self, sequence: int) -> Path:
+        return self.spool_dir / f"{sequence:012d}.spool"
+
+    def _recover(self, sequence: int):
+        """Cut a torn record left at the end of the last segment by a crash"""
+        path = self._path(sequence)
+        with open(path, 'rb') as f:
+            data = f.read()
+        _, valid = read_records(data)
+        if valid < len(data):
+            print(f"Dropping {len(data) - valid} bytes of torn records from {path.name}")
+            with open(path, 'r+b') as f:
+                f.truncate(valid)
+                os.fsync(f.fileno())
+
+    def _committed(self) -> Tuple[int, int]:
+        try:
+            with open(self.spool_dir / COMMITTED_NAME) as f:
+                sequence, offset = json.load(f)
+            return int(sequence), int(offset)
+        except (OSError, ValueError, TypeError):
+            return 0, 0
+
+    def _open(self, sequence: int):
+        self.sequence = sequence
+        self.file = open(self._path(sequence), 'ab', buffering=0)
+        self.size = self.file.seek(0, os.SEEK_END)
+        self._sync_directory()
+
+    def _sync_directory(self):
+        # Make the new segment's directory entry durable; not possible on Windows
+        if os.name == 'posix':
+            fd = os.open(self.spool_dir, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _rotate(self):
+        with self.sync_lock:
+            os.fsync(self.file.fileno())
+            self.file.close()
+        self._open(self.sequence + 1)
+
+    def append(self, conversation: Dict) -> int:
+        """Write one record; returns its sequence number for `wait`"""
+        return self.append_many([conversation])
+
+    def append_many(self, conversations: List[Dict]) -> int:
+        """Write records in order; returns the sequence number of the last"""
+        data = b''.join(encode_record(conversation) for conversation in conversations)
+        with self.lock:
+            if self.closed:
+                raise ValueError("Capture spool is closed")
+            if self.size and self.size + len(data) > self.segment_bytes:
+                self._rotate()
+            self.file.write(data)
+            self.size += len(data)
+            self.written += len(conversations)
+            if self.flusher is None:
+                self.flusher = threading.Thread(target=self._flush_loop, name='capture-spool',
+                                                daemon=True)
+                self.flusher.start()
+            self.lock.notify_all()
+            return self.written
+
+    def _flush_loop(self):
+        while True:
+            with self.lock:
+                while self.synced == self.written and not self.closed:
+                    self.lock.wait()
+                if self.synced == self.written:
+                    return
+
+            # Let concurrent appends join this sync
+            time.sleep(self.commit_delay)
+
+            with self.lock:
+                target, f = self.written, self.file
+            with self.sync_lock:
+                # A rotation in between has already synced and closed it
+                if not f.closed:
+                    os.fsync(f.fileno())
+            with self.lock:
+                self.synced = max(self.synced, target)
+                self.lock.notify_all()
+
+    def wait(self, sequence: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """Block until record `sequence` (default: the last written) is on disk"""
+        with self.lock:
+            if sequence is None:
+                sequence = self.written
+            return self.lock.wait_for(lambda: self.synced >= sequence, timeout)
+
+    async def wait_async(self, sequence: Optional[int] = None):
+        """`wait` without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.wait, sequence)
+
+    def read_pending(self, limit: int = 100) -> Tuple[List[Dict], Tuple[int, int]]:
+        """Up to `limit` records after the last ones read, and the position to `commit` them"""
+        with self.lock:
+            end = (self.sequence, self.size)
+
+        records = []
+        sequence, offset = self.read_position
+        while len(records) < limit and (sequence, offset) < end:
+            path = self._path(sequence)
+            data = b''
+            if path.exists():
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    data = f.read(end[1] - offset if sequence == end[0] else -1)
+            batch, consumed = read_records(data, limit - len(records))
+            records.extend(batch)
+            offset += consumed
+            if len(records) < limit:
+                if sequence == end[0]:
+                    break
+                if consumed < len(data):
+                    print(f"Skipping {len(data) - consumed} corrupt bytes in {path.name}")
+                sequence, offset = sequence + 1, 0
+
+        self.read_position = (sequence, offset)
+        return records, self.read_position
+
+    def commit(self, position: Tuple[int, int]):
+        """Forget every record before `position`, deleting segments it covers"""
+        with self.lock:
+            if position == (self.sequence, self.size) and self.size:
+                # Everything is committed: move on to an empty segment
+                self._rotate()
+            current = self.sequence
+        self.committed = max(self.committed, position)
+        temp_path = self.spool_dir / f"{COMMITTED_NAME}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(list(self.committed), f)
+        os.replace(temp_path, self.spool_dir / COMMITTED_NAME)
+        for sequence in self.segments():
+            if sequence >= current:
+                break
+            path = self._path(sequence)
+            if sequence < position[0] or (sequence == position[0]
+                                          and position[1] >= path.stat().st_size):
+                os.remove(path)
+
+    def rewind(self):
+        """Read again from the last committed position, e.g. after storage failed"""
+        self.read_position = self.committed
+
+    def close(self):
+        """Sync outstanding records and close the spool"""
+        with self.lock:
+            self.closed = True
+            self.lock.notify_all()
+        if self.flusher is not None:
+            self.flusher.join()
+        with self.lock, self.sync_lock:
+            os.fsync(self.file.fileno())
+            self.file.close()
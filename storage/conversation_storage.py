@@ -3,11 +3,51 @@ Conversation Storage
 Manages storage and retrieval of conversation data
 """
 
+import hashlib
 import json
 import sqlite3
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
+
+from processors.conversation_segmenter import normalize_language
+from processors.secret_redactor import SecretRedactor
+from storage.partition_archive import (
+    PartitionArchive, decompress_content, record_partition, remove_conversations, sqlite_uri
+)
+from storage.segment_index import (
+    LANGUAGE_FILTER, SEGMENT_SCHEMA, load_segments, resegment, write_segments
+)
+from storage.term_index import INDEX_SCHEMA, RESOURCE_FILTER, TAG_FILTER, reindex
+from storage.usage_rollups import ROLLUP_SCHEMA, UsageRollups
+
+# Columns in the order `_row_to_dict` expects, with raw content joined in
+SELECT_COLUMNS = """
+    c.id, c.platform, c.timestamp, c.title, c.summary, c.project, c.topic,
+    c.tags, c.resources, c.key_points, COALESCE(cc.raw_content, c.raw_content),
+    c.processed, c.processed_at, c.source_file, c.url, c.duration, c.created_at
+"""
+
+def select_sql(schema: str, clause: str) -> str:
+    """Conversation query against the hot database ('main') or an attached archive"""
+    return f"""
+        SELECT {SELECT_COLUMNS} FROM {schema}.conversations c
+        LEFT JOIN {schema}.conversation_content cc ON cc.id = c.id
+        {clause}
+    """
+
+def content_hash(raw_content: str) -> str:
+    """Stable digest of conversation content"""
+    return hashlib.sha1((raw_content or '').encode('utf-8', errors='ignore')).hexdigest()
+
+def conversation_id(platform: str, *keys: str) -> str:
+    """Stable conversation id derived from its source or content
+    
+    The same keys always yield the same id, so re-captures update one row
+    instead of colliding with or duplicating other conversations.
+    """
+    digest = hashlib.sha1('\x1f'.join(keys).encode('utf-8', errors='ignore')).hexdigest()
+    return f"{platform}_{digest[:16]}"
 
 class ConversationStorage:
     """Manages conversation data storage and retrieval"""
@@ -15,15 +55,31 @@ class ConversationStorage:
     def __init__(self, config: Dict):
         self.config = config
         self.db_path = Path("storage/conversations.db")
+        
+        storage_config = config.get('storage', {})
+        self.hot_months = storage_config.get('hot_months', 3)
+        self.archive = PartitionArchive(storage_config.get('archive_dir', 'storage/archive'))
+        self.rollups = UsageRollups()
+        
+        # Secrets are masked before content is written; None when disabled
+        self.redactor = SecretRedactor.from_config(config.get('processing', {}).get('redaction', {}))
+        
         self.setup_database()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Connect to the hot database (URI mode, so archives can attach read-only)"""
+        return sqlite3.connect(sqlite_uri(self.db_path, 'rwc'), uri=True)
         
     def setup_database(self):
         """Initialize SQLite database for conversation storage"""
         self.db_path.parent.mkdir(exist_ok=True)
         
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
+        # WAL lets readers, including online backups, run alongside writers
+        cursor.execute("PRAGMA journal_mode=WAL")
+        
         # Create conversations table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS conversations (
@@ -47,21 +103,271 @@ class ConversationStorage:
             )
         """)
         
+        # Raw content lives in its own table so updates to derived fields
+        # never rewrite the (often multi-MB) transcript
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS conversation_content (
+                id TEXT PRIMARY KEY,
+                raw_content TEXT
+            )
+        """)
+        
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(conversations)")]
+        if 'content_hash' not in columns:
+            cursor.execute("ALTER TABLE conversations ADD COLUMN content_hash TEXT")
+        
+        self._migrate_raw_content(cursor)
+        
+        # Summaries of compacted monthly archives, so stats need not count their rows
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archive_partitions (
+                month TEXT PRIMARY KEY,
+                conversations INTEGER,
+                by_platform TEXT,  -- JSON object
+                by_project TEXT,  -- JSON object
+                compacted_at TEXT
+            )
+        """)
+        
+        # The month each archived conversation lives in, kept by compaction
+        cursor.execute("SELECT name FROM sqlite_master WHERE name = 'archived_ids'")
+        new_archived_ids = cursor.fetchone() is None
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archived_ids (
+                id TEXT PRIMARY KEY,
+                month TEXT
+            )
+        """)
+        if new_archived_ids:
+            self._index_archived_ids(conn)
+        
+        # Daily analytics rollups, built from existing rows the first time
+        cursor.execute("SELECT name FROM sqlite_master WHERE name = 'daily_usage'")
+        new_rollups = cursor.fetchone() is None
+        for statement in ROLLUP_SCHEMA:
+            cursor.execute(statement)
+        if new_rollups:
+            self._rebuild_rollups(conn)
+        
+        # Tag and resource lookup tables, built from existing rows the first time
+        cursor.execute("SELECT name FROM sqlite_master WHERE name = 'conversation_tag'")
+        new_index = cursor.fetchone() is None
+        for statement in INDEX_SCHEMA:
+            cursor.execute(statement)
+        if new_index:
+            reindex(cursor)
+            for month in self.archive.months():
+                with self.archive.writable(month) as archive_conn:
+                    reindex(archive_conn.cursor())
+        
+        # Turn and code block tables, built from existing rows the first time
+        cursor.execute("SELECT name FROM sqlite_master WHERE name = 'conversation_turns'")
+        new_segments = cursor.fetchone() is None
+        for statement in SEGMENT_SCHEMA:
+            cursor.execute(statement)
+        if new_segments:
+            resegment(cursor)
+            # Keep the hot database unlocked while archives are rebuilt
+            conn.commit()
+            for month in self.archive.months():
+                with self.archive.writable(month) as archive_conn:
+                    resegment(archive_conn.cursor(), decompress_content)
+        
+        # Map-of-content pages; pages touched by a write are marked dirty and
+        # regenerated on the next export, all of them the first time
+        cursor.execute("SELECT name FROM sqlite_master WHERE name = 'moc_pages'")
+        new_pages = cursor.fetchone() is None
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS moc_pages (
+                kind TEXT,  -- 'project' or 'resource'
+                key TEXT,
+                content_hash TEXT,
+                revision INTEGER DEFAULT 1,  -- bumped by every write that touches the page
+                written_revision INTEGER DEFAULT 0,
+                PRIMARY KEY (kind, key)
+            )
+        """)
+        if new_pages:
+            # Archives can't be detached while a transaction is open, and the
+            # first-time builds above leave one open
+            conn.commit()
+            keys = self._page_keys(cursor)
+            for month in self.archive.months():
+                with self.archive.attached(conn, month) as schema:
+                    keys.update(self._page_keys(cursor, schema=schema))
+            self._mark_pages(cursor, cursor, keys=keys)
+        
+        # Note files written or removed since the last notes-repo sync, and
+        # the note each conversation was last exported to
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS export_manifest (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT,
+                change TEXT,  -- 'write' or 'delete'
+                recorded_at TEXT
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS note_paths (
+                conversation_id TEXT PRIMARY KEY,
+                path TEXT
+            )
+        """)
+        
+        # Secrets masked in stored content, per detector
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS redaction_counts (
+                detector TEXT PRIMARY KEY,
+                secrets INTEGER DEFAULT 0
+            )
+        """)
+        
+        # Track progress of archive imports so they can resume
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS import_progress (
+                archive_key TEXT PRIMARY KEY,
+                position INTEGER DEFAULT 0,
+                completed BOOLEAN DEFAULT FALSE,
+                updated_at TEXT
+            )
+        """)
+        
         conn.commit()
         conn.close()
     
-    async def save_conversation(self, conversation: Dict):
-        """Save a new conversation to storage"""
-        conn = sqlite3.connect(self.db_path)
+    def _migrate_raw_content(self, cursor, batch_size: int = 500):
+        """Move raw content stored inline by older versions to its own table"""
+        while True:
+            cursor.execute("""
+                SELECT id, raw_content FROM conversations
+                WHERE raw_content IS NOT NULL
+                LIMIT ?
+            """, (batch_size,))
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            
+            cursor.executemany(
+                "INSERT OR REPLACE INTO conversation_content (id, raw_content) VALUES (?, ?)",
+                rows
+            )
+            cursor.executemany(
+                "UPDATE conversations SET raw_content = NULL, content_hash = ? WHERE id = ?",
+                [(content_hash(raw_content), conversation_id) for conversation_id, raw_content in rows]
+            )
+    
+    def _index_archived_ids(self, conn):
+        """Map archived ids to their months, dropping all but the newest copy
+        
+        Older versions could archive a recaptured conversation again under
+        its new month; the copy in the newest month is the one kept.
+        """
         cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE name = 'daily_usage'")
+        counted = cursor.fetchone() is not None
+        # Archives can't be detached while a transaction is open
+        conn.commit()
+        stale, contributions = {}, []
+        for month in self.archive.months():
+            with self.archive.attached(conn, month) as schema:
+                cursor.execute(f"""
+                    SELECT id FROM {schema}.conversations
+                    WHERE id IN (SELECT id FROM main.archived_ids)
+                """)
+                stale[month] = [row[0] for row in cursor.fetchall()]
+                if counted:
+                    contributions.extend(self.rollups.collect(cursor, stale[month], schema))
+                cursor.execute(f"""
+                    INSERT OR IGNORE INTO main.archived_ids (id, month)
+                    SELECT id, ? FROM {schema}.conversations
+                """, (month,))
+                conn.commit()
         
-        cursor.execute("""
-            INSERT OR REPLACE INTO conversations 
-            (id, platform, timestamp, title, summary, project, topic, tags, 
-             resources, key_points, raw_content, processed, processed_at, 
-             source_file, url, duration)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        for month, ids in stale.items():
+            if ids:
+                with self.archive.writable(month) as archive_conn:
+                    remove_conversations(archive_conn.cursor(), ids)
+                    record_partition(cursor, month, self.archive.summarize(archive_conn))
+        
+        # The dropped copies were counted in the rollups unless a hot row shadowed them
+        if contributions:
+            self.rollups.apply(cursor, contributions, -1)
+    
+    def _rebuild_rollups(self, conn):
+        """Compute the analytics rollups from the hot database and every archive"""
+        cursor = conn.cursor()
+        contributions = self.rollups.collect(cursor)
+        for month in self.archive.months():
+            with self.archive.attached(conn, month) as schema:
+                contributions.extend(self.rollups.collect(cursor, schema=schema))
+        
+        for table in ('daily_usage', 'daily_projects', 'daily_tags'):
+            cursor.execute(f"DELETE FROM {table}")
+        self.rollups.apply(cursor, contributions, 1)
+    
+    def _page_keys(self, cursor, ids: Optional[Iterable[str]] = None,
+                   schema: str = 'main') -> set:
+        """(kind, key) of the map-of-content pages that link to conversations"""
+        query = f"SELECT project, resources FROM {schema}.conversations"
+        if ids is None:
+            rows = cursor.execute(query).fetchall()
+        else:
+            ids, rows = list(ids), []
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                cursor.execute(query + f" WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+                rows.extend(cursor.fetchall())
+        
+        keys = set()
+        for project, resources in rows:
+            if project:
+                keys.add(('project', project))
+            try:
+                keys.update(('resource', resource) for resource in json.loads(resources or '[]'))
+            except (json.JSONDecodeError, TypeError):
+                pass
+        return keys
+    
+    def _mark_pages(self, cursor, page_cursor, ids: Optional[Iterable[str]] = None,
+                    schema: str = 'main', keys: Optional[set] = None):
+        """Mark the map-of-content pages of conversations for regeneration"""
+        if keys is None:
+            keys = self._page_keys(cursor, ids, schema)
+        page_cursor.executemany("""
+            INSERT INTO moc_pages (kind, key) VALUES (?, ?)
+            ON CONFLICT(kind, key) DO UPDATE SET revision = revision + 1
+        """, sorted(keys))
+    
+    CAPTURE_SQL = """
+        INSERT INTO conversations 
+        (id, platform, timestamp, title, summary, project, topic, tags, 
+         resources, key_points, processed, processed_at, 
+         source_file, url, duration, content_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            title = excluded.title,
+            source_file = excluded.source_file,
+            url = excluded.url,
+            content_hash = excluded.content_hash,
+            processed = FALSE,
+            processed_at = NULL
+    """
+    
+    CONTENT_SQL = """
+        INSERT INTO conversation_content (id, raw_content) VALUES (?, ?)
+        ON CONFLICT(id) DO UPDATE SET raw_content = excluded.raw_content
+    """
+    
+    PROCESSED_SQL = """
+        UPDATE conversations SET
+            summary = ?, project = ?, topic = ?, tags = ?, resources = ?,
+            key_points = ?, processed = ?, processed_at = ?, duration = ?
+        WHERE id = ?
+    """
+    
+    def _conversation_params(self, conversation: Dict, digest: str) -> tuple:
+        """Column values for a new conversation row"""
+        return (
             conversation['id'],
             conversation['platform'],
             conversation['timestamp'].isoformat(),
@@ -72,83 +378,554 @@ class ConversationStorage:
             json.dumps(conversation.get('tags', [])),
             json.dumps(conversation.get('resources', [])),
             json.dumps(conversation.get('key_points', [])),
-            conversation.get('raw_content', ''),
             conversation.get('processed', False),
             conversation.get('processed_at', datetime.now()).isoformat() if conversation.get('processed_at') else None,
             conversation.get('source_file', ''),
             conversation.get('url', ''),
-            conversation.get('duration', '')
-        ))
+            conversation.get('duration', ''),
+            digest
+        )
+    
+    def _write_captured(self, cursor, conversations: List[Dict]) -> int:
+        """Upsert captured conversations whose content is new or changed
+        
+        Unchanged conversations are skipped entirely. A changed conversation
+        updates only its capture columns and content, and is marked for
+        reprocessing. Returns the number of conversations written.
+        """
+        digests = {}
+        for conversation in conversations:
+            digests[conversation['id']] = content_hash(conversation.get('raw_content', ''))
+        
+        existing = {}
+        ids = list(digests)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            cursor.execute(
+                f"SELECT id, content_hash FROM conversations WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            existing.update(cursor.fetchall())
+        
+        archived = self._archived_hashes(cursor, conversations, existing)
+        
+        changed = {}
+        for conversation in conversations:
+            conversation_id = conversation['id']
+            if conversation_id in archived:
+                known = archived[conversation_id][1]
+            else:
+                known = existing.get(conversation_id)
+            if known != digests[conversation_id]:
+                changed[conversation_id] = conversation
+        
+        # Only changed conversations are redacted. Their hash stays that of
+        # the captured content, so an unchanged re-capture is still skipped.
+        counts = {}
+        if self.redactor is not None:
+            for conversation_id, conversation in changed.items():
+                content, found = self.redactor.redact(conversation.get('raw_content', ''))
+                if found:
+                    changed[conversation_id] = {**conversation, 'raw_content': content}
+                    for detector, secrets in found.items():
+                        counts[detector] = counts.get(detector, 0) + secrets
+        
+        # Swap the rows' old rollup contributions for their new ones. A hot
+        # copy of an archived conversation replaces the archived contribution,
+        # whichever month it was archived under.
+        # Archives are read before any write, as they can't be detached
+        # inside a transaction.
+        before = self.rollups.collect(cursor, changed)
+        shadowed = {}
+        for conversation_id in changed:
+            if conversation_id in archived:
+                shadowed.setdefault(archived[conversation_id][0], []).append(conversation_id)
+        for month, ids in shadowed.items():
+            with self.archive.attached(cursor.connection, month) as schema:
+                before.extend(self.rollups.collect(cursor, ids, schema))
+        self.rollups.apply(cursor, before, -1)
+        self._record_redactions(cursor, counts)
+        
+        cursor.executemany(
+            self.CAPTURE_SQL,
+            [self._conversation_params(c, digests[c['id']]) for c in changed.values()]
+        )
+        cursor.executemany(
+            self.CONTENT_SQL,
+            [(c['id'], c.get('raw_content', '')) for c in changed.values()]
+        )
+        write_segments(cursor, {c['id']: c.get('raw_content', '') for c in changed.values()})
+        self.rollups.apply(cursor, self.rollups.collect(cursor, changed), 1)
+        reindex(cursor, changed)
+        return len(changed)
+    
+    def _record_redactions(self, cursor, counts: Dict[str, int]):
+        cursor.executemany("""
+            INSERT INTO redaction_counts (detector, secrets) VALUES (?, ?)
+            ON CONFLICT(detector) DO UPDATE SET secrets = secrets + excluded.secrets
+        """, list(counts.items()))
+    
+    def _archived_hashes(self, cursor, conversations: List[Dict], known: Dict) -> Dict:
+        """(month, content hash) of conversations already compacted into an archive
+        
+        The archived id index says which month, if any, holds each
+        conversation, so captures of current conversations never touch
+        cold partitions.
+        """
+        ids = [conversation['id'] for conversation in conversations if conversation['id'] not in known]
+        by_month = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            cursor.execute(
+                f"SELECT id, month FROM archived_ids WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            for conversation_id, month in cursor.fetchall():
+                by_month.setdefault(month, []).append(conversation_id)
+        
+        hashes = {}
+        for month, ids in by_month.items():
+            if not self.archive.path(month).exists():
+                continue
+            with self.archive.attached(cursor.connection, month) as schema:
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    cursor.execute(
+                        f"SELECT id, content_hash FROM {schema}.conversations "
+                        f"WHERE id IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    )
+                    for conversation_id, digest in cursor.fetchall():
+                        hashes[conversation_id] = (month, digest)
+        return hashes
+    
+    async def save_conversation(self, conversation: Dict):
+        """Save a new conversation to storage"""
+        await self.save_conversations([conversation])
+    
+    async def save_conversations(self, conversations: List[Dict]) -> int:
+        """Save a batch of conversations in a single transaction"""
+        if not conversations:
+            return 0
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        written = self._write_captured(cursor, conversations)
+        
+        conn.commit()
+        conn.close()
+        
+        return written
+    
+    async def import_conversations(self, conversations: List[Dict], archive_key: str,
+                                   position: int, completed: bool = False) -> int:
+        """Upsert imported conversations and checkpoint the import position
+        
+        Conversations whose content is unchanged are left untouched, so
+        re-importing an export does not reset processed data. Returns the
+        number of rows inserted or updated.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        written = self._write_captured(cursor, conversations)
+        
+        cursor.execute("""
+            INSERT OR REPLACE INTO import_progress (archive_key, position, completed, updated_at)
+            VALUES (?, ?, ?, ?)
+        """, (archive_key, position, completed, datetime.now().isoformat()))
         
         conn.commit()
         conn.close()
+        
+        return written
+    
+    async def get_import_checkpoint(self, archive_key: str) -> int:
+        """Get how many items of an unfinished import were already committed"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT position, completed FROM import_progress WHERE archive_key = ?
+        """, (archive_key,))
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        if row is None or row[1]:
+            return 0
+        return row[0]
     
     async def get_unprocessed_conversations(self) -> List[Dict]:
         """Get conversations that haven't been processed yet"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
-        cursor.execute("""
-            SELECT * FROM conversations 
-            WHERE processed = FALSE 
-            ORDER BY timestamp DESC
-        """)
+        # Only processed conversations are ever archived
+        cursor.execute(select_sql('main', "WHERE c.processed = FALSE ORDER BY c.timestamp DESC"))
         
         rows = cursor.fetchall()
+        
+        # Turns and code blocks were found when the content was stored
+        segments = load_segments(cursor, [row[0] for row in rows])
         conn.close()
         
         conversations = []
         for row in rows:
             conversation = self._row_to_dict(row)
+            conversation['segments'] = segments[conversation['id']]
             conversations.append(conversation)
         
         return conversations
     
     async def save_processed_conversation(self, conversation: Dict):
-        """Update conversation with processed data"""
-        await self.save_conversation(conversation)
+        """Update conversation with processed data
+        
+        Only the derived columns are written. Raw content is rewritten only
+        when processing masked secrets in it, which happens to content
+        stored before redaction was enabled.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        # Processing only changes the project and tags rollups, and the
+        # content size if it masked secrets
+        redactions = conversation.get('redactions')
+        before = self.rollups.collect(cursor, [conversation['id']], with_bytes=bool(redactions))
+        self._mark_pages(cursor, cursor, [conversation['id']])
+        cursor.execute(self.PROCESSED_SQL, (
+            conversation.get('summary', ''),
+            conversation.get('project', ''),
+            conversation.get('topic', ''),
+            json.dumps(conversation.get('tags', [])),
+            json.dumps(conversation.get('resources', [])),
+            json.dumps(conversation.get('key_points', [])),
+            conversation.get('processed', False),
+            conversation['processed_at'].isoformat() if conversation.get('processed_at') else None,
+            conversation.get('duration', ''),
+            conversation['id']
+        ))
+        if redactions:
+            cursor.execute(self.CONTENT_SQL, (conversation['id'], conversation['raw_content']))
+            write_segments(cursor, {conversation['id']: conversation['raw_content']})
+            self._record_redactions(cursor, redactions)
+        after = self.rollups.collect(cursor, [conversation['id']], with_bytes=bool(redactions))
+        self.rollups.apply(cursor, before, -1, usage=bool(redactions))
+        self.rollups.apply(cursor, after, 1, usage=bool(redactions))
+        reindex(cursor, [conversation['id']])
+        self._mark_pages(cursor, cursor, [conversation['id']])
+        
+        conn.commit()
+        conn.close()
+    
+    def _query_partitions(self, condition: str = "", params: tuple = (),
+                          limit: Optional[int] = None) -> List[Dict]:
+        """Query conversations in the hot database, then archives, newest first
+        
+        Archives are attached one at a time, newest month first, and only
+        while more rows are needed. Archived rows shadowed by a newer copy in
+        the hot database are skipped. `{schema}` in the condition is replaced
+        with the database being queried.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        limit_clause = " LIMIT ?" if limit is not None else ""
+        
+        def query(schema: str, remaining: Optional[int]) -> List[Dict]:
+            conditions = [condition.format(schema=schema)] if condition else []
+            if schema != 'main':
+                conditions.append("c.id NOT IN (SELECT id FROM main.conversations)")
+            where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+            cursor.execute(
+                select_sql(schema, where + "ORDER BY c.timestamp DESC" + limit_clause),
+                params + ((remaining,) if limit is not None else ())
+            )
+            return [self._row_to_dict(row) for row in cursor.fetchall()]
+        
+        conversations = query('main', limit)
+        for month in self.archive.months():
+            if limit is not None and len(conversations) >= limit:
+                break
+            with self.archive.attached(conn, month) as schema:
+                conversations.extend(query(schema, None if limit is None else limit - len(conversations)))
+        
+        conn.close()
+        
+        # Unprocessed conversations stay hot regardless of age
+        conversations.sort(key=lambda conversation: str(conversation['timestamp']), reverse=True)
+        if limit is not None:
+            conversations = conversations[:limit]
+        return conversations
     
     async def get_conversations_by_project(self, project: str) -> List[Dict]:
         """Get conversations for a specific project"""
-        conn = sqlite3.connect(self.db_path)
+        return self._query_partitions("c.project = ?", (project,))
+    
+    async def search_conversations(self, tag: Optional[str] = None,
+                                   resource: Optional[str] = None,
+                                   project: Optional[str] = None,
+                                   limit: Optional[int] = None,
+                                   language: Optional[str] = None) -> List[Dict]:
+        """Get conversations matching all of the given filters, newest first
+        
+        Tags match case-insensitively. A resource matches its full path or
+        URL, or just its file name. A language matches conversations with a
+        code block in it.
+        """
+        conditions, params = [], []
+        if tag:
+            conditions.append(TAG_FILTER)
+            params.append(tag)
+        if resource:
+            conditions.append(RESOURCE_FILTER)
+            params.extend([resource, resource])
+        if project:
+            conditions.append("c.project = ?")
+            params.append(project)
+        if language:
+            conditions.append(LANGUAGE_FILTER)
+            params.append(normalize_language(language))
+        
+        return self._query_partitions(' AND '.join(conditions), tuple(params), limit)
+    
+    async def get_recent_conversations(self, limit: int = 50) -> List[Dict]:
+        """Get recent conversations
+        
+        Served from the hot database unless it holds fewer than `limit`.
+        """
+        return self._query_partitions(limit=limit)
+    
+    async def get_conversation_texts(self) -> List[Dict]:
+        """Get the text fields of every conversation, for batch jobs"""
+        return [
+            {
+                'id': conversation['id'],
+                'title': conversation['title'],
+                'source_file': conversation['source_file'],
+                'raw_content': conversation['raw_content']
+            }
+            for conversation in self._query_partitions()
+        ]
+    
+    async def update_projects(self, projects: Dict[str, str]):
+        """Bulk update the project of conversations by id"""
+        conn = self._connect()
         cursor = conn.cursor()
         
-        cursor.execute("""
-            SELECT * FROM conversations 
-            WHERE project = ? 
-            ORDER BY timestamp DESC
-        """, (project,))
+        updates = [(project, conversation_id) for conversation_id, project in projects.items()]
+        hot_ids = self._update_projects(cursor, cursor, updates)
         
-        rows = cursor.fetchall()
+        # Recluster is a maintenance job, so it may rewrite archived months.
+        # Archived copies shadowed by a hot row are updated but not counted.
+        archived_updates = [update for update in updates if update[1] not in hot_ids]
+        for month in self.archive.months():
+            with self.archive.writable(month) as archive_conn:
+                archive_conn.executemany("UPDATE conversations SET project = ? WHERE id = ?",
+                                         [update for update in updates if update[1] in hot_ids])
+                self._update_projects(archive_conn.cursor(), cursor, archived_updates)
+                record_partition(cursor, month, self.archive.summarize(archive_conn))
+        
+        conn.commit()
         conn.close()
+    
+    def _update_projects(self, cursor, rollup_cursor, updates: List[tuple]) -> set:
+        """Apply project updates in one database, moving their project rollups
         
-        conversations = []
-        for row in rows:
-            conversation = self._row_to_dict(row)
-            conversations.append(conversation)
+        Returns the ids that were found in that database.
+        """
+        ids = [conversation_id for _, conversation_id in updates]
+        found = set()
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            cursor.execute(
+                f"SELECT id FROM conversations WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update(row[0] for row in cursor.fetchall())
         
-        return conversations
+        before = self.rollups.collect(cursor, found, with_bytes=False)
+        cursor.executemany("UPDATE conversations SET project = ? WHERE id = ?", updates)
+        after = self.rollups.collect(cursor, found, with_bytes=False)
+        self.rollups.apply(rollup_cursor, before, -1, usage=False, tags=False)
+        self.rollups.apply(rollup_cursor, after, 1, usage=False, tags=False)
+        
+        projects = {project for _, _, project, _, _ in before + after if project}
+        self._mark_pages(cursor, rollup_cursor, keys={('project', project) for project in projects})
+        return found
     
-    async def get_recent_conversations(self, limit: int = 50) -> List[Dict]:
-        """Get recent conversations"""
-        conn = sqlite3.connect(self.db_path)
+    async def get_dirty_pages(self) -> List[tuple]:
+        """Map-of-content pages that may need regenerating
+        
+        Returns (kind, key, content_hash, revision) tuples, where content_hash
+        is that of the page as last written.
+        """
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute("""
-            SELECT * FROM conversations 
-            ORDER BY timestamp DESC 
-            LIMIT ?
-        """, (limit,))
+            SELECT kind, key, content_hash, revision FROM moc_pages
+            WHERE revision > written_revision ORDER BY kind, key
+        """)
+        pages = cursor.fetchall()
         
-        rows = cursor.fetchall()
         conn.close()
+        return pages
+    
+    async def get_page_links(self, kind: str, key: str) -> List[Dict]:
+        """Conversations a map-of-content page links to, newest first
         
-        conversations = []
-        for row in rows:
-            conversation = self._row_to_dict(row)
-            conversations.append(conversation)
+        Reads only the note name fields, through the project column or the
+        resource index, across the hot database and every archive.
+        """
+        if kind == 'project':
+            condition, params = "c.project = ?", (key,)
+        else:
+            condition = "c.id IN (SELECT conversation_id FROM {schema}.conversation_resource WHERE resource = ?)"
+            params = (key,)
         
-        return conversations
+        conn = self._connect()
+        cursor = conn.cursor()
+        columns = ['id', 'timestamp', 'platform', 'topic', 'title']
+        
+        def query(schema: str) -> List[Dict]:
+            shadowed = " AND c.id NOT IN (SELECT id FROM main.conversations)" if schema != 'main' else ""
+            cursor.execute(f"""
+                SELECT c.id, c.timestamp, c.platform, c.topic, c.title
+                FROM {schema}.conversations c
+                WHERE c.processed = TRUE AND {condition.format(schema=schema)}{shadowed}
+            """, params)
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        
+        links = query('main')
+        for month in self.archive.months():
+            with self.archive.attached(conn, month) as schema:
+                links.extend(query(schema))
+        
+        conn.close()
+        
+        for link in links:
+            link['timestamp'] = datetime.fromisoformat(link['timestamp'])
+        links.sort(key=lambda link: (link['timestamp'], link['id']), reverse=True)
+        return links
+    
+    async def save_page_state(self, pages: List[tuple]):
+        """Record pages as written, from (kind, key, content_hash, revision) tuples
+        
+        A page touched again since `revision` was read stays dirty.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.executemany("""
+            UPDATE moc_pages SET content_hash = ?, written_revision = ?
+            WHERE kind = ? AND key = ?
+        """, [(content_hash, revision, kind, key) for kind, key, content_hash, revision in pages])
+        
+        conn.commit()
+        conn.close()
+    
+    async def record_exports(self, changes: List[tuple], note: Optional[tuple] = None):
+        """Record note files changed by an export as (path, 'write' | 'delete')
+        
+        `note` is an optional (conversation_id, path) of the conversation's
+        own note, remembered so a later rename can remove the old file.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        recorded_at = datetime.now().isoformat()
+        cursor.executemany(
+            "INSERT INTO export_manifest (path, change, recorded_at) VALUES (?, ?, ?)",
+            [(path, change, recorded_at) for path, change in changes]
+        )
+        if note is not None:
+            cursor.execute("INSERT OR REPLACE INTO note_paths (conversation_id, path) VALUES (?, ?)", note)
+        
+        conn.commit()
+        conn.close()
+    
+    async def get_note_path(self, conversation_id: str) -> Optional[str]:
+        """Path of the note a conversation was last exported to"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT path FROM note_paths WHERE conversation_id = ?", (conversation_id,))
+        row = cursor.fetchone()
+        
+        conn.close()
+        return row[0] if row else None
+    
+    async def get_export_manifest(self) -> tuple:
+        """Pending note changes as (last manifest id, {path: latest change})"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT id, path, change FROM export_manifest ORDER BY id")
+        last_id, changes = 0, {}
+        for last_id, path, change in cursor.fetchall():
+            changes[path] = change
+        
+        conn.close()
+        return last_id, changes
+    
+    async def clear_export_manifest(self, last_id: int):
+        """Forget changes up to `last_id` once they are committed"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute("DELETE FROM export_manifest WHERE id <= ?", (last_id,))
+        
+        conn.commit()
+        conn.close()
+    
+    async def get_usage(self, dimension: str = 'platform', period: str = 'week',
+                        since: Optional[str] = None, until: Optional[str] = None,
+                        top: Optional[int] = None) -> List[Dict]:
+        """Usage per period from the daily rollups
+        
+        `dimension` is 'platform', 'project' or 'tag'; `period` is 'day',
+        'week' or 'month'. Dates are 'YYYY-MM-DD' strings.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        rows = self.rollups.query(cursor, dimension, period, since, until, top)
+        
+        conn.close()
+        return rows
+    
+    async def compact(self, hot_months: Optional[int] = None) -> Dict[str, int]:
+        """Move processed conversations older than the hot window to archives
+        
+        Returns the number of conversations moved per month.
+        """
+        hot_months = self.hot_months if hot_months is None else hot_months
+        today = datetime.now()
+        month_index = today.year * 12 + today.month - 1 - (hot_months - 1)
+        cutoff = f"{month_index // 12:04d}-{month_index % 12 + 1:02d}"
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT DISTINCT substr(timestamp, 1, 7) FROM conversations
+            WHERE processed = TRUE AND substr(timestamp, 1, 7) < ?
+        """, (cutoff,))
+        months = [row[0] for row in cursor.fetchall()]
+        
+        moved = {}
+        for month in months:
+            summary = self.archive.compact_month(conn, month)
+            record_partition(cursor, month, summary)
+            for old_month, old_summary in summary['relocated'].items():
+                record_partition(cursor, old_month, old_summary)
+            conn.commit()
+            moved[month] = summary['moved']
+        
+        if moved:
+            conn.execute("VACUUM")
+        conn.close()
+        
+        return moved
     
     def _row_to_dict(self, row) -> Dict:
         """Convert database row to conversation dictionary"""
@@ -163,8 +940,12 @@ class ConversationStorage:
         for i, column in enumerate(columns):
             value = row[i]
             
+            # Archived content is stored compressed
+            if column == 'raw_content' and isinstance(value, bytes):
+                value = decompress_content(value)
+            
             # Parse JSON fields
-            if column in ['tags', 'resources', 'key_points'] and value:
+            elif column in ['tags', 'resources', 'key_points'] and value:
                 try:
                     value = json.loads(value)
                 except json.JSONDecodeError:
@@ -187,7 +968,7 @@ class ConversationStorage:
     
     async def get_storage_stats(self) -> Dict:
         """Get storage statistics"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Total conversations
@@ -206,12 +987,47 @@ class ConversationStorage:
         cursor.execute("SELECT project, COUNT(*) FROM conversations GROUP BY project")
         by_project = dict(cursor.fetchall())
         
+        cursor.execute("SELECT detector, secrets FROM redaction_counts ORDER BY detector")
+        redactions = dict(cursor.fetchall())
+        
+        # Archived months, from the manifest rather than the archives
+        cursor.execute("SELECT month, conversations, by_platform, by_project FROM archive_partitions")
+        months = []
+        for month, archived, archived_platforms, archived_projects in cursor.fetchall():
+            months.append(month)
+            total += archived
+            processed += archived
+            for platform, count in json.loads(archived_platforms).items():
+                by_platform[platform] = by_platform.get(platform, 0) + count
+            for project, count in json.loads(archived_projects).items():
+                # JSON keys turn a missing project into 'null'
+                project = None if project == 'null' else project
+                by_project[project] = by_project.get(project, 0) + count
+        
+        # An archived conversation captured again is counted by its hot row
+        for month in months:
+            if not self.archive.path(month).exists():
+                continue
+            with self.archive.attached(conn, month) as schema:
+                cursor.execute(f"""
+                    SELECT platform, project, COUNT(*) FROM {schema}.conversations
+                    WHERE id IN (SELECT id FROM main.conversations)
+                    GROUP BY platform, project
+                """)
+                shadowed = cursor.fetchall()
+            for platform, project, count in shadowed:
+                total -= count
+                processed -= count
+                by_platform[platform] = by_platform.get(platform, 0) - count
+                by_project[project] = by_project.get(project, 0) - count
+        
         conn.close()
         
         return {
             'total_conversations': total,
             'processed_conversations': processed,
             'unprocessed_conversations': total - processed,
-            'by_platform': by_platform,
-            'by_project': by_project
+            'by_platform': {key: count for key, count in by_platform.items() if count},
+            'by_project': {key: count for key, count in by_project.items() if count},
+            'redactions': redactions
         }
@@ -0,0 +1,88 @@
+"""
+Notes Sync
+Commits exactly the note files changed by exports to the notes git repository
+"""
+
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class GitError(Exception):
+    """Raised when a git command fails"""
+
+
+class NotesSync:
+    """Stages the export manifest's paths and commits them in one commit
+
+    Only the recorded paths are handed to `git update-index` and `git
+    commit`, so a sync never scans the rest of the repository's work tree
+    and never commits anything else the user has staged. Changes recorded
+    while a sync runs are kept for the next one.
+    """
+
+    def __init__(self, storage, sync_config: Dict, obsidian_config: Dict):
+        self.storage = storage
+        self.repo_path = Path(sync_config.get('notes_repo') or obsidian_config.get('vault_path', ''))
+        self.push = sync_config.get('push', False)
+        self.message = sync_config.get('commit_message', '🤖 Auto-sync AI conversations - {timestamp}')
+
+    async def _git(self, *args: str, stdin: Optional[bytes] = None,
+                   check: bool = True) -> tuple:
+        process = await asyncio.create_subprocess_exec(
+            'git', *args, cwd=str(self.repo_path),
+            stdin=asyncio.subprocess.PIPE if stdin is not None else None,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate(stdin)
+        if check and process.returncode != 0:
+            raise GitError(f"git {args[0]} failed: {stderr.decode('utf-8', 'replace').strip()}")
+        return process.returncode, stdout.decode('utf-8', 'replace').strip()
+
+    def _relative_paths(self, root: Path, paths: List[str]) -> List[str]:
+        relative = []
+        for path in paths:
+            try:
+                relative.append(Path(path).relative_to(root).as_posix())
+            except ValueError:
+                print(f"Skipping note outside the notes repository: {path}")
+        return relative
+
+    async def sync(self) -> Dict:
+        """Commit pending note changes; returns what was staged and committed"""
+        last_id, changes = await self.storage.get_export_manifest()
+        result = {'paths': len(changes), 'committed': False, 'commit': None}
+        if not changes:
+            return result
+
+        _, toplevel = await self._git('rev-parse', '--show-toplevel')
+        root = Path(toplevel).resolve()
+        paths = self._relative_paths(root, sorted(changes))
+        if not paths:
+            await self.storage.clear_export_manifest(last_id)
+            return result
+
+        # --add/--remove stage new, modified and deleted files alike
+        await self._git('update-index', '--add', '--remove', '-z', '--stdin',
+                        stdin=b''.join(path.encode('utf-8') + b'\0' for path in paths))
+
+        # Of the notes, those that differ from HEAD; a note written and
+        # removed again since the last sync is unknown to git
+        _, staged = await self._git('diff', '--cached', '--name-only', '-z', '--',
+                                    *(f":(literal){path}" for path in paths))
+        staged = [path for path in staged.split('\0') if path]
+        if staged:
+            message = self.message.format(timestamp=datetime.now().strftime('%Y-%m-%d %H:%M'),
+                                          count=len(staged))
+            # --only leaves whatever else the user has staged out of the commit
+            await self._git('commit', '-q', '--only', '--pathspec-from-file=-', '--pathspec-file-nul',
+                            '-m', message,
+                            stdin=b''.join(f":(literal){path}".encode('utf-8') + b'\0' for path in staged))
+            _, result['commit'] = await self._git('rev-parse', '--short', 'HEAD')
+            result['committed'] = True
+            if self.push:
+                await self._git('push', '-q')
+
+        await self.storage.clear_export_manifest(last_id)
+        return result
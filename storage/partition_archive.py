@@ -0,0 +1,263 @@
+"""
+Partition Archive
+Monthly cold partitions compacted out of the hot conversation database
+"""
+
+import json
+import os
+import re
+import sqlite3
+import stat
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+from urllib.request import pathname2url
+
+from storage.segment_index import SEGMENT_SCHEMA
+from storage.term_index import INDEX_SCHEMA
+
+ARCHIVE_NAME = re.compile(r'^conversations-(\d{4}-\d{2})\.db$')
+
+ARCHIVE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS conversations (
+        id TEXT PRIMARY KEY,
+        platform TEXT,
+        timestamp TEXT,
+        title TEXT,
+        summary TEXT,
+        project TEXT,
+        topic TEXT,
+        tags TEXT,
+        resources TEXT,
+        key_points TEXT,
+        raw_content TEXT,
+        processed BOOLEAN DEFAULT FALSE,
+        processed_at TEXT,
+        source_file TEXT,
+        url TEXT,
+        duration TEXT,
+        created_at TEXT,
+        content_hash TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS conversation_content (
+        id TEXT PRIMARY KEY,
+        raw_content BLOB  -- zlib-compressed
+    )
+    """,
+] + INDEX_SCHEMA + SEGMENT_SCHEMA
+
+# Per-conversation rows outside the conversations and content tables
+CONVERSATION_TABLES = ('conversation_tag', 'conversation_resource',
+                       'conversation_turns', 'conversation_code_blocks')
+
+CONVERSATION_COLUMNS = """
+    id, platform, timestamp, title, summary, project, topic, tags, resources,
+    key_points, raw_content, processed, processed_at, source_file, url,
+    duration, created_at, content_hash
+"""
+
+
+def compress_content(raw_content) -> bytes:
+    return zlib.compress((raw_content or '').encode('utf-8'), 6)
+
+
+def decompress_content(value) -> str:
+    return zlib.decompress(value).decode('utf-8')
+
+
+def sqlite_uri(path: Path, mode: str = 'rw') -> str:
+    return f"file:{pathname2url(str(Path(path).resolve()))}?mode={mode}"
+
+
+class PartitionArchive:
+    """Read-only monthly archive databases
+
+    Each archived month is its own SQLite file with zlib-compressed content.
+    Queries attach only the months they need, read-only; compaction is the
+    only operation that writes to an archive.
+    """
+
+    def __init__(self, archive_dir: str):
+        self.archive_dir = Path(archive_dir)
+
+    def months(self) -> List[str]:
+        """Archived months, newest first"""
+        if not self.archive_dir.exists():
+            return []
+        months = []
+        for entry in os.scandir(self.archive_dir):
+            match = ARCHIVE_NAME.match(entry.name)
+            if match:
+                months.append(match.group(1))
+        return sorted(months, reverse=True)
+
+    def path(self, month: str) -> Path:
+        return self.archive_dir / f"conversations-{month}.db"
+
+    @contextmanager
+    def attached(self, conn: sqlite3.Connection, month: str, alias: str = 'archive'):
+        """Attach one month read-only to a connection for the duration of a block"""
+        conn.execute(f"ATTACH DATABASE ? AS {alias}", (sqlite_uri(self.path(month), 'ro'),))
+        try:
+            yield alias
+        finally:
+            conn.execute(f"DETACH DATABASE {alias}")
+
+    def _unseal(self, month: str) -> Path:
+        """Make an archive writable, creating it and its schema if needed"""
+        path = self.path(month)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            os.chmod(path, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP)
+        conn = sqlite3.connect(path)
+        for statement in ARCHIVE_SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+        conn.close()
+        return path
+
+    def _seal(self, month: str):
+        os.chmod(self.path(month), stat.S_IRUSR | stat.S_IRGRP)
+
+    @contextmanager
+    def writable(self, month: str):
+        """Open an archive for maintenance, sealing it read-only afterwards"""
+        path = self._unseal(month)
+        try:
+            conn = sqlite3.connect(path)
+            try:
+                yield conn
+                conn.commit()
+            finally:
+                conn.close()
+        finally:
+            self._seal(month)
+
+    def compact_month(self, hot_conn: sqlite3.Connection, month: str) -> Dict:
+        """Move a month's processed conversations from the hot database
+
+        Rows are copied into the month's archive and deleted from the hot
+        database in one transaction. Copies archived under another month,
+        by conversations recaptured with a new timestamp, are removed first;
+        until the move commits the hot row is still the live copy. Returns
+        the archive's summary, with those of the months copies were removed
+        from under 'relocated'.
+        """
+        stale = {}
+        for old_month, conversation_id in hot_conn.execute("""
+            SELECT a.month, a.id FROM main.archived_ids a
+            JOIN main.conversations c ON c.id = a.id
+            WHERE substr(c.timestamp, 1, 7) = ? AND c.processed = 1 AND a.month != ?
+        """, (month, month)).fetchall():
+            stale.setdefault(old_month, []).append(conversation_id)
+        relocated = {}
+        for old_month, ids in stale.items():
+            if self.path(old_month).exists():
+                with self.writable(old_month) as conn:
+                    remove_conversations(conn.cursor(), ids)
+                    relocated[old_month] = self.summarize(conn)
+
+        path = self._unseal(month)
+        try:
+            hot_conn.create_function('gulp_compress', 1, compress_content)
+            hot_conn.execute("ATTACH DATABASE ? AS compact_target", (sqlite_uri(path, 'rw'),))
+            try:
+                cursor = hot_conn.cursor()
+                cursor.execute("""
+                    CREATE TEMP TABLE compact_ids AS
+                    SELECT id FROM main.conversations
+                    WHERE substr(timestamp, 1, 7) = ? AND processed = 1
+                """, (month,))
+                cursor.execute(f"""
+                    INSERT OR REPLACE INTO compact_target.conversations ({CONVERSATION_COLUMNS})
+                    SELECT {CONVERSATION_COLUMNS} FROM main.conversations
+                    WHERE id IN (SELECT id FROM compact_ids)
+                """)
+                cursor.execute("""
+                    INSERT OR REPLACE INTO compact_target.conversation_content (id, raw_content)
+                    SELECT id, gulp_compress(raw_content) FROM main.conversation_content
+                    WHERE id IN (SELECT id FROM compact_ids)
+                """)
+                cursor.execute("""
+                    INSERT OR REPLACE INTO main.archived_ids (id, month)
+                    SELECT id, ? FROM compact_ids
+                """, (month,))
+                for table in CONVERSATION_TABLES:
+                    cursor.execute(f"""
+                        DELETE FROM compact_target.{table}
+                        WHERE conversation_id IN (SELECT id FROM compact_ids)
+                    """)
+                    cursor.execute(f"""
+                        INSERT INTO compact_target.{table}
+                        SELECT * FROM main.{table}
+                        WHERE conversation_id IN (SELECT id FROM compact_ids)
+                    """)
+                    cursor.execute(f"""
+                        DELETE FROM main.{table} WHERE conversation_id IN (SELECT id FROM compact_ids)
+                    """)
+                cursor.execute("""
+                    DELETE FROM main.conversation_content WHERE id IN (SELECT id FROM compact_ids)
+                """)
+                cursor.execute("""
+                    DELETE FROM main.conversations WHERE id IN (SELECT id FROM compact_ids)
+                """)
+                moved = cursor.execute("SELECT COUNT(*) FROM compact_ids").fetchone()[0]
+                cursor.execute("DROP TABLE compact_ids")
+                hot_conn.commit()
+            finally:
+                hot_conn.execute("DETACH DATABASE compact_target")
+
+            conn = sqlite3.connect(path)
+            try:
+                conn.execute("VACUUM")
+                summary = self.summarize(conn)
+            finally:
+                conn.close()
+        finally:
+            self._seal(month)
+
+        summary['moved'] = moved
+        summary['relocated'] = relocated
+        return summary
+
+    def summarize(self, conn: sqlite3.Connection, schema: str = 'main') -> Dict:
+        """Counts for an archive, stored in the hot database's manifest"""
+        total = conn.execute(f"SELECT COUNT(*) FROM {schema}.conversations").fetchone()[0]
+        by_platform = dict(conn.execute(
+            f"SELECT platform, COUNT(*) FROM {schema}.conversations GROUP BY platform"
+        ).fetchall())
+        by_project = dict(conn.execute(
+            f"SELECT project, COUNT(*) FROM {schema}.conversations GROUP BY project"
+        ).fetchall())
+        return {'conversations': total, 'by_platform': by_platform, 'by_project': by_project}
+
+
+def remove_conversations(cursor, ids: List[str]):
+    """Delete conversations and everything stored with them from an archive"""
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        placeholders = ','.join('?' * len(chunk))
+        for table in CONVERSATION_TABLES:
+            cursor.execute(f"DELETE FROM {table} WHERE conversation_id IN ({placeholders})", chunk)
+        cursor.execute(f"DELETE FROM conversation_content WHERE id IN ({placeholders})", chunk)
+        cursor.execute(f"DELETE FROM conversations WHERE id IN ({placeholders})", chunk)
+
+
+def record_partition(cursor, month: str, summary: Dict):
+    """Store an archive's summary in the hot database manifest"""
+    cursor.execute("""
+        INSERT OR REPLACE INTO archive_partitions
+        (month, conversations, by_platform, by_project, compacted_at)
+        VALUES (?, ?, ?, ?, ?)
+    """, (
+        month,
+        summary['conversations'],
+        json.dumps(summary['by_platform']),
+        json.dumps(summary['by_project']),
+        datetime.now().isoformat()
+    ))
@@ -0,0 +1,93 @@
+"""
+Query Client
+Calls the running daemon's query socket; stdlib only, so the CLI starts fast
+"""
+
+import json
+import socket
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+DEFAULT_SOCKET = 'storage/gpt-gulp.sock'
+
+
+def socket_path(config: Dict) -> Optional[Path]:
+    """Query socket of the daemon, or None when the query server is off"""
+    daemon_config = config.get('daemon', {})
+    if not daemon_config.get('enabled', True) or not hasattr(socket, 'AF_UNIX'):
+        return None
+    return Path(daemon_config.get('socket_path', DEFAULT_SOCKET))
+
+
+class DaemonUnavailable(Exception):
+    """Raised when no daemon is listening on the query socket"""
+
+
+class QueryError(Exception):
+    """Raised when the daemon reports that a call failed"""
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+    raise TypeError(f"Cannot send {type(value).__name__}")
+
+
+def _decode_object(obj: Dict):
+    if len(obj) == 1 and '$datetime' in obj:
+        return datetime.fromisoformat(obj['$datetime'])
+    return obj
+
+
+ENCODER = json.JSONEncoder(default=_encode_value, ensure_ascii=False)
+
+
+def encode_message(message: Dict) -> bytes:
+    """One newline-terminated JSON line"""
+    return ENCODER.encode(message).encode('utf-8') + b'\n'
+
+
+def decode_message(line: bytes) -> Dict:
+    return json.loads(line.decode('utf-8'), object_hook=_decode_object)
+
+
+class QueryClient:
+    """Sends one request per call over a short-lived Unix socket connection"""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, timeout: float = 300.0):
+        self.socket_path = str(socket_path)
+        self.timeout = timeout
+
+    def call(self, method: str, **params):
+        """Run `method` in the daemon and return its result"""
+        if not hasattr(socket, 'AF_UNIX'):
+            raise DaemonUnavailable('Unix sockets are not supported on this platform')
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except (FileNotFoundError, ConnectionRefusedError) as e:
+                # No socket, or a stale one left by a daemon that was killed
+                raise DaemonUnavailable(str(e))
+
+            sock.sendall(encode_message({'method': method, 'params': params}))
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                if chunk.endswith(b'\n'):
+                    break
+        finally:
+            sock.close()
+
+        if not chunks:
+            raise QueryError(f"Daemon closed the connection during {method}")
+        response = decode_message(b''.join(chunks))
+        if 'error' in response:
+            raise QueryError(response['error'])
+        return response['result']
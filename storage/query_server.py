@@ -0,0 +1,146 @@
+"""
+Query Server
+Unix-socket RPC that answers CLI queries from the running daemon
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+from pathlib import Path
+from typing import Callable, Dict, Iterable
+
+from storage.query_client import decode_message, encode_message
+from storage.partition_archive import sqlite_uri
+
+
+class QueryServer:
+    """Serves one JSON request per line on a Unix socket
+
+    Each method maps to an async handler called with the request's params.
+    Results of `cached` methods are kept, already encoded, until the
+    database changes. A dedicated read-only connection polls
+    `PRAGMA data_version`, which moves whenever another connection commits,
+    so a repeated query costs one pragma and a dictionary lookup.
+    """
+
+    def __init__(self, socket_path: Path, db_path: Path, handlers: Dict[str, Callable],
+                 cached: Iterable[str] = ()):
+        self.socket_path = Path(socket_path)
+        self.db_path = Path(db_path)
+        self.handlers = handlers
+        self.cached = set(cached)
+        self.cache = {}  # type: Dict[str, bytes]
+        self.data_version = None
+        self.version_conn = None
+        self.server = None
+        self.stats = {'requests': 0, 'cache_hits': 0, 'errors': 0}
+
+    def _other_daemon_running(self) -> bool:
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.socket_path))
+            return True
+        except OSError:
+            return False
+        finally:
+            probe.close()
+
+    async def start(self) -> bool:
+        """Listen on the socket; False if another daemon already serves it"""
+        if self.socket_path.exists():
+            if self._other_daemon_running():
+                print(f"Another daemon is serving queries on {self.socket_path}")
+                return False
+            # Left behind by a daemon that did not shut down cleanly
+            self.socket_path.unlink()
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self.server = await asyncio.start_unix_server(
+            self._handle_client, path=str(self.socket_path), limit=1024 * 1024
+        )
+        os.chmod(self.socket_path, 0o600)
+        print(f"Query server listening on unix:{self.socket_path}")
+        return True
+
+    async def serve_forever(self):
+        if self.server is None and not await self.start():
+            return
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+        if self.version_conn is not None:
+            self.version_conn.close()
+            self.version_conn = None
+
+    def _check_data_version(self):
+        """Drop cached results if any connection committed since the last request"""
+        if self.version_conn is None:
+            self.version_conn = sqlite3.connect(sqlite_uri(self.db_path, 'ro'), uri=True)
+        version = self.version_conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self.data_version:
+            self.cache.clear()
+            self.data_version = version
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(await self.dispatch(line))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, line: bytes) -> bytes:
+        """Answer one encoded request with one encoded response"""
+        self.stats['requests'] += 1
+        try:
+            request = decode_message(line)
+            method = request['method']
+            params = request.get('params') or {}
+        except (ValueError, KeyError, TypeError):
+            self.stats['errors'] += 1
+            return encode_message({'error': 'malformed request'})
+
+        handler = self.handlers.get(method)
+        if handler is None:
+            self.stats['errors'] += 1
+            return encode_message({'error': f"unknown method: {method}"})
+
+        key = None
+        if method in self.cached:
+            self._check_data_version()
+            key = f"{method}:{json.dumps(params, sort_keys=True)}"
+            response = self.cache.get(key)
+            if response is not None:
+                self.stats['cache_hits'] += 1
+                return response
+
+        try:
+            response = encode_message({'result': await handler(**params)})
+        except Exception as e:
+            self.stats['errors'] += 1
+            return encode_message({'error': f"{type(e).__name__}: {e}"})
+
+        if key is not None:
+            self.cache[key] = response
+        return response
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'cached_results': len(self.cache)}
+
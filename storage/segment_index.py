@@ -0,0 +1,115 @@
+"""
+Segment Index
+Turn and code block tables, so readers fetch only the parts of a conversation they need
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, Iterable
+
+from processors.conversation_segmenter import CodeBlock, Segments, Turn, segment
+
+SEGMENT_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS conversation_turns (
+        conversation_id TEXT,
+        turn INTEGER,
+        role TEXT,
+        timestamp TEXT,
+        start_offset INTEGER,  -- character offsets of the turn's text in the raw content
+        end_offset INTEGER,
+        PRIMARY KEY (conversation_id, turn)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS conversation_code_blocks (
+        conversation_id TEXT,
+        block INTEGER,
+        turn INTEGER,  -- NULL outside any turn
+        language TEXT,
+        start_offset INTEGER,
+        end_offset INTEGER,
+        PRIMARY KEY (conversation_id, block)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_code_block_language ON conversation_code_blocks (language, conversation_id)",
+]
+
+# Query condition on a conversation alias `c`, formatted with the schema
+LANGUAGE_FILTER = "c.id IN (SELECT conversation_id FROM {schema}.conversation_code_blocks WHERE language = ?)"
+
+
+def write_segments(cursor, contents: Dict[str, str]):
+    """Segment conversations' content and replace their turn and code block rows"""
+    ids = list(contents)
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        placeholders = ','.join('?' * len(chunk))
+        cursor.execute(f"DELETE FROM conversation_turns WHERE conversation_id IN ({placeholders})", chunk)
+        cursor.execute(f"DELETE FROM conversation_code_blocks WHERE conversation_id IN ({placeholders})", chunk)
+
+    turn_rows, block_rows = [], []
+    for conversation_id, content in contents.items():
+        segments = segment(content)
+        turn_rows.extend(
+            (conversation_id, index, turn.role,
+             turn.timestamp.isoformat() if turn.timestamp else None, turn.start, turn.end)
+            for index, turn in enumerate(segments.turns)
+        )
+        block_rows.extend(
+            (conversation_id, index, block.turn, block.language, block.start, block.end)
+            for index, block in enumerate(segments.code_blocks)
+        )
+    cursor.executemany("INSERT INTO conversation_turns VALUES (?, ?, ?, ?, ?, ?)", turn_rows)
+    cursor.executemany("INSERT INTO conversation_code_blocks VALUES (?, ?, ?, ?, ?, ?)", block_rows)
+
+
+def resegment(cursor, decode: Callable = lambda content: content or '', batch_size: int = 500):
+    """Rebuild the segment rows of every conversation from its stored content
+
+    `decode` turns stored content into text, for archives whose content is
+    compressed.
+    """
+    cursor.execute("DELETE FROM conversation_turns")
+    cursor.execute("DELETE FROM conversation_code_blocks")
+    ids = [row[0] for row in cursor.execute("SELECT id FROM conversation_content").fetchall()]
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start:start + batch_size]
+        cursor.execute(
+            f"SELECT id, raw_content FROM conversation_content WHERE id IN ({','.join('?' * len(chunk))})",
+            chunk
+        )
+        write_segments(cursor, {
+            conversation_id: decode(content)
+            for conversation_id, content in cursor.fetchall()
+        })
+
+
+def load_segments(cursor, ids: Iterable[str], schema: str = 'main') -> Dict[str, Segments]:
+    """Stored segments of conversations, by id"""
+    ids = list(ids)
+    turns, blocks = {}, {}
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        placeholders = ','.join('?' * len(chunk))
+        cursor.execute(f"""
+            SELECT conversation_id, role, timestamp, start_offset, end_offset
+            FROM {schema}.conversation_turns WHERE conversation_id IN ({placeholders})
+            ORDER BY conversation_id, turn
+        """, chunk)
+        for conversation_id, role, timestamp, start_offset, end_offset in cursor.fetchall():
+            turns.setdefault(conversation_id, []).append(Turn(
+                role, datetime.fromisoformat(timestamp) if timestamp else None, start_offset, end_offset
+            ))
+        cursor.execute(f"""
+            SELECT conversation_id, turn, language, start_offset, end_offset
+            FROM {schema}.conversation_code_blocks WHERE conversation_id IN ({placeholders})
+            ORDER BY conversation_id, block
+        """, chunk)
+        for conversation_id, turn, language, start_offset, end_offset in cursor.fetchall():
+            blocks.setdefault(conversation_id, []).append(CodeBlock(turn, language, start_offset, end_offset))
+
+    return {
+        conversation_id: Segments(turns.get(conversation_id, []), blocks.get(conversation_id, []))
+        for conversation_id in ids
+    }
+
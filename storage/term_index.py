@@ -0,0 +1,77 @@
+"""
+Term Index
+Normalized tag and resource tables for indexed conversation filters
+"""
+
+import json
+from typing import Iterable, Optional
+
+INDEX_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS conversation_tag (
+        tag TEXT COLLATE NOCASE,
+        conversation_id TEXT,
+        PRIMARY KEY (tag, conversation_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS conversation_resource (
+        resource TEXT,
+        conversation_id TEXT,
+        name TEXT,  -- last path or URL segment, so `main.py` finds `src/main.py`
+        PRIMARY KEY (resource, conversation_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_conversation_tag_id ON conversation_tag (conversation_id)",
+    "CREATE INDEX IF NOT EXISTS idx_conversation_resource_id ON conversation_resource (conversation_id)",
+    "CREATE INDEX IF NOT EXISTS idx_conversation_resource_name ON conversation_resource (name, conversation_id)",
+]
+
+# Query conditions on a conversation alias `c`, formatted with the schema
+TAG_FILTER = "c.id IN (SELECT conversation_id FROM {schema}.conversation_tag WHERE tag = ?)"
+RESOURCE_FILTER = """c.id IN (
+    SELECT conversation_id FROM {schema}.conversation_resource WHERE resource = ?
+    UNION SELECT conversation_id FROM {schema}.conversation_resource WHERE name = ?
+)"""
+
+
+def resource_name(resource: str) -> str:
+    return resource.rstrip('/\\').replace('\\', '/').rsplit('/', 1)[-1]
+
+
+def _json_list(value) -> list:
+    try:
+        items = json.loads(value) if value else []
+    except json.JSONDecodeError:
+        return []
+    return [item for item in items if isinstance(item, str) and item] if isinstance(items, list) else []
+
+
+def reindex(cursor, ids: Optional[Iterable[str]] = None):
+    """Rewrite the tag and resource rows of conversations from their JSON columns
+
+    Reindexes every conversation when `ids` is None.
+    """
+    if ids is None:
+        cursor.execute("DELETE FROM conversation_tag")
+        cursor.execute("DELETE FROM conversation_resource")
+        rows = cursor.execute("SELECT id, tags, resources FROM conversations").fetchall()
+    else:
+        ids, rows = list(ids), []
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f"DELETE FROM conversation_tag WHERE conversation_id IN ({placeholders})", chunk)
+            cursor.execute(f"DELETE FROM conversation_resource WHERE conversation_id IN ({placeholders})", chunk)
+            cursor.execute(f"SELECT id, tags, resources FROM conversations WHERE id IN ({placeholders})", chunk)
+            rows.extend(cursor.fetchall())
+
+    cursor.executemany(
+        "INSERT OR IGNORE INTO conversation_tag (tag, conversation_id) VALUES (?, ?)",
+        [(tag, conversation_id) for conversation_id, tags, _ in rows for tag in _json_list(tags)]
+    )
+    cursor.executemany(
+        "INSERT OR IGNORE INTO conversation_resource (resource, conversation_id, name) VALUES (?, ?, ?)",
+        [(resource, conversation_id, resource_name(resource))
+         for conversation_id, _, resources in rows for resource in _json_list(resources)]
+    )
@@ -0,0 +1,182 @@
+"""
+Usage Rollups
+Daily per-platform aggregates maintained alongside conversation writes
+"""
+
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from storage.partition_archive import decompress_content
+
+ROLLUP_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS daily_usage (
+        day TEXT,
+        platform TEXT,
+        conversations INTEGER DEFAULT 0,
+        content_bytes INTEGER DEFAULT 0,
+        PRIMARY KEY (day, platform)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS daily_projects (
+        day TEXT,
+        platform TEXT,
+        project TEXT,
+        conversations INTEGER DEFAULT 0,
+        PRIMARY KEY (day, platform, project)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS daily_tags (
+        day TEXT,
+        platform TEXT,
+        tag TEXT,
+        conversations INTEGER DEFAULT 0,
+        PRIMARY KEY (day, platform, tag)
+    )
+    """,
+]
+
+# Bucket expressions over the `day` column
+PERIODS = {
+    'day': "day",
+    'week': "date(day, '-6 days', 'weekday 1')",  # Monday of the week
+    'month': "substr(day, 1, 7)",
+}
+
+DIMENSIONS = {
+    'platform': ('daily_usage', 'platform'),
+    'project': ('daily_projects', 'project'),
+    'tag': ('daily_tags', 'tag'),
+}
+
+# (day, platform, project, tags, content_bytes)
+Contribution = Tuple[str, str, str, List[str], int]
+
+
+def content_bytes(raw_content) -> int:
+    """UTF-8 size of stored content, whether hot text or archived zlib"""
+    if raw_content is None:
+        return 0
+    if isinstance(raw_content, bytes):
+        raw_content = decompress_content(raw_content)
+    return len(raw_content.encode('utf-8', errors='ignore'))
+
+
+class UsageRollups:
+    """Incrementally maintained daily rollups for analytics
+
+    Writers collect the contributions of the rows they are about to change,
+    subtract them, write, then add the new contributions, all in the same
+    transaction. Queries only ever read the rollup tables.
+    """
+
+    def collect(self, cursor, ids: Optional[Iterable[str]] = None, schema: str = 'main',
+                with_bytes: bool = True) -> List[Contribution]:
+        """Current contributions of conversations (all of them if `ids` is None)"""
+        if with_bytes:
+            cursor.connection.create_function('gulp_content_bytes', 1, content_bytes)
+            size = "gulp_content_bytes(COALESCE(cc.raw_content, c.raw_content))"
+            join = f"LEFT JOIN {schema}.conversation_content cc ON cc.id = c.id"
+        else:
+            size, join = "0", ""
+
+        # Archived rows with a newer copy in the hot database don't count
+        shadowed = "c.id NOT IN (SELECT id FROM main.conversations)" if schema != 'main' else "1"
+        query = f"""
+            SELECT substr(c.timestamp, 1, 10), c.platform, COALESCE(c.project, ''), c.tags, {size}
+            FROM {schema}.conversations c {join}
+            WHERE {shadowed}
+        """
+
+        if ids is None:
+            rows = cursor.execute(query).fetchall()
+        else:
+            ids, rows = list(ids), []
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                cursor.execute(query + f" AND c.id IN ({','.join('?' * len(chunk))})", chunk)
+                rows.extend(cursor.fetchall())
+
+        contributions = []
+        for day, platform, project, tags, size in rows:
+            try:
+                tags = json.loads(tags) if tags else []
+            except json.JSONDecodeError:
+                tags = []
+            contributions.append((day, platform, project, sorted(set(tags)), size))
+        return contributions
+
+    def apply(self, cursor, contributions: List[Contribution], sign: int,
+              usage: bool = True, projects: bool = True, tags: bool = True):
+        """Add (sign=1) or subtract (sign=-1) contributions from the rollups"""
+        if usage:
+            cursor.executemany("""
+                INSERT INTO daily_usage (day, platform, conversations, content_bytes)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(day, platform) DO UPDATE SET
+                    conversations = conversations + excluded.conversations,
+                    content_bytes = content_bytes + excluded.content_bytes
+            """, [(day, platform, sign, sign * size)
+                  for day, platform, _, _, size in contributions])
+        if projects:
+            cursor.executemany("""
+                INSERT INTO daily_projects (day, platform, project, conversations)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(day, platform, project) DO UPDATE SET
+                    conversations = conversations + excluded.conversations
+            """, [(day, platform, project, sign)
+                  for day, platform, project, _, _ in contributions])
+        if tags:
+            cursor.executemany("""
+                INSERT INTO daily_tags (day, platform, tag, conversations)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(day, platform, tag) DO UPDATE SET
+                    conversations = conversations + excluded.conversations
+            """, [(day, platform, tag, sign)
+                  for day, platform, _, conversation_tags, _ in contributions
+                  for tag in conversation_tags])
+
+    def query(self, cursor, dimension: str = 'platform', period: str = 'week',
+              since: Optional[str] = None, until: Optional[str] = None,
+              top: Optional[int] = None) -> List[Dict]:
+        """Conversation counts per period and dimension value, oldest period first
+
+        With `top`, only the dimension values with the most conversations
+        over the whole range are returned.
+        """
+        table, column = DIMENSIONS[dimension]
+        bucket = PERIODS[period]
+        size = "SUM(content_bytes)" if table == 'daily_usage' else "NULL"
+
+        conditions, params = [], []
+        if since:
+            conditions.append("day >= ?")
+            params.append(since)
+        if until:
+            conditions.append("day <= ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        cursor.execute(f"""
+            SELECT {bucket} AS period, {column}, SUM(conversations), {size}
+            FROM {table} {where}
+            GROUP BY period, {column}
+            HAVING SUM(conversations) > 0
+            ORDER BY period, SUM(conversations) DESC
+        """, params)
+        rows = [
+            {'period': period_value, dimension: value, 'conversations': count,
+             'content_bytes': total_bytes}
+            for period_value, value, count, total_bytes in cursor.fetchall()
+        ]
+
+        if top:
+            totals = {}
+            for row in rows:
+                totals[row[dimension]] = totals.get(row[dimension], 0) + row['conversations']
+            keep = set(sorted(totals, key=lambda value: -totals[value])[:top])
+            rows = [row for row in rows if row[dimension] in keep]
+
+        return rows
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Backup Manager Tests
+Online snapshots of a live database, their pacing and rotation
+"""
+
+import gzip
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from storage.backup_manager import BackupManager
+
+
+class BackupManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.db_path = self.root / 'conversations.db'
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE conversations (id TEXT PRIMARY KEY, raw_content TEXT)")
+        conn.executemany("INSERT INTO conversations VALUES (?, ?)",
+                         [(f"chatgpt_{i}", 'x' * 2000) for i in range(40)])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def manager(self, **sync_config):
+        return BackupManager(self.db_path, self.root / 'archive',
+                             {'backup_dir': str(self.root / 'backups'), **sync_config})
+
+    def restore(self, snapshot: str) -> int:
+        restored = self.root / 'restored.db'
+        with gzip.open(snapshot, 'rb') as f_in, open(restored, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        conn = sqlite3.connect(restored)
+        count = conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+        conn.close()
+        return count
+
+    def test_snapshot_restores_every_row(self):
+        report = self.manager().backup_sync()
+        self.assertEqual(self.restore(report['path']), 40)
+        self.assertEqual(report['restarts'], 0)
+
+    def test_steps_are_paced_by_the_sleep_setting(self):
+        report = self.manager(backup_step_pages=4, backup_step_sleep_ms=0).backup_sync()
+        self.assertGreater(report['pages'], 12)
+        steps = -(-report['pages'] // 4)
+
+        paced = self.manager(backup_step_pages=4, backup_step_sleep_ms=20).backup_sync()
+        self.assertGreaterEqual(paced['copy_seconds'], (steps - 1) * 0.02 * 0.9)
+
+    def test_rotation_keeps_newest(self):
+        backups = self.root / 'backups'
+        backups.mkdir()
+        for day in range(1, 5):
+            (backups / f"conversations-2024010{day}-000000.db.gz").write_bytes(b'')
+        manager = self.manager(backup_keep=2)
+        self.assertEqual(manager.rotate(), 2)
+        self.assertEqual([path.name for path in manager.snapshots()],
+                         ['conversations-20240104-000000.db.gz', 'conversations-20240103-000000.db.gz'])
+
+
+if __name__ == "__main__":
+    unittest.main()
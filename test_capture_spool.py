@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Capture Spool Tests
+Durable appends, replay after a crash, torn records and segment cleanup
+"""
+
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from storage.capture_spool import CaptureSpool
+
+
+def conversation(number):
+    return {'id': f"chatgpt_{number}", 'timestamp': datetime(2024, 3, 1, 9, 0, number % 60),
+            'raw_content': f"User: question {number}"}
+
+
+class CaptureSpoolTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.spool_dir = Path(self.tmp.name) / 'spool'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def open(self, **spool_config):
+        spool = CaptureSpool(self.spool_dir, spool_config)
+        self.addCleanup(lambda: spool.closed or spool.close())
+        return spool
+
+    def test_records_round_trip_with_datetimes(self):
+        spool = self.open()
+        self.assertTrue(spool.wait(spool.append_many([conversation(1), conversation(2)]), timeout=5))
+        records, _ = spool.read_pending()
+        self.assertEqual(records, [conversation(1), conversation(2)])
+
+    def test_uncommitted_records_are_replayed_after_reopening(self):
+        spool = self.open()
+        spool.append_many([conversation(n) for n in range(5)])
+        records, position = spool.read_pending(limit=2)
+        spool.commit(position)
+        spool.close()
+
+        reopened = self.open()
+        records, _ = reopened.read_pending()
+        self.assertEqual([r['id'] for r in records], [f"chatgpt_{n}" for n in range(2, 5)])
+
+    def test_rewind_reads_again_after_storage_failure(self):
+        spool = self.open()
+        spool.append_many([conversation(1), conversation(2)])
+        first, _ = spool.read_pending()
+        spool.rewind()
+        again, _ = spool.read_pending()
+        self.assertEqual(first, again)
+
+    def test_torn_tail_is_dropped(self):
+        spool = self.open()
+        spool.append_many([conversation(1), conversation(2)])
+        spool.close()
+        segment = self.spool_dir / f"{spool.segments()[-1]:012d}.spool"
+        with open(segment, 'r+b') as f:
+            f.truncate(segment.stat().st_size - 5)
+
+        reopened = self.open()
+        records, _ = reopened.read_pending()
+        self.assertEqual([r['id'] for r in records], ['chatgpt_1'])
+        reopened.wait(reopened.append(conversation(3)), timeout=5)
+        records, _ = reopened.read_pending()
+        self.assertEqual([r['id'] for r in records], ['chatgpt_3'])
+
+    def test_committed_segments_are_deleted(self):
+        # Tiny segments, so every few records rotate to a new file
+        spool = self.open(segment_mb=200 / (1024 * 1024))
+        spool.append_many([conversation(1)])
+        for number in range(2, 12):
+            spool.append(conversation(number))
+        self.assertGreater(len(spool.segments()), 2)
+
+        records, position = spool.read_pending(limit=100)
+        self.assertEqual(len(records), 11)
+        spool.commit(position)
+        self.assertEqual(len(spool.segments()), 1)
+        self.assertEqual(spool.read_pending()[0], [])
+
+    def test_closed_spool_refuses_appends(self):
+        spool = self.open()
+        spool.close()
+        with self.assertRaises(ValueError):
+            spool.append(conversation(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
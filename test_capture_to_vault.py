@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Capture-to-Vault Benchmark Tests
+A tiny load test run end to end, and the comparison against a baseline report
+"""
+
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from benchmarks.capture_to_vault import COMPARED, percentile, print_comparison
+
+REPO = Path(__file__).resolve().parent
+
+BASELINE = {
+    'revision': 'abc1234', 'recorded_at': '2024-03-01T09:00:00', 'settings': {'rate': 1},
+    'latency_p50_ms': 100.0, 'latency_p99_ms': 200.0, 'dropped': 0, 'peak_rss_mb': 50.0,
+    'db_growth_bytes': 1000, 'achieved_ops_per_second': 10.0,
+}
+
+
+class CaptureToVaultTest(unittest.TestCase):
+    def test_percentile(self):
+        self.assertEqual(percentile([], 0.5), 0.0)
+        self.assertEqual(percentile([1, 2, 3, 4], 0.5), 3)
+        self.assertEqual(percentile([1, 2, 3, 4], 0.99), 4)
+
+    def test_comparison_flags_regressions_and_improvements(self):
+        report = {**BASELINE, 'revision': 'def5678', 'settings': {'rate': 1},
+                  'latency_p50_ms': 50.0, 'latency_p99_ms': 400.0, 'achieved_ops_per_second': 5.0}
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            print_comparison(report, BASELINE)
+        lines = output.getvalue().splitlines()
+
+        self.assertIn('abc1234', lines[1])
+        self.assertNotIn('Settings differ', output.getvalue())
+        self.assertIn('latency_p50_ms: 100.0 -> 50.0 (-50.0%) ✅', output.getvalue())
+        self.assertIn('latency_p99_ms: 200.0 -> 400.0 (+100.0%) ⚠️', output.getvalue())
+        self.assertIn('achieved_ops_per_second: 10.0 -> 5.0 (-50.0%) ⚠️', output.getvalue())
+        self.assertIn('dropped: 0 -> 0 (n/a)', output.getvalue())
+
+    def test_tiny_run_writes_and_compares_a_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline_path, report_path = Path(tmp) / 'baseline.json', Path(tmp) / 'report.json'
+            baseline_path.write_text(json.dumps(BASELINE))
+            result = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.capture_to_vault', '--rate', '10', '--duration', '1',
+                 '--settle', '2', '--drain-timeout', '20', '--process-interval', '0.2',
+                 '--json', str(report_path), '--compare', str(baseline_path)],
+                cwd=REPO, capture_output=True, text=True, timeout=120
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            report = json.loads(report_path.read_text())
+
+        self.assertIn('Capture-to-Vault Load Test', result.stdout)
+        self.assertIn('Settings differ', result.stdout)
+        for metric, _ in COMPARED:
+            self.assertIn(metric, report)
+        self.assertGreater(sum(report['writes'].values()), 0)
+        self.assertEqual(report['delivered'] + report['dropped'], sum(report['writes'].values()))
+        self.assertEqual(report['settings']['rate'], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
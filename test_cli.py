@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+CLI Tests
+Start-up imports and argument handling of the command-line tool
+"""
+
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+from collectors.export_importer import EXPORT_MAPPERS
+
+REPO = Path(__file__).resolve().parent
+
+
+def python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], cwd=REPO, capture_output=True, text=True)
+
+
+class CLITest(unittest.TestCase):
+    def test_import_loads_no_storage_or_asyncio(self):
+        result = python('-c', "import sys, cli; print(' '.join(sorted(sys.modules)))")
+        modules = result.stdout.split()
+        for module in ('asyncio', 'sqlite3', 'storage.conversation_storage',
+                       'collectors.export_importer', 'processors.conversation_segmenter', 'main'):
+            self.assertNotIn(module, modules)
+
+    def test_import_platform_choices_match_the_importer(self):
+        help_text = python('cli.py', '--help').stdout
+        self.assertIn('{' + ','.join(sorted(EXPORT_MAPPERS)) + '}', help_text)
+        self.assertEqual(python('cli.py', 'import', '--platform', 'bogus').returncode, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
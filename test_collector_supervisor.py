@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Collector Supervisor Tests
+Collector selection, spool layout, restart backoff and a worker process end to end
+"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from app_config import AppConfig
+from collectors.collector_supervisor import (
+    CollectorSupervisor, create_collector, enabled_collectors, spool_dir
+)
+from storage.capture_spool import CaptureSpool
+
+CONTENT = "User: How do I read a file in Python?\n\nAssistant: Use open() in a with block. " * 3
+
+
+class ExitedProcess:
+    pid = 4242
+    exitcode = 1
+
+    def is_alive(self):
+        return False
+
+
+async def discard(batch):
+    pass
+
+
+class CollectorSupervisorTest(unittest.TestCase):
+    def test_enabled_collectors(self):
+        self.assertEqual(enabled_collectors({}), [])
+        config = {'platforms': {'vscode': {'enabled': True}, 'chatgpt': {'enabled': True},
+                                'gemini': {'enabled': False}}}
+        self.assertEqual(enabled_collectors(config), ['vscode', 'browser'])
+        self.assertEqual(enabled_collectors({'platforms': {'gemini': {'enabled': False}}}), [])
+
+    def test_spool_dir(self):
+        self.assertEqual(spool_dir({}), Path('storage/spool'))
+        self.assertEqual(spool_dir({'spool': {'dir': '/tmp/spool'}}, 'vscode'), Path('/tmp/spool/vscode'))
+        self.assertIsNone(spool_dir({'spool': {'enabled': False}}, 'vscode'))
+
+    def test_unknown_collector(self):
+        with self.assertRaises(ValueError):
+            create_collector('emacs', {})
+
+    def test_collection_runs_inline_by_default(self):
+        self.assertEqual(AppConfig({}).value('collection.mode'), 'inline')
+
+    def test_restart_backoff_doubles_up_to_the_limit(self):
+        supervisor = CollectorSupervisor({'collection': {'restart_backoff_seconds': 1,
+                                                         'max_backoff_seconds': 3}},
+                                         discard, names=['vscode'])
+        worker = supervisor.workers['vscode']
+        backoffs = []
+        for _ in range(3):
+            worker.process = ExitedProcess()
+            supervisor._check_workers()
+            self.assertIsNone(worker.process)
+            backoffs.append(worker.backoff)
+        self.assertEqual(backoffs, [1, 2, 3])
+
+
+class SupervisedWorkerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        # The VS Code collector watches folders under the home directory
+        self.home = os.environ.get('HOME')
+        os.environ['HOME'] = str(self.root)
+        chats = self.root / '.config' / 'Code' / 'User' / 'workspaceStorage'
+        chats.mkdir(parents=True)
+        (chats / 'copilot-chat.md').write_text(CONTENT)
+
+    def tearDown(self):
+        if self.home is None:
+            del os.environ['HOME']
+        else:
+            os.environ['HOME'] = self.home
+        self.tmp.cleanup()
+
+    def test_worker_streams_conversations_to_the_sink(self):
+        config = {
+            'platforms': {'vscode': {'enabled': True, 'backfill': {
+                'checkpoint_path': str(self.root / 'checkpoint.db')}}},
+            'spool': {'dir': str(self.root / 'spool')},
+            'collection': {'flush_interval_seconds': 0.1},
+        }
+        received = []
+
+        async def run():
+            stored = asyncio.Event()
+
+            async def sink(batch):
+                received.extend(batch)
+                stored.set()
+
+            supervisor = CollectorSupervisor(config, sink)
+            task = asyncio.create_task(supervisor.run())
+            try:
+                await asyncio.wait_for(stored.wait(), 60)
+                # The acknowledgement reaches the worker, which drops the batch from its spool
+                await asyncio.sleep(1)
+                return supervisor.get_stats()
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        stats = asyncio.run(run())
+        self.assertEqual(len(received), 1)
+        self.assertIn('read a file in Python', received[0]['raw_content'])
+        self.assertEqual(stats['vscode']['conversations'], 1)
+        self.assertEqual(stats['vscode']['restarts'], 0)
+        spool = CaptureSpool(self.root / 'spool' / 'vscode')
+        self.addCleanup(spool.close)
+        self.assertEqual(spool.read_pending()[0], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
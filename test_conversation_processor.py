@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Conversation Processor Tests
+Extractive summaries and the corpus statistics they are scored against
+"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from processors.conversation_processor import ConversationProcessor
+from processors.text_features import numpy_available
+
+
+def conversation(number):
+    return {
+        'id': f"chatgpt_{number}",
+        'platform': 'chatgpt',
+        'timestamp': datetime(2024, 3, 1, 9, 0, 0),
+        'title': 'Flexbox layout',
+        'raw_content': (f"User: How do I center a div with flexbox in layout {number}? "
+                        "It keeps sticking to the left edge of the page.\n\n"
+                        "Assistant: Set display flex on the parent. Then use justify-content center "
+                        "and align-items center to center the child on both axes."),
+        'processed': False,
+    }
+
+
+@unittest.skipUnless(numpy_available(), "extractive summaries need numpy")
+class ExtractiveCorpusTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.corpus_path = os.path.join(self.tmp.name, 'corpus_stats.npz')
+        self.processor = ConversationProcessor({'processing': {
+            'summarization': {'summary_style': 'tfidf', 'corpus_stats_path': self.corpus_path,
+                              'hash_features': 2 ** 12},
+            'categorization': {'project_detection': False},
+        }})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_single_conversation_leaves_corpus_alone(self):
+        processed = asyncio.run(self.processor.process(conversation(1)))
+        self.assertTrue(processed['summary'])
+        self.assertEqual(self.processor.extractive.corpus.n_documents, 0)
+        self.assertFalse(os.path.exists(self.corpus_path))
+
+    def test_batch_updates_and_saves_corpus_once(self):
+        results = asyncio.run(self.processor.process_many([conversation(n) for n in range(3)]))
+        self.assertTrue(all(result['summary'] for result in results))
+        self.assertEqual(self.processor.extractive.corpus.n_documents, 3)
+        self.assertTrue(os.path.exists(self.corpus_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
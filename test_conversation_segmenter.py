@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Conversation Segmenter Tests
+Turns, timestamps and fenced code blocks found in conversation content
+"""
+
+import unittest
+from datetime import datetime
+
+from processors.conversation_segmenter import format_duration, format_turn, segment
+
+
+class SegmenterTest(unittest.TestCase):
+    def test_turns_and_timestamps(self):
+        text = '\n\n'.join([
+            format_turn('User', 'How do I sort?', datetime(2024, 3, 1, 9, 0, 0)),
+            format_turn('Assistant', 'Use sorted().'),
+        ])
+        segments = segment(text)
+        self.assertEqual([turn.role for turn in segments.turns], ['User', 'Assistant'])
+        self.assertEqual(segments.timestamps(), [datetime(2024, 3, 1, 9, 0, 0)])
+        self.assertEqual(text[segments.turns[1].start:segments.turns[1].end], 'Use sorted().')
+
+    def test_impossible_timestamp_is_dropped(self):
+        segments = segment('User [2024-13-01T00:00:00]: hi\n\nAssistant [2024-02-30T10:00:00]: hello')
+        self.assertEqual([turn.role for turn in segments.turns], ['User', 'Assistant'])
+        self.assertEqual(segments.timestamps(), [])
+
+    def test_code_blocks_by_language(self):
+        text = ('User: Two examples?\n\nAssistant: Sure.\n```py\nprint(1)\n```\nAnd\n'
+                '~~~js\nconsole.log(1)\n~~~')
+        segments = segment(text)
+        self.assertEqual([block.language for block in segments.code_blocks], ['python', 'javascript'])
+        self.assertEqual(segments.code(text), ['print(1)', 'console.log(1)'])
+        self.assertEqual([block.turn for block in segments.code_blocks], [1, 1])
+
+    def test_prose_leaves_out_code_and_other_roles(self):
+        text = 'User: Fix this\n```\nx = 1\n```\nplease\n\nAssistant: Done.'
+        segments = segment(text)
+        self.assertEqual(segments.prose(text, roles=('User',)), 'Fix this\n\nplease')
+        self.assertEqual(segments.prose(text), 'Fix this\n\nplease\n\nDone.')
+
+    def test_fence_opening_a_turn(self):
+        text = 'User: hi\n\nAssistant: ```bash\nls -la\n```'
+        segments = segment(text)
+        self.assertEqual(segments.code(text), ['ls -la'])
+        self.assertEqual(segments.code_blocks[0].language, 'bash')
+
+    def test_unclosed_fence_runs_to_end_of_turn(self):
+        text = 'User: ```python\nimport os\n\nAssistant: ok'
+        segments = segment(text)
+        self.assertEqual(segments.code(text), ['import os'])
+
+    def test_inline_triple_backticks_are_not_fences(self):
+        self.assertEqual(segment('User: use ```code``` here').code_blocks, [])
+
+    def test_content_without_turns(self):
+        text = 'notes\n```sql\nSELECT 1;\n```'
+        segments = segment(text)
+        self.assertEqual(segments.turns, [])
+        self.assertEqual(segments.code(text), ['SELECT 1;'])
+        self.assertEqual(segments.prose(text), 'notes')
+        self.assertEqual(segment(None), segment(''))
+
+    def test_format_duration(self):
+        self.assertEqual(format_duration(45), '45s')
+        self.assertEqual(format_duration(120), '2m')
+        self.assertEqual(format_duration(3900), '1h 05m')
+        self.assertEqual(format_duration(90000), '1d 1h')
+
+
+if __name__ == "__main__":
+    unittest.main()
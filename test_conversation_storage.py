@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Conversation Storage Tests
+Capture upserts, compaction into monthly archives and what storage reports afterwards
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+
+from storage.conversation_storage import ConversationStorage, conversation_id
+from storage.partition_archive import record_partition
+
+OLD = datetime(2020, 1, 15, 12, 0, 0)
+
+
+def conversation(conversation_id, timestamp=OLD, platform='chatgpt', **fields):
+    item = {
+        'id': conversation_id,
+        'platform': platform,
+        'timestamp': timestamp,
+        'title': 'Sorting a list',
+        'raw_content': 'User: How do I sort a list?\n\nAssistant: Use sorted().',
+        'processed': False,
+    }
+    item.update(fields)
+    return item
+
+
+class ConversationStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.storage = ConversationStorage({})
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def archive(self, *conversations):
+        """Store conversations as processed and compact them into archives"""
+        asyncio.run(self.storage.save_conversations(list(conversations)))
+        for item in conversations:
+            asyncio.run(self.storage.save_processed_conversation(
+                {**item, 'processed': True, 'processed_at': OLD, 'project': 'website'}
+            ))
+        return asyncio.run(self.storage.compact(hot_months=1))
+
+    def test_ids_are_stable_per_source(self):
+        self.assertEqual(conversation_id('vscode', '/chats/a.json'), conversation_id('vscode', '/chats/a.json'))
+        self.assertNotEqual(conversation_id('vscode', '/chats/a.json'), conversation_id('vscode', '/chats/b.json'))
+        self.assertTrue(conversation_id('vscode', '/chats/a.json').startswith('vscode_'))
+
+    def test_unchanged_recapture_is_skipped(self):
+        item = conversation('chatgpt_a', timestamp=datetime.now())
+        self.assertEqual(asyncio.run(self.storage.save_conversations([item])), 1)
+        asyncio.run(self.storage.save_processed_conversation(
+            {**item, 'processed': True, 'processed_at': datetime.now(), 'summary': 'Sorting'}
+        ))
+        self.assertEqual(asyncio.run(self.storage.save_conversations([item])), 0)
+        self.assertTrue(asyncio.run(self.storage.get_recent_conversations())[0]['processed'])
+
+    def test_changed_recapture_updates_content_and_requeues(self):
+        item = conversation('chatgpt_a', timestamp=datetime.now())
+        asyncio.run(self.storage.save_conversations([item]))
+        asyncio.run(self.storage.save_processed_conversation(
+            {**item, 'processed': True, 'processed_at': datetime.now(), 'summary': 'Sorting'}
+        ))
+        grown = {**item, 'title': 'Sorting lists', 'raw_content': item['raw_content'] + '\n\nUser: Thanks!'}
+        self.assertEqual(asyncio.run(self.storage.save_conversations([grown])), 1)
+
+        [stored] = asyncio.run(self.storage.get_unprocessed_conversations())
+        self.assertEqual((stored['title'], stored['raw_content']), (grown['title'], grown['raw_content']))
+        self.assertEqual(stored['summary'], 'Sorting')
+
+    def test_processing_does_not_rewrite_content(self):
+        item = conversation('chatgpt_a', timestamp=datetime.now())
+        asyncio.run(self.storage.save_conversations([item]))
+        conn = sqlite3.connect(self.storage.db_path)
+        conn.executescript("""
+            CREATE TABLE content_writes (id TEXT);
+            CREATE TRIGGER log_content_writes AFTER UPDATE ON conversation_content
+            BEGIN INSERT INTO content_writes VALUES (new.id); END;
+        """)
+        conn.close()
+
+        asyncio.run(self.storage.save_processed_conversation(
+            {**item, 'processed': True, 'processed_at': datetime.now(), 'summary': 'Sorting'}
+        ))
+        conn = sqlite3.connect(self.storage.db_path)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM content_writes").fetchone()[0], 0)
+        conn.close()
+        self.assertEqual(asyncio.run(self.storage.get_recent_conversations())[0]['summary'], 'Sorting')
+
+    def test_upgrade_moves_inline_content_out(self):
+        item = conversation('chatgpt_a', timestamp=datetime.now())
+        asyncio.run(self.storage.save_conversations([item]))
+        # A database from when content was stored in the conversations table
+        conn = sqlite3.connect(self.storage.db_path)
+        conn.execute("UPDATE conversations SET raw_content = ?, content_hash = NULL", (item['raw_content'],))
+        conn.execute("DELETE FROM conversation_content")
+        conn.commit()
+        conn.close()
+
+        storage = ConversationStorage({})
+        self.assertEqual(asyncio.run(storage.get_recent_conversations())[0]['raw_content'], item['raw_content'])
+        self.assertEqual(asyncio.run(storage.save_conversations([item])), 0)
+
+    def test_compaction_moves_processed_conversations(self):
+        moved = self.archive(conversation('chatgpt_a'), conversation('claude_ai_b', platform='claude_ai'))
+        self.assertEqual(moved, {'2020-01': 2})
+
+        stats = asyncio.run(self.storage.get_storage_stats())
+        self.assertEqual(stats['total_conversations'], 2)
+        self.assertEqual(stats['by_platform'], {'chatgpt': 1, 'claude_ai': 1})
+        self.assertEqual(stats['by_project'], {'website': 2})
+        results = asyncio.run(self.storage.search_conversations(tag=None))
+        self.assertEqual(sorted(c['id'] for c in results), ['chatgpt_a', 'claude_ai_b'])
+
+    def test_recaptured_archived_conversation_is_counted_once(self):
+        self.archive(conversation('chatgpt_a'), conversation('chatgpt_b'))
+        asyncio.run(self.storage.save_conversations([
+            conversation('chatgpt_a', timestamp=datetime.now(), raw_content='User: sort?\n\nAssistant: sorted().')
+        ]))
+
+        stats = asyncio.run(self.storage.get_storage_stats())
+        self.assertEqual(stats['total_conversations'], 2)
+        self.assertEqual(stats['processed_conversations'], 1)
+        self.assertEqual(stats['unprocessed_conversations'], 1)
+        self.assertEqual(stats['by_platform'], {'chatgpt': 2})
+        self.assertEqual(stats['by_project'], {'website': 1, '': 1})
+
+    def archived_ids(self, month):
+        conn = sqlite3.connect(self.storage.archive.path(month))
+        ids = [row[0] for row in conn.execute("SELECT id FROM conversations ORDER BY id")]
+        conn.close()
+        return ids
+
+    def test_conversation_moving_month_is_archived_once(self):
+        self.archive(conversation('chatgpt_a'), conversation('chatgpt_b'))
+        # Recaptured later with a new timestamp, then compacted again
+        moved = self.archive(conversation('chatgpt_a', timestamp=datetime(2020, 3, 2, 9, 0, 0),
+                                          raw_content='User: sort?\n\nAssistant: sorted().'))
+        self.assertEqual(moved, {'2020-03': 1})
+        self.assertEqual(self.archived_ids('2020-01'), ['chatgpt_b'])
+        self.assertEqual(self.archived_ids('2020-03'), ['chatgpt_a'])
+
+        results = asyncio.run(self.storage.search_conversations())
+        self.assertEqual(sorted(c['id'] for c in results), ['chatgpt_a', 'chatgpt_b'])
+        stats = asyncio.run(self.storage.get_storage_stats())
+        self.assertEqual(stats['total_conversations'], 2)
+        self.assertEqual(stats['by_platform'], {'chatgpt': 2})
+
+        # A capture after the move finds the archived copy in its new month
+        self.assertEqual(asyncio.run(self.storage.save_conversations([
+            conversation('chatgpt_a', timestamp=datetime(2020, 3, 2, 9, 0, 0),
+                         raw_content='User: sort?\n\nAssistant: sorted().')
+        ])), 0)
+
+    def usage(self, storage=None):
+        rows = asyncio.run((storage or self.storage).get_usage('platform', 'month', since='2020-01-01'))
+        return {row['period']: row['conversations'] for row in rows}
+
+    def test_rollups_follow_a_conversation_between_months(self):
+        self.archive(conversation('chatgpt_a'), conversation('chatgpt_b'))
+        self.assertEqual(self.usage(), {'2020-01': 2})
+
+        recaptured = conversation('chatgpt_a', timestamp=datetime(2020, 3, 2, 9, 0, 0),
+                                  raw_content='User: sort?\n\nAssistant: sorted().')
+        asyncio.run(self.storage.save_conversations([recaptured]))
+        self.assertEqual(self.usage(), {'2020-01': 1, '2020-03': 1})
+
+        self.archive(recaptured)
+        self.assertEqual(self.usage(), {'2020-01': 1, '2020-03': 1})
+        rows = asyncio.run(self.storage.get_usage('platform', 'month', since='2020-03-01'))
+        self.assertEqual(rows[0]['content_bytes'], len(recaptured['raw_content']))
+
+        # Recaptured today, away from the archive again
+        asyncio.run(self.storage.save_conversations([
+            conversation('chatgpt_a', timestamp=datetime.now(), raw_content='User: sort it?')
+        ]))
+        usage = self.usage()
+        self.assertEqual(usage.pop(datetime.now().strftime('%Y-%m')), 1)
+        self.assertEqual(usage, {'2020-01': 1})
+
+    def test_upgrade_drops_duplicate_archived_copies(self):
+        self.archive(conversation('chatgpt_a'), conversation('chatgpt_b'))
+        # An older version archived a recaptured conversation a second time
+        with self.storage.archive.writable('2020-03') as conn:
+            conn.execute("ATTACH DATABASE ? AS old", (str(self.storage.archive.path('2020-01')),))
+            conn.execute("INSERT INTO conversations SELECT * FROM old.conversations WHERE id = 'chatgpt_a'")
+            conn.commit()
+            conn.execute("DETACH DATABASE old")
+            summary = self.storage.archive.summarize(conn)
+        hot = sqlite3.connect(self.storage.db_path)
+        record_partition(hot.cursor(), '2020-03', summary)
+        hot.commit()
+        hot.close()
+        self.assertEqual(asyncio.run(self.storage.get_storage_stats())['total_conversations'], 3)
+        # Rollups built while both copies existed count both
+        self.drop_tables('daily_usage', 'daily_projects', 'daily_tags')
+        self.assertEqual(self.usage(ConversationStorage({})), {'2020-01': 3})
+        self.drop_tables('archived_ids')
+
+        storage = ConversationStorage({})
+        self.assertEqual(self.usage(storage), {'2020-01': 2})
+        results = asyncio.run(storage.search_conversations())
+        self.assertEqual(sorted(c['id'] for c in results), ['chatgpt_a', 'chatgpt_b'])
+        self.assertEqual(self.archived_ids('2020-01'), ['chatgpt_b'])
+        stats = asyncio.run(storage.get_storage_stats())
+        self.assertEqual(stats['total_conversations'], 2)
+
+    def drop_tables(self, *tables):
+        conn = sqlite3.connect(self.storage.db_path)
+        for table in tables:
+            conn.execute(f"DROP TABLE {table}")
+        conn.commit()
+        conn.close()
+
+    def test_upgrade_builds_pages_over_existing_archives(self):
+        self.archive(conversation('chatgpt_a'))
+        # A database from before rollups and pages
+        self.drop_tables('daily_usage', 'daily_projects', 'daily_tags', 'moc_pages')
+
+        storage = ConversationStorage({})
+        pages = asyncio.run(storage.get_dirty_pages())
+        self.assertIn(('project', 'website'), [tuple(page[:2]) for page in pages])
+        usage = asyncio.run(storage.get_usage('platform', 'week', since='2020-01-01'))
+        self.assertTrue(usage)
+
+    def test_upgrade_segments_archived_conversations(self):
+        code = 'User: Show me a loop\n\nAssistant: ```python\nfor i in range(3):\n    print(i)\n```'
+        self.archive(conversation('chatgpt_a', raw_content=code), conversation('chatgpt_b'))
+        # A database from before turn and code block tables and pages
+        self.drop_tables('conversation_turns', 'conversation_code_blocks', 'moc_pages')
+
+        storage = ConversationStorage({})
+        results = asyncio.run(storage.search_conversations(language='python'))
+        self.assertEqual([c['id'] for c in results], ['chatgpt_a'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Daily Digest Tests
+Appending, updating and repairing the digest block in daily notes
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+from processors.daily_digest import BLOCK_END, BLOCK_START, DailyDigest
+
+
+def conversation(number, summary='Centering with flexbox'):
+    return {'id': f"chatgpt_{number}", 'platform': 'chatgpt', 'title': f"Layout {number}",
+            'timestamp': datetime(2024, 3, 1, 9, number), 'summary': summary}
+
+
+class DailyDigestTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.digest = DailyDigest({'vault_path': self.tmp.name})
+        self.note = Path(self.tmp.name) / 'Daily Notes' / '2024-03-01.md'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_new_note_gets_a_block(self):
+        stats = self.digest.update([conversation(1), conversation(2)])
+        self.assertEqual((stats['notes'], stats['added'], stats['updated']), (1, 2, 0))
+        self.assertEqual(stats['paths'], [(str(self.note), 'write')])
+        text = self.note.read_text()
+        self.assertTrue(text.startswith('# 2024-03-01\n'))
+        self.assertEqual(text.count('gpt-gulp:chatgpt_'), 2)
+
+    def test_new_lines_are_appended_in_place(self):
+        self.digest.update([conversation(1)])
+        with mock.patch('processors.daily_digest.os.replace') as replace:
+            stats = self.digest.update([conversation(2)])
+        replace.assert_not_called()
+        self.assertEqual(stats['added'], 1)
+        text = self.note.read_text()
+        self.assertLess(text.index('chatgpt_1'), text.index('chatgpt_2'))
+        self.assertTrue(text.endswith(f"chatgpt_2 -->\n{BLOCK_END}\n"))
+
+    def test_append_keeps_text_after_the_block(self):
+        self.digest.update([conversation(1)])
+        with open(self.note, 'a', encoding='utf-8') as f:
+            f.write("\n## Notes\nMy own text\n")
+        self.digest.update([conversation(2)])
+        text = self.note.read_text()
+        self.assertTrue(text.endswith(f"chatgpt_2 -->\n{BLOCK_END}\n\n## Notes\nMy own text\n"))
+
+        # Edited by hand since the last sync: the append works from the note on disk
+        self.note.write_text(text.replace('My own text', 'Edited'))
+        self.digest.update([conversation(3)])
+        text = self.note.read_text()
+        self.assertIn('chatgpt_3', text)
+        self.assertTrue(text.endswith('Edited\n'))
+
+    def test_changed_entry_rewrites_the_note(self):
+        self.digest.update([conversation(1), conversation(2)])
+        with mock.patch('processors.daily_digest.os.replace', wraps=os.replace) as replace:
+            stats = self.digest.update([conversation(1, summary='Grid instead'), conversation(3)])
+        replace.assert_called_once()
+        self.assertEqual((stats['added'], stats['updated']), (1, 1))
+        text = self.note.read_text()
+        self.assertIn('Grid instead', text)
+        self.assertNotIn('Centering with flexbox <!-- gpt-gulp:chatgpt_1', text)
+        self.assertEqual(text.count('gpt-gulp:chatgpt_'), 3)
+
+    def test_unchanged_entries_are_not_written(self):
+        self.digest.update([conversation(1)])
+        before = self.note.stat().st_mtime_ns
+        stats = self.digest.update([conversation(1)])
+        self.assertEqual((stats['notes'], stats['paths']), (0, []))
+        self.assertEqual(self.note.stat().st_mtime_ns, before)
+
+    def test_markers_on_one_line_are_repaired(self):
+        self.note.parent.mkdir(parents=True)
+        self.note.write_text(f"# 2024-03-01\n{BLOCK_START}{BLOCK_END}\nafter\n")
+        self.digest.update([conversation(1)])
+        self.digest.update([conversation(2)])
+        text = self.note.read_text()
+        self.assertEqual(text.count('gpt-gulp:chatgpt_'), 2)
+        self.assertTrue(text.endswith(f"{BLOCK_END}\nafter\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Export Importer Tests
+Streaming JSON parsing and mapping of ChatGPT and Claude data exports
+"""
+
+import asyncio
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from collectors.export_importer import (
+    EXPORT_MAPPERS, ExportImporter, JSONArrayStream, map_chatgpt_conversation, map_claude_conversation,
+)
+from storage.conversation_storage import ConversationStorage
+
+
+def chatgpt_item(text, **fields):
+    item = {
+        'title': 'Test',
+        'create_time': 1700000000,
+        'current_node': 'node',
+        'mapping': {
+            'node': {'message': {
+                'author': {'role': 'user'},
+                'create_time': 1700000000,
+                'content': {'parts': [text]},
+            }},
+        },
+    }
+    item.update(fields)
+    return item
+
+
+def parse(document, chunk_size=1024):
+    return list(JSONArrayStream(io.BytesIO(document.encode('utf-8')), chunk_size=chunk_size))
+
+
+class JSONArrayStreamTest(unittest.TestCase):
+    def test_nested_elements(self):
+        elements = [{'a': [1, [2, {'b': []}]]}, [[], [[]]], {'c': {'d': {'e': None}}}]
+        for chunk_size in (1, 3, 1024):
+            self.assertEqual(parse(json.dumps(elements), chunk_size), elements)
+
+    def test_escaped_strings_containing_delimiters(self):
+        elements = [{'text': 'a "quoted" ], [ and \\ backslash'}, '}{,', 'café ☃']
+        document = json.dumps(elements, ensure_ascii=False)
+        for chunk_size in (1, 2, 1024):
+            self.assertEqual(parse(document, chunk_size), elements)
+
+    def test_numbers_split_across_chunks(self):
+        self.assertEqual(parse('[123456, -7.25e3, true, null]', chunk_size=2), [123456, -7250.0, True, None])
+
+    def test_empty_array_and_whitespace(self):
+        self.assertEqual(parse(' \n[ ] '), [])
+        self.assertEqual(parse('﻿[ {"a": 1} ,\n {"b": 2} ]', chunk_size=3), [{'a': 1}, {'b': 2}])
+
+    def test_truncated_arrays_raise(self):
+        for document in ('[{"a": 1}', '[{"a": 1},', '[{"a": [1, 2', '["unterminated', '['):
+            with self.subTest(document=document):
+                with self.assertRaises(ValueError):
+                    parse(document, chunk_size=4)
+
+    def test_empty_document_raises(self):
+        with self.assertRaises(ValueError):
+            parse('')
+
+
+class MapperTest(unittest.TestCase):
+    def test_cyclic_parent_links_terminate(self):
+        item = chatgpt_item('hello', id='abc')
+        item['mapping']['node']['parent'] = 'root'
+        item['mapping']['root'] = {'parent': 'node', 'message': None}
+        conversation = map_chatgpt_conversation(item)
+        self.assertEqual(conversation['raw_content'].split(': ', 1)[1], 'hello')
+
+    def test_bad_timestamps_are_ignored(self):
+        for value in ('2024-01-01', 10 ** 30, True, [1]):
+            with self.subTest(value=value):
+                item = chatgpt_item('hello', create_time=value)
+                item['mapping']['node']['message']['create_time'] = value
+                conversation = map_chatgpt_conversation(item)
+                self.assertTrue(conversation['raw_content'].startswith('User: '))
+
+    def test_malformed_nodes_and_messages_are_skipped(self):
+        item = chatgpt_item('hello', current_node='node')
+        item['mapping']['node']['parent'] = 'broken'
+        item['mapping']['broken'] = ['not', 'a', 'node']
+        self.assertIsNotNone(map_chatgpt_conversation(item))
+        self.assertIsNone(map_chatgpt_conversation({'mapping': ['x'], 'current_node': 'x'}))
+        self.assertIsNone(map_claude_conversation({'chat_messages': ['x', {'content': 'x'}, {'text': 5}]}))
+
+
+class ExportImporterTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.storage = ConversationStorage({})
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def import_items(self, items):
+        with open('conversations.json', 'w') as f:
+            json.dump(items, f)
+        return asyncio.run(ExportImporter(self.storage).import_archive('conversations.json'))
+
+    def stored_ids(self):
+        conversations = asyncio.run(self.storage.get_unprocessed_conversations())
+        return sorted(c['id'] for c in conversations)
+
+    def test_non_dict_elements_are_skipped(self):
+        stats = self.import_items(['stray', 42, None, [1], chatgpt_item('hello', id='abc')])
+        self.assertEqual(stats['seen'], 5)
+        self.assertEqual(stats['unsupported'], 4)
+        self.assertEqual(self.stored_ids(), ['chatgpt_abc'])
+
+    def test_mapping_errors_skip_only_that_item(self):
+        def mapper(item):
+            if item.get('id') == 'bad':
+                raise TypeError('unexpected shape')
+            return map_claude_conversation(item)
+
+        item = {'uuid': 'good', 'chat_messages': [{'sender': 'human', 'text': 'hi'}]}
+        with mock.patch.dict(EXPORT_MAPPERS, {'claude_ai': mapper}):
+            stats = self.import_items([{'id': 'bad', 'chat_messages': []}, item])
+        self.assertEqual(stats['skipped'], 1)
+        self.assertEqual(self.stored_ids(), ['claude_ai_good'])
+
+    def test_items_without_ids_do_not_collide(self):
+        stats = self.import_items([chatgpt_item('first'), chatgpt_item('second')])
+        self.assertEqual(stats['written'], 2)
+        ids = self.stored_ids()
+        self.assertEqual(len(ids), 2)
+        self.assertNotIn('chatgpt_None', ids)
+
+    def test_ids_without_source_id_are_stable(self):
+        self.import_items([chatgpt_item('first')])
+        first = self.stored_ids()
+        os.remove('conversations.json')
+        stats = self.import_items([chatgpt_item('first')])
+        self.assertEqual(self.stored_ids(), first)
+        self.assertEqual(stats['unchanged'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
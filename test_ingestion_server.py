@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Ingestion Server Tests
+Validation, origin checks and batch handling of the browser ingestion server
+"""
+
+import asyncio
+import json
+import unittest
+
+from collectors.ingestion_server import IngestionServer
+
+BROWSER_CONFIGS = {
+    'chatgpt': {'enabled': True, 'url_patterns': ['chat.openai.com']},
+    'claude_ai': {'enabled': True, 'url_patterns': ['claude.ai']},
+}
+
+JSON_HEADERS = {'content-type': 'application/json', 'host': '127.0.0.1:8765'}
+
+
+def conversation(**fields):
+    item = {'platform': 'chatgpt', 'messages': [{'role': 'user', 'content': 'How do I center a div?'}]}
+    item.update(fields)
+    return item
+
+
+class IngestionServerTest(unittest.TestCase):
+    def setUp(self):
+        self.stored = []
+
+        async def sink(conversations):
+            self.stored.extend(conversations)
+
+        self.server = IngestionServer(BROWSER_CONFIGS, sink, {})
+
+    def post(self, items, headers=None):
+        body = json.dumps({'conversations': items}).encode('utf-8')
+        return asyncio.run(self.server._dispatch('POST', '/conversations', headers or JSON_HEADERS, body))
+
+    def test_huge_timestamp_rejects_only_that_conversation(self):
+        status, payload = self.post([conversation(id='a', timestamp=10 ** 30), conversation(id='b')])
+        self.assertEqual(status, 200)
+        self.assertEqual(payload['accepted'], 1)
+        self.assertEqual(payload['rejected'][0]['index'], 0)
+        self.assertIn('invalid timestamp', payload['rejected'][0]['error'])
+        self.assertEqual([c['id'] for c in self.stored], ['chatgpt_b'])
+
+    def test_huge_message_timestamp_is_rejected(self):
+        item = conversation(messages=[{'role': 'user', 'content': 'hi', 'timestamp': 1e300}])
+        with self.assertRaises(ValueError):
+            self.server.validate(item)
+
+    def test_malformed_fields_reject_only_that_conversation(self):
+        bad = [conversation(platform=['chatgpt']), conversation(platform={'name': 'chatgpt'}),
+               conversation(timestamp=True), conversation(url=['https://chat.openai.com']),
+               conversation(messages=[{'role': 'user', 'content': 'hi', 'timestamp': False}])]
+        status, payload = self.post(bad + [conversation(id='good')])
+        self.assertEqual(status, 200)
+        self.assertEqual(payload['accepted'], 1)
+        self.assertEqual([r['index'] for r in payload['rejected']], list(range(len(bad))))
+        self.assertEqual([c['id'] for c in self.stored], ['chatgpt_good'])
+
+    def test_client_ids_are_scoped_to_their_platform(self):
+        self.post([conversation(id='same'), conversation(id='same', platform='claude_ai')])
+        self.assertEqual(sorted(c['id'] for c in self.stored), ['chatgpt_same', 'claude_ai_same'])
+
+    def test_web_page_origin_is_refused(self):
+        status, _ = self.post([conversation()], {**JSON_HEADERS, 'origin': 'https://evil.example'})
+        self.assertEqual(status, 403)
+        self.assertEqual(self.stored, [])
+
+    def test_extension_origin_is_accepted(self):
+        status, _ = self.post([conversation()], {**JSON_HEADERS, 'origin': 'chrome-extension://abcdef'})
+        self.assertEqual(status, 200)
+        self.assertEqual(len(self.stored), 1)
+
+    def test_rebound_host_is_refused(self):
+        status, _ = self.post([conversation()], {**JSON_HEADERS, 'host': 'attacker.example:8765'})
+        self.assertEqual(status, 403)
+        status, _ = self.post([conversation()], {**JSON_HEADERS, 'host': '[::1]:8765'})
+        self.assertEqual(status, 200)
+
+    def test_simple_cross_site_content_types_are_refused(self):
+        status, _ = self.post([conversation()], {**JSON_HEADERS, 'content-type': 'text/plain'})
+        self.assertEqual(status, 415)
+        status, _ = self.post([conversation()], {**JSON_HEADERS, 'content-type': 'application/json; charset=utf-8'})
+        self.assertEqual(status, 200)
+
+    def test_token_is_checked_when_configured(self):
+        self.server.auth_token = 'secret-token'
+        status, _ = self.post([conversation()])
+        self.assertEqual(status, 401)
+        status, _ = self.post([conversation()], {**JSON_HEADERS, 'x-gpt-gulp-token': 'secret-token'})
+        self.assertEqual(status, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Notes Sync Tests
+Committing exactly the exported note files to the notes git repository
+"""
+
+import asyncio
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from storage.notes_sync import NotesSync
+
+
+class ManifestStorage:
+    """The export manifest part of ConversationStorage"""
+
+    def __init__(self):
+        self.changes = []
+
+    def record(self, path: Path, change: str = 'write'):
+        self.changes.append((str(path), change))
+
+    async def get_export_manifest(self):
+        return len(self.changes), dict(self.changes)
+
+    async def clear_export_manifest(self, last_id: int):
+        self.changes = self.changes[last_id:]
+
+
+class NotesSyncTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.repo = Path(self.tmp.name).resolve()
+        self.git('init', '-q')
+        self.git('config', 'user.name', 'Test')
+        self.git('config', 'user.email', 'test@example.com')
+        self.storage = ManifestStorage()
+        self.sync = NotesSync(self.storage, {'notes_repo': str(self.repo)}, {})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def git(self, *args: str) -> str:
+        return subprocess.run(['git', *args], cwd=self.repo, check=True,
+                              capture_output=True, text=True).stdout
+
+    def write(self, name: str, text: str = 'note') -> Path:
+        path = self.repo / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+        return path
+
+    def committed(self, revision: str = 'HEAD') -> list:
+        return self.git('show', '--name-only', '--format=', revision).split()
+
+    def run_sync(self):
+        return asyncio.run(self.sync.sync())
+
+    def test_commits_recorded_notes(self):
+        self.storage.record(self.write('Conversations/a.md'))
+        self.storage.record(self.write('Projects/[draft] b.md'))
+        result = self.run_sync()
+        self.assertTrue(result['committed'])
+        self.assertEqual(sorted(self.git('ls-files').splitlines()), ['Conversations/a.md', 'Projects/[draft] b.md'])
+        self.assertEqual(self.storage.changes, [])
+
+    def test_other_staged_changes_stay_out_of_the_commit(self):
+        self.storage.record(self.write('Conversations/a.md'))
+        self.run_sync()
+
+        self.write('todo.md', 'mine')
+        self.git('add', 'todo.md')
+        self.storage.record(self.write('Conversations/a.md', 'updated'))
+        self.run_sync()
+
+        self.assertEqual(self.committed(), ['Conversations/a.md'])
+        self.assertEqual(self.git('diff', '--cached', '--name-only').split(), ['todo.md'])
+
+    def test_deleted_and_transient_notes(self):
+        note = self.write('Conversations/a.md')
+        self.storage.record(note)
+        self.run_sync()
+
+        note.unlink()
+        self.storage.record(note, 'delete')
+        transient = self.write('Conversations/renamed.md')
+        transient.unlink()
+        self.storage.record(transient, 'delete')
+        result = self.run_sync()
+
+        self.assertTrue(result['committed'])
+        self.assertEqual(self.git('ls-files').split(), [])
+
+    def test_nothing_to_commit(self):
+        note = self.write('Conversations/a.md')
+        self.storage.record(note)
+        self.run_sync()
+        head = self.git('rev-parse', 'HEAD')
+
+        self.storage.record(note)
+        result = self.run_sync()
+        self.assertFalse(result['committed'])
+        self.assertEqual(self.git('rev-parse', 'HEAD'), head)
+        self.assertEqual(self.storage.changes, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
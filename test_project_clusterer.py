@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Project Clusterer Tests
+Seeded and automatic projects, persistence, and keyword detection without clustering
+"""
+
+import os
+import tempfile
+import unittest
+
+from processors.conversation_processor import ConversationProcessor
+from processors.project_clusterer import ProjectClusterer
+from processors.text_features import numpy_available
+
+BASEBALL = ("User: Which MLB team hit the most home runs in baseball this season? "
+            "Assistant: The MLB home run leaders in baseball this season were the Braves.")
+SOURDOUGH = ("User: My sourdough starter smells of acetone and the sourdough loaf is flat. "
+             "Assistant: Feed the sourdough starter twice a day and let the dough proof longer.")
+
+
+def conversation(number, raw_content, title=''):
+    return {'id': f"chatgpt_{number}", 'title': title, 'source_file': '', 'raw_content': raw_content}
+
+
+@unittest.skipUnless(numpy_available(), "project clustering needs numpy")
+class ProjectClustererTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = {
+            'project_seeds': {'mlb': ['baseball', 'mlb', 'home run'], 'todo-app': ['todo', 'task']},
+            'clustering': {'hash_features': 2 ** 12,
+                           'model_path': os.path.join(self.tmp.name, 'clusters.npz')},
+        }
+        self.clusterer = ProjectClusterer(self.config)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_matching_conversation_joins_its_seed_project(self):
+        self.assertEqual(self.clusterer.assign(conversation(1, BASEBALL)), 'mlb')
+
+    def test_unmatched_conversations_start_a_named_project(self):
+        self.clusterer.assign(conversation(1, BASEBALL))
+        project = self.clusterer.assign(conversation(2, SOURDOUGH))
+        self.assertNotIn(project, ('mlb', 'todo-app', 'general'))
+        self.assertIn('sourdough', project)
+        self.assertEqual(self.clusterer.assign(conversation(3, SOURDOUGH + " Any tips?")), project)
+
+    def test_too_few_terms_is_general(self):
+        self.assertEqual(self.clusterer.assign(conversation(1, 'hi')), 'general')
+
+    def test_clusters_survive_save_and_load(self):
+        self.clusterer.assign(conversation(1, BASEBALL))
+        project = self.clusterer.assign(conversation(2, SOURDOUGH))
+        self.clusterer.save()
+
+        reloaded = ProjectClusterer(self.config)
+        self.assertEqual(reloaded.labels, self.clusterer.labels)
+        self.assertEqual(reloaded.corpus.n_documents, 2)
+        self.assertEqual(reloaded.assign(conversation(3, SOURDOUGH)), project)
+
+    def test_recluster_maps_every_conversation(self):
+        conversations = [conversation(1, BASEBALL), conversation(2, BASEBALL + " Who won?"),
+                         conversation(3, 'ok')]
+        for item in conversations:
+            self.clusterer.assign(item)
+        projects = self.clusterer.recluster(conversations)
+        self.assertEqual(projects, {'chatgpt_1': 'mlb', 'chatgpt_2': 'mlb', 'chatgpt_3': 'general'})
+        self.assertIn('todo-app', self.clusterer.labels)
+
+
+class KeywordProjectTest(unittest.TestCase):
+    def test_seed_keywords_pick_the_project_without_clustering(self):
+        processor = ConversationProcessor({'processing': {'categorization': {
+            'project_seeds': {'mlb': ['baseball'], 'bakery': ['sourdough']},
+        }}})
+        self.assertIsNone(processor.clusterer)
+        self.assertEqual(processor._detect_project(conversation(1, SOURDOUGH)), 'bakery')
+        self.assertEqual(processor._detect_project(conversation(2, 'User: hello there')), 'general')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Summarizer Tests
+Batching, caching and fallbacks of the summarization service
+"""
+
+import asyncio
+import unittest
+from typing import List, Optional
+
+from processors.summarizers import LocalSummarizer, SummarizationService, SummarizerBackend
+
+TEXT = ("User: How do I read a file line by line in Python? "
+        "Assistant: Open it in a with block and iterate over the file object.")
+
+
+def fallback(text: str) -> str:
+    return 'fallback'
+
+
+class RecordingBackend(LocalSummarizer):
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.batches = []
+
+    async def summarize_batch(self, texts: List[str]) -> List[Optional[str]]:
+        self.batches.append(list(texts))
+        return await super().summarize_batch(texts)
+
+
+class FailingBackend(SummarizerBackend):
+    name = 'failing'
+
+    async def summarize_batch(self, texts: List[str]) -> List[Optional[str]]:
+        raise RuntimeError('model unavailable')
+
+
+class SummarizationServiceTest(unittest.TestCase):
+    def summarize_all(self, service, texts):
+        async def run():
+            return await asyncio.gather(*(service.summarize(text) for text in texts))
+        return asyncio.run(run())
+
+    def test_local_summary_keeps_leading_sentences(self):
+        summaries = asyncio.run(LocalSummarizer(max_sentences=1).summarize_batch([TEXT, 'short']))
+        self.assertEqual(summaries, ['User: How do I read a file line by line in Python?', None])
+
+    def test_concurrent_requests_are_batched(self):
+        backend = RecordingBackend()
+        service = SummarizationService(backend, fallback, batch_size=4)
+        texts = [f"{TEXT} Question number {n} is here." for n in range(10)]
+        summaries = self.summarize_all(service, texts)
+
+        self.assertEqual([len(batch) for batch in backend.batches], [4, 4, 2])
+        self.assertEqual(service.stats['batches'], 3)
+        self.assertNotIn('fallback', summaries)
+
+    def test_repeated_text_is_summarized_once(self):
+        backend = RecordingBackend()
+        service = SummarizationService(backend, fallback)
+        first = self.summarize_all(service, [TEXT, TEXT])
+        again = self.summarize_all(service, [TEXT])
+
+        self.assertEqual(backend.batches, [[TEXT]])
+        self.assertEqual(first + again, [first[0]] * 3)
+        self.assertEqual(service.stats['cache_hits'], 1)
+
+    def test_backend_error_falls_back(self):
+        service = SummarizationService(FailingBackend(), fallback)
+        self.assertEqual(self.summarize_all(service, [TEXT]), ['fallback'])
+        self.assertEqual((service.stats['errors'], service.stats['fallbacks']), (1, 1))
+
+    def test_slow_backend_falls_back(self):
+        service = SummarizationService(LocalSummarizer(batch_latency_ms=500), fallback,
+                                       timeout_seconds=0.05)
+        self.assertEqual(self.summarize_all(service, [TEXT]), ['fallback'])
+        self.assertEqual(service.stats['timeouts'], 1)
+
+    def test_from_config(self):
+        self.assertIsNone(SummarizationService.from_config({}, fallback))
+        service = SummarizationService.from_config({'backend': 'local', 'batch_size': 3}, fallback)
+        self.assertIsInstance(service.backend, LocalSummarizer)
+        self.assertEqual(service.batch_size, 3)
+        with self.assertRaises(ValueError):
+            SummarizationService.from_config({'backend': 'bogus'}, fallback)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Term Index Tests
+Tag and resource filters, kept in step with processing and compaction
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+
+from storage.conversation_storage import ConversationStorage
+from storage.term_index import resource_name
+
+
+def conversation(conversation_id, tags, resources, timestamp=None):
+    return {
+        'id': conversation_id,
+        'platform': 'chatgpt',
+        'timestamp': timestamp or datetime.now(),
+        'title': 'Deploying the site',
+        'raw_content': f"User: question {conversation_id}",
+        'tags': tags,
+        'resources': resources,
+        'processed': True,
+        'processed_at': datetime.now(),
+    }
+
+
+class TermIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.storage = ConversationStorage({})
+        self.save(conversation('chatgpt_a', ['python', 'Deployment'], ['src/main.py', 'https://docs.python.org/3/']))
+        self.save(conversation('chatgpt_b', ['javascript'], ['web/main.py', 'package.json']))
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def save(self, item):
+        asyncio.run(self.storage.save_conversations([item]))
+        asyncio.run(self.storage.save_processed_conversation(item))
+
+    def search(self, storage=None, **filters):
+        results = asyncio.run((storage or self.storage).search_conversations(**filters))
+        return sorted(c['id'] for c in results)
+
+    def test_resource_name(self):
+        self.assertEqual(resource_name('src/main.py'), 'main.py')
+        self.assertEqual(resource_name('C:\\code\\app.js'), 'app.js')
+
+    def test_tags_match_case_insensitively(self):
+        self.assertEqual(self.search(tag='deployment'), ['chatgpt_a'])
+        self.assertEqual(self.search(tag='PYTHON'), ['chatgpt_a'])
+        self.assertEqual(self.search(tag='rust'), [])
+
+    def test_resources_match_by_path_or_file_name(self):
+        self.assertEqual(self.search(resource='src/main.py'), ['chatgpt_a'])
+        self.assertEqual(self.search(resource='main.py'), ['chatgpt_a', 'chatgpt_b'])
+        self.assertEqual(self.search(resource='https://docs.python.org/3/'), ['chatgpt_a'])
+
+    def test_filters_combine(self):
+        self.assertEqual(self.search(tag='javascript', resource='main.py'), ['chatgpt_b'])
+
+    def test_reprocessing_replaces_index_rows(self):
+        self.save(conversation('chatgpt_a', ['rust'], ['Cargo.toml']))
+        self.assertEqual(self.search(tag='python'), [])
+        self.assertEqual(self.search(tag='rust'), ['chatgpt_a'])
+        self.assertEqual(self.search(resource='main.py'), ['chatgpt_b'])
+
+    def test_archived_conversations_are_indexed(self):
+        self.save(conversation('chatgpt_old', ['python'], ['setup.py'], timestamp=datetime(2020, 1, 15)))
+        asyncio.run(self.storage.compact(hot_months=1))
+        self.assertEqual(self.search(tag='python'), ['chatgpt_a', 'chatgpt_old'])
+        self.assertEqual(self.search(resource='setup.py'), ['chatgpt_old'])
+
+    def test_upgrade_indexes_existing_rows(self):
+        # A database from before the index tables
+        conn = sqlite3.connect(self.storage.db_path)
+        conn.execute("DROP TABLE conversation_tag")
+        conn.execute("DROP TABLE conversation_resource")
+        conn.commit()
+        conn.close()
+
+        storage = ConversationStorage({})
+        self.assertEqual(self.search(storage, tag='javascript'), ['chatgpt_b'])
+        self.assertEqual(self.search(storage, resource='package.json'), ['chatgpt_b'])
+
+
+if __name__ == "__main__":
+    unittest.main()
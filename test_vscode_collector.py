@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+VS Code Collector Tests
+File checkpoints only advance once a conversation is durable
+"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from collectors.file_checkpoint import FileCheckpoint
+from collectors.vscode_collector import VSCodeCollector
+from storage.capture_spool import CaptureSpool
+
+CONTENT = "User: How do I read a file in Python?\n\nAssistant: Use open() in a with block. " * 3
+
+
+class FailingStorage:
+    def __init__(self):
+        self.saved = []
+        self.fail = True
+
+    async def save_conversations(self, conversations):
+        if self.fail:
+            raise OSError("disk full")
+        self.saved.extend(conversations)
+
+
+class VSCodeCollectorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.checkpoint_path = self.root / 'checkpoint.db'
+        self.config = {'platforms': {'vscode': {'backfill': {'checkpoint_path': str(self.checkpoint_path)}}}}
+        self.file = self.root / 'copilot-chat.md'
+        self.file.write_text(CONTENT)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def persisted(self) -> bool:
+        stat = os.stat(self.file)
+        return not FileCheckpoint(self.checkpoint_path).claim(str(self.file), stat.st_mtime_ns, stat.st_size)
+
+    def ingest(self, collector):
+        collector._ingest_if_changed(str(self.file), os.stat(self.file))
+        collector.checkpoint.flush()
+
+    def test_spooled_file_is_checkpointed_after_sync(self):
+        spool = CaptureSpool(self.root / 'spool')
+        try:
+            collector = VSCodeCollector(self.config, spool=spool)
+            self.ingest(collector)
+            self.assertFalse(self.persisted())
+
+            asyncio.run(collector.commit_ingested())
+            collector.checkpoint.flush()
+            self.assertTrue(self.persisted())
+            self.assertEqual(len(spool.read_pending()[0]), 1)
+        finally:
+            spool.close()
+
+    def test_storage_failure_keeps_file_unchecked(self):
+        storage = FailingStorage()
+        collector = VSCodeCollector(self.config, storage=storage)
+        self.ingest(collector)
+
+        asyncio.run(collector.commit_ingested())
+        collector.checkpoint.flush()
+        self.assertFalse(self.persisted())
+        self.assertEqual(len(collector.pending), 1)
+
+        storage.fail = False
+        asyncio.run(collector.commit_ingested())
+        collector.checkpoint.flush()
+        self.assertTrue(self.persisted())
+        self.assertEqual([c['source_file'] for c in storage.saved], [str(self.file)])
+        self.assertEqual(collector.pending, [])
+
+    def test_buffered_file_is_read_again_after_restart(self):
+        collector = VSCodeCollector(self.config)
+        self.ingest(collector)
+        self.assertEqual(len(collector.get_conversations()), 1)
+        self.assertFalse(self.persisted())
+
+        # Within the process, the claim still drops repeated events
+        self.ingest(collector)
+        self.assertEqual(len(collector.get_conversations()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()